@@ -0,0 +1,154 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import os
+
+NODES_PATH = 'dim_apron_node.csv'
+EDGES_PATH = 'dim_apron_edge.csv'
+CACHE_PATH = 'apron_paths.npz'
+
+
+def file_signature(*paths):
+    """Content hash of the network input files, used to invalidate the cache"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def floyd_warshall(time_min, distance_km):
+    """All-pairs fastest travel time, carrying the distance of each fastest path"""
+    time_min = time_min.copy()
+    distance_km = distance_km.copy()
+    for k in range(len(time_min)):
+        via_time = time_min[:, k:k + 1] + time_min[k:k + 1, :]
+        better = via_time < time_min
+        time_min = np.where(better, via_time, time_min)
+        distance_km = np.where(better, distance_km[:, k:k + 1] + distance_km[k:k + 1, :], distance_km)
+    return time_min, distance_km
+
+
+def build_paths(dim_apron_node, dim_apron_edge):
+    """Shortest-time and matching distance matrices over the node list"""
+    n = len(dim_apron_node)
+    position = pd.Series(np.arange(n), index=dim_apron_node['node_id'])
+    src = position[dim_apron_edge['from_node_id']].to_numpy()
+    dst = position[dim_apron_edge['to_node_id']].to_numpy()
+    length_km = dim_apron_edge['length_m'].to_numpy() / 1000
+    minutes = length_km / dim_apron_edge['speed_kmh'].to_numpy() * 60
+
+    # Two-way segments are added in both directions
+    two_way = dim_apron_edge['is_one_way'].astype(str).str.upper().to_numpy() != 'TRUE'
+    src, dst = np.concatenate([src, dst[two_way]]), np.concatenate([dst, src[two_way]])
+    length_km = np.concatenate([length_km, length_km[two_way]])
+    minutes = np.concatenate([minutes, minutes[two_way]])
+
+    time_min = np.full((n, n), np.inf)
+    distance_km = np.full((n, n), np.inf)
+    np.fill_diagonal(time_min, 0.0)
+    np.fill_diagonal(distance_km, 0.0)
+
+    # Keep the fastest of any parallel segments
+    order = np.argsort(-minutes)
+    time_min[src[order], dst[order]] = minutes[order]
+    distance_km[src[order], dst[order]] = length_km[order]
+
+    return floyd_warshall(time_min, distance_km)
+
+
+class ApronPaths:
+    """Cached all-pairs distance/time over the apron graph with O(1) lookups by station or stand id"""
+
+    def __init__(self, dim_apron_node, time_min, distance_km):
+        self.nodes = dim_apron_node.reset_index(drop=True)
+        self.time_min = time_min
+        self.distance_km = distance_km
+
+    @classmethod
+    def load(cls, nodes_path=NODES_PATH, edges_path=EDGES_PATH, cache_path=CACHE_PATH):
+        """Load matrices from the cache, rebuilding them when the network files changed"""
+        dim_apron_node = pd.read_csv(nodes_path)
+        signature = file_signature(nodes_path, edges_path)
+
+        if os.path.exists(cache_path):
+            cached = np.load(cache_path)
+            if str(cached['signature']) == signature:
+                return cls(dim_apron_node, cached['time_min'], cached['distance_km'])
+
+        time_min, distance_km = build_paths(dim_apron_node, pd.read_csv(edges_path))
+        np.savez_compressed(cache_path, signature=signature, time_min=time_min, distance_km=distance_km)
+        return cls(dim_apron_node, time_min, distance_km)
+
+    def node_positions(self, node_type, ref_ids):
+        """Matrix positions of station or parking-stand nodes for the given ids"""
+        typed = self.nodes[self.nodes['node_type'] == node_type]
+        lookup = pd.Series(typed.index.to_numpy(), index=typed['ref_id'].to_numpy())
+        return lookup.reindex(np.asarray(ref_ids)).to_numpy()
+
+    def by_id(self, matrix, from_type, to_type, from_ids, to_ids):
+        """Sub-matrix indexed directly by id: result[from_id, to_id] (row/column 0 unused)"""
+        from_ids = np.asarray(from_ids)
+        to_ids = np.asarray(to_ids)
+        table = np.full((from_ids.max() + 1, to_ids.max() + 1), np.inf)
+        table[np.ix_(from_ids, to_ids)] = matrix[np.ix_(
+            self.node_positions(from_type, from_ids), self.node_positions(to_type, to_ids)
+        )]
+        return table
+
+    def station_distance_km(self, station_ids):
+        """[from_station_id, to_station_id] road distance in km"""
+        return self.by_id(self.distance_km, 'station', 'station', station_ids, station_ids)
+
+    def station_time_min(self, station_ids):
+        """[from_station_id, to_station_id] tractor travel time in minutes"""
+        return self.by_id(self.time_min, 'station', 'station', station_ids, station_ids)
+
+    def stand_station_distance_km(self, parking_stand_ids, station_ids):
+        """[parking stand, station] road distance in km, rows in parking_stand_ids order"""
+        return self.distance_km[np.ix_(
+            self.node_positions('parking_stand', parking_stand_ids), self.node_positions('station', station_ids)
+        )]
+
+
+if __name__ == '__main__':
+    import time
+
+    # Load prerequisite files
+    dim_station = pd.read_csv('dim_station.csv')
+
+    if os.path.exists(CACHE_PATH):
+        os.remove(CACHE_PATH)
+
+    start_time = time.perf_counter()
+    paths = ApronPaths.load()
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    paths = ApronPaths.load()
+    cached_time = time.perf_counter() - start_time
+
+    station_ids = dim_station['station_id'].to_numpy()
+    distance = paths.station_distance_km(station_ids)[np.ix_(station_ids, station_ids)]
+    travel = paths.station_time_min(station_ids)[np.ix_(station_ids, station_ids)]
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nNodes: {len(paths.nodes)}")
+    print(f"Build time (all pairs): {build_time * 1000:.0f} ms, cached load: {cached_time * 1000:.0f} ms")
+    print(f"All pairs reachable: {np.isfinite(paths.time_min).all()} ✓")
+    print(f"Asymmetric station pairs (one-way roads): {(~np.isclose(distance, distance.T)).sum() // 2}")
+
+    print("\nStation-to-station road distance (km):")
+    labels = dim_station['stand_number'].astype(str).tolist()
+    print(pd.DataFrame(np.round(distance, 2), index=labels, columns=labels).to_string())
+
+    print("\nStation-to-station travel time (min):")
+    print(pd.DataFrame(np.round(travel, 1), index=labels, columns=labels).to_string())
+
+    print("\n" + "=" * 80)
+    print(f"Cache file '{CACHE_PATH}' created successfully!")
+    print("=" * 80)
@@ -0,0 +1,176 @@
+import pandas as pd
+import numpy as np
+
+# 5-minute slots per day (matches dim_time_slot)
+SLOTS_PER_DAY = 288
+
+# Pseudo-count weight of the prior profile when fitting sparse airline/weekday keys
+PRIOR_STRENGTH = 24.0
+
+
+def build_alias_table(weights):
+    """Build Vose alias table (prob, alias) for a discrete distribution"""
+    weights = np.asarray(weights, dtype=float)
+    n = len(weights)
+    scaled = weights * n / weights.sum()
+
+    prob = np.ones(n)
+    alias = np.arange(n)
+    small = [i for i in range(n) if scaled[i] < 1.0]
+    large = [i for i in range(n) if scaled[i] >= 1.0]
+
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = scaled[l] + scaled[s] - 1.0
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+
+    return prob, alias
+
+
+def slot_to_time(slot_ids):
+    """Convert slot_id (1-288) to hour and minute arrays"""
+    slot_index = np.asarray(slot_ids) - 1
+    return slot_index // 12, (slot_index % 12) * 5
+
+
+def profile_from_periods(time_periods):
+    """Expand (start_hour, end_hour, weight) periods into a 288-slot profile"""
+    hour_weights = np.zeros(24)
+    for period_start, period_end, weight in time_periods:
+        if period_end < period_start:  # Night period wraps, half before and half after midnight
+            hour_weights[period_start:24] += weight * 0.5 / (24 - period_start)
+            hour_weights[0:period_end] += weight * 0.5 / period_end
+        else:
+            hour_weights[period_start:period_end] += weight / (period_end - period_start)
+
+    # Minutes are uniform within the hour
+    return np.repeat(hour_weights / 12, 12)
+
+
+class ArrivalProfileSampler:
+    """Stacked alias tables over the 288-slot grid, one per (airline_code, day_of_week) key"""
+
+    def __init__(self, weights, keys=None):
+        weights = np.atleast_2d(np.asarray(weights, dtype=float))
+        if weights.shape[1] != SLOTS_PER_DAY:
+            raise ValueError(f"Profile must have {SLOTS_PER_DAY} slots, got {weights.shape[1]}")
+
+        # Row 0 is always the fallback profile for unseen keys
+        self.weights = weights / weights.sum(axis=1, keepdims=True)
+        self.keys = list(keys) if keys is not None else []
+        self.key_index = {key: i + 1 for i, key in enumerate(self.keys)}
+
+        tables = [build_alias_table(row) for row in self.weights]
+        self.prob = np.stack([t[0] for t in tables])
+        self.alias = np.stack([t[1] for t in tables])
+
+    @classmethod
+    def from_periods(cls, time_periods):
+        """Static profile equivalent to the four coarse arrival periods"""
+        return cls(profile_from_periods(time_periods))
+
+    @classmethod
+    def fit(cls, dim_flight, prior=None, prior_strength=PRIOR_STRENGTH):
+        """Learn per airline/weekday profiles from historical dim_flight rows"""
+        slot_index = dim_flight['arrival_slot_id'].to_numpy() - 1
+        day_of_week = pd.to_datetime(dim_flight['date_key'].astype(str), format='%Y%m%d').dt.dayofweek.to_numpy() + 1
+
+        # Fallback profile is the overall empirical distribution blended with the prior
+        overall = np.bincount(slot_index, minlength=SLOTS_PER_DAY).astype(float)
+        if prior is None:
+            prior = np.full(SLOTS_PER_DAY, 1.0 / SLOTS_PER_DAY)
+        prior = np.asarray(prior, dtype=float) / np.sum(prior)
+        fallback = overall + prior * prior_strength
+        fallback = fallback / fallback.sum()
+
+        # Slot counts for every key in one pass
+        key_frame = pd.DataFrame({
+            'airline_code': dim_flight['airline_code'].to_numpy(),
+            'day_of_week': day_of_week
+        })
+        key_codes, key_uniques = pd.MultiIndex.from_frame(key_frame).factorize()
+        counts = np.zeros((len(key_uniques), SLOTS_PER_DAY))
+        np.add.at(counts, (key_codes, slot_index), 1.0)
+
+        # Sparse keys shrink towards the fallback profile
+        weights = np.vstack([fallback, counts + fallback * prior_strength])
+        return cls(weights, keys=[tuple(k) for k in key_uniques])
+
+    def table_index(self, airline_codes=None, days_of_week=None, size=None):
+        """Map airline/weekday arrays to alias table rows (0 for unseen keys or without both arrays)"""
+        if airline_codes is not None and size is None:
+            size = len(np.atleast_1d(airline_codes))
+        if airline_codes is None or days_of_week is None or not self.keys:
+            return np.zeros(size if size is not None else 1, dtype=np.int64)
+
+        airline_codes = np.atleast_1d(airline_codes)
+        days_of_week = np.broadcast_to(np.atleast_1d(days_of_week), airline_codes.shape)
+        return np.array(
+            [self.key_index.get((a, int(d)), 0) for a, d in zip(airline_codes, days_of_week)],
+            dtype=np.int64
+        )
+
+    def sample(self, size=None, airline_codes=None, days_of_week=None, rng=None):
+        """Draw arrival slot_ids (1-288) for many flights in one vectorized call"""
+        if rng is None:
+            rng = np.random.default_rng()
+        if airline_codes is not None:
+            size = len(airline_codes)
+
+        table = self.table_index(airline_codes, days_of_week, size)
+        if len(table) != size:
+            table = np.broadcast_to(table, (size,))
+
+        column = rng.integers(0, SLOTS_PER_DAY, size=size)
+        accept = rng.random(size) < self.prob[table, column]
+        slot_index = np.where(accept, column, self.alias[table, column])
+        return slot_index + 1
+
+    def save(self, path):
+        """Persist profile weights and keys to an .npz file"""
+        airline_codes = np.array([k[0] for k in self.keys], dtype=str)
+        days_of_week = np.array([k[1] for k in self.keys], dtype=np.int64)
+        np.savez_compressed(path, weights=self.weights, airline_codes=airline_codes, days_of_week=days_of_week)
+
+    @classmethod
+    def load(cls, path):
+        """Load a profile saved with save()"""
+        data = np.load(path)
+        keys = list(zip(data['airline_codes'].tolist(), data['days_of_week'].tolist()))
+        return cls(data['weights'], keys=keys)
+
+
+if __name__ == '__main__':
+    # Fit profiles from historical flights
+    dim_flight = pd.read_csv('dim_flight.csv')
+    sampler = ArrivalProfileSampler.fit(dim_flight)
+    sampler.save('arrival_profile.npz')
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nFitted profiles: {len(sampler.keys)} airline/weekday keys + 1 fallback")
+    print(f"Historical flights: {len(dim_flight):,}")
+
+    rng = np.random.default_rng(42)
+    slots = sampler.sample(airline_codes=dim_flight['airline_code'].to_numpy(), days_of_week=3, rng=rng)
+    hours, _ = slot_to_time(slots)
+    historical_hours, _ = slot_to_time(dim_flight['arrival_slot_id'].to_numpy())
+
+    print("\nArrivals by hour (historical vs sampled):")
+    hist_counts = np.bincount(historical_hours, minlength=24)
+    sample_counts = np.bincount(hours, minlength=24)
+    for hour in range(24):
+        print(f"  {hour:02d}:00  {hist_counts[hour]:>6,}  {sample_counts[hour]:>6,}")
+
+    print("\n" + "=" * 80)
+    print("Profile file 'arrival_profile.npz' created successfully!")
+    print("=" * 80)
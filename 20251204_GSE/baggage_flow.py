@@ -0,0 +1,154 @@
+import pandas as pd
+import numpy as np
+
+SLOTS_PER_DAY = 288
+SLOT_MIN = 5
+
+# Share of each slot's bags unloaded, starting UNLOAD_DELAY_SLOTS after arrival
+UNLOAD_DELAY_SLOTS = 1
+UNLOAD_CURVE = {
+    'Widebody': [0.10, 0.20, 0.25, 0.20, 0.15, 0.10],
+    'Narrowbody': [0.20, 0.35, 0.30, 0.15]
+}
+
+# Trolley types, the share of bags each carries and bags per full trolley
+TROLLEY_TYPES = [4, 6]  # 26-O, 26-C
+BAG_SHARE = {4: 0.65, 6: 0.35}
+BAGS_PER_TROLLEY = {4: 30, 6: 40}
+
+# Minutes a full trolley is away: drive to baggage hall, unload, drive back
+CYCLE_MIN = {4: 25, 6: 30}
+
+
+def convolve_slots(series, kernel):
+    """Convolve every row of [rows, slots] with a short kernel along the slot axis (causal)"""
+    result = np.zeros_like(series, dtype=np.float64)
+    for shift, weight in enumerate(kernel):
+        if shift == 0:
+            result += weight * series
+        else:
+            result[:, shift:] += weight * series[:, :-shift]
+    return result
+
+
+def flight_stations(fact_flight_demand, equipment_id):
+    """flight_id -> station serving its trolleys of one type"""
+    rows = fact_flight_demand[fact_flight_demand['equipment_id'] == equipment_id]
+    return rows.drop_duplicates('flight_id').set_index('flight_id')['station_id']
+
+
+def trolley_requirements(dim_flight, fact_flight_demand, station_ids):
+    """Trolleys required per trolley type, station and slot over the whole date range
+
+    Bags of each flight are spread over its unload curve, loaded into trolleys as they come
+    off, and each full trolley stays out for its cycle time. Every flight still unloading
+    also holds one trolley being filled. Returns (grid, date_keys) where grid maps
+    equipment_id -> dict of [station, day * 288] arrays (bags, dispatched, in_use, required).
+    """
+    date_keys = np.sort(dim_flight['date_key'].unique())
+    day_index = np.searchsorted(date_keys, dim_flight['date_key'].to_numpy())
+    start = day_index * SLOTS_PER_DAY + dim_flight['arrival_slot_id'].to_numpy() - 1 + UNLOAD_DELAY_SLOTS
+    num_slots = len(date_keys) * SLOTS_PER_DAY + max(len(c) for c in UNLOAD_CURVE.values()) + UNLOAD_DELAY_SLOTS
+    station_index = pd.Index(station_ids)
+
+    grid = {}
+    for equipment_id in TROLLEY_TYPES:
+        station = station_index.get_indexer(
+            flight_stations(fact_flight_demand, equipment_id).reindex(dim_flight['flight_id']).to_numpy()
+        )
+        bags = np.zeros((len(station_ids), num_slots))
+        unloading = np.zeros((len(station_ids), num_slots))
+
+        for category, curve in UNLOAD_CURVE.items():
+            keep = (dim_flight['aircraft_category'] == category).to_numpy() & (station >= 0)
+
+            # Arrival impulses per station and slot, then the unload curve by convolution
+            impulses = np.zeros((len(station_ids), num_slots))
+            np.add.at(impulses, (station[keep], start[keep]), dim_flight['estimated_bags'].to_numpy()[keep] * BAG_SHARE[equipment_id])
+            bags += convolve_slots(impulses, curve)
+
+            arrivals = np.zeros((len(station_ids), num_slots))
+            np.add.at(arrivals, (station[keep], start[keep]), 1)
+            unloading += convolve_slots(arrivals, np.ones(len(curve)))
+
+        # Full trolleys leave as bags come off and are away for the cycle time
+        dispatched = bags / BAGS_PER_TROLLEY[equipment_id]
+        in_use = convolve_slots(dispatched, np.ones(int(np.ceil(CYCLE_MIN[equipment_id] / SLOT_MIN))))
+        grid[equipment_id] = {
+            'bags': bags,
+            'dispatched': dispatched,
+            'in_use': in_use,
+            'required': np.ceil(in_use + unloading - 1e-9).astype(np.int64)
+        }
+    return grid, date_keys
+
+
+def requirements_to_frame(grid, date_keys, station_ids):
+    """Long rows (date, slot, station, equipment) for every slot with trolleys required"""
+    frames = []
+    days = len(date_keys) * SLOTS_PER_DAY
+    for equipment_id, arrays in grid.items():
+        required = arrays['required'][:, :days]
+        station_idx, slot_idx = np.nonzero(required)
+        frames.append(pd.DataFrame({
+            'date_key': date_keys[slot_idx // SLOTS_PER_DAY],
+            'slot_id': slot_idx % SLOTS_PER_DAY + 1,
+            'station_id': np.asarray(station_ids)[station_idx],
+            'equipment_id': equipment_id,
+            'bags_unloaded': np.round(arrays['bags'][station_idx, slot_idx], 1),
+            'trolleys_in_use': np.round(arrays['in_use'][station_idx, slot_idx], 2),
+            'trolleys_required': required[station_idx, slot_idx]
+        }))
+    frame = pd.concat(frames, ignore_index=True)
+    return frame.sort_values(['date_key', 'slot_id', 'station_id', 'equipment_id']).reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    import time
+
+    # Load prerequisite files
+    dim_flight = pd.read_csv('dim_flight.csv')
+    fact_flight_demand = pd.read_csv('fact_flight_demand.csv')
+    dim_station = pd.read_csv('dim_station.csv')
+    station_ids = dim_station['station_id'].to_numpy()
+
+    start_time = time.perf_counter()
+    grid, date_keys = trolley_requirements(dim_flight, fact_flight_demand, station_ids)
+    fact_trolley_requirement = requirements_to_frame(grid, date_keys, station_ids)
+    elapsed = time.perf_counter() - start_time
+
+    # Save to CSV
+    fact_trolley_requirement.to_csv('fact_trolley_requirement.csv', index=False)
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nFlights: {len(dim_flight):,} over {len(date_keys)} days, computed in {elapsed * 1000:.0f} ms")
+    print(f"Rows (slots with trolleys out): {len(fact_trolley_requirement):,}")
+
+    total_bags = dim_flight['estimated_bags'].sum()
+    unloaded = sum(arrays['bags'].sum() for arrays in grid.values())
+    print(f"Bags conserved by the unload curves: {abs(unloaded - total_bags) < 1e-6 * total_bags} ✓")
+
+    # Peak simultaneous requirement against the trolleys based at each station
+    codes = {4: '26o', 6: '26c'}
+    print("\nPeak trolleys required per station (queueing model vs station capacity):")
+    for equipment_id in TROLLEY_TYPES:
+        peak = grid[equipment_id]['required'].max(axis=1)
+        capacity = dim_station[f'capacity_{codes[equipment_id]}'].to_numpy()
+        print(f"  {equipment_id} ({codes[equipment_id].upper()}): peak {peak.tolist()}")
+        print(f"  {' ' * len(str(equipment_id))}  capacity  {capacity.tolist()}")
+        print(f"  {' ' * len(str(equipment_id))}  stations over capacity at peak: {(peak > capacity).sum()}")
+
+    print(f"\nMean trolleys out per busy slot: "
+          + ', '.join(f"{e}: {fact_trolley_requirement.loc[fact_trolley_requirement['equipment_id'] == e, 'trolleys_required'].mean():.1f}"
+                      for e in TROLLEY_TYPES))
+
+    print("\n--- First 5 rows ---")
+    print(fact_trolley_requirement.head(5).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("CSV file 'fact_trolley_requirement.csv' created successfully!")
+    print("=" * 80)
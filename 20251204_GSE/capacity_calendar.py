@@ -0,0 +1,129 @@
+import pandas as pd
+import numpy as np
+
+CALENDAR_PATH = 'dim_capacity_calendar.csv'
+
+SLOTS_PER_DAY = 288
+SLOT = pd.Timedelta(minutes=5)
+
+
+class CapacityCalendar:
+    """Effective-dated capacity deltas per station/equipment, each in effect over [effective_from, effective_to)
+
+    Events are held in an IntervalIndex for point-in-time lookups. Engines do not query
+    events row by row: slot_deltas() turns every event into two entries of a difference
+    array and one cumsum gives the capacity delta for every slot of the horizon.
+    """
+
+    def __init__(self, frame):
+        frame = frame[frame['is_active'].astype(str).str.upper() == 'TRUE'].reset_index(drop=True)
+        self.frame = frame
+        self.intervals = pd.IntervalIndex.from_arrays(
+            pd.to_datetime(frame['effective_from']), pd.to_datetime(frame['effective_to']), closed='left'
+        )
+
+    @classmethod
+    def load(cls, path=CALENDAR_PATH):
+        return cls(pd.read_csv(path))
+
+    def active(self, when):
+        """Events in effect at a timestamp"""
+        return self.frame[self.intervals.contains(pd.Timestamp(when))]
+
+    def slot_deltas(self, origin, num_slots, station_ids, equipment_ids):
+        """[slot, station, equipment] capacity delta for num_slots 5-minute slots from origin
+
+        A slot is affected when any part of it falls inside an event; events for other
+        stations/equipment or outside the horizon are ignored.
+        """
+        origin = pd.Timestamp(origin)
+        start = np.floor((self.intervals.left - origin) / SLOT).to_numpy()
+        end = np.ceil((self.intervals.right - origin) / SLOT).to_numpy()
+        start = np.clip(start, 0, num_slots).astype(np.int64)
+        end = np.clip(end, 0, num_slots).astype(np.int64)
+        station = pd.Index(station_ids).get_indexer(self.frame['station_id'])
+        equipment = pd.Index(equipment_ids).get_indexer(self.frame['equipment_id'])
+        keep = (station >= 0) & (equipment >= 0) & (start < end)
+        delta = self.frame['capacity_delta'].to_numpy()[keep]
+
+        diff = np.zeros((num_slots + 1, len(station_ids), len(equipment_ids)), dtype=np.int64)
+        np.add.at(diff, (start[keep], station[keep], equipment[keep]), delta)
+        np.add.at(diff, (end[keep], station[keep], equipment[keep]), -delta)
+        return np.cumsum(diff[:-1], axis=0)
+
+    def period_capacity(self, dates, station_ids, equipment_ids, base_capacity, dim_time_slot):
+        """[date, period, station, equipment] effective capacity (lowest over the period's slots)
+
+        base_capacity is the [station, equipment] capacity from dim_station; periods follow
+        the dim_time_slot period_id of each slot of the day. Capacity never goes below 0.
+        """
+        dates = pd.to_datetime(pd.Series(dates).astype(str), format='%Y%m%d')
+        origin = dates.min()
+        day_index = (dates - origin).dt.days.to_numpy()
+        num_days = int(day_index.max()) + 1
+
+        deltas = self.slot_deltas(origin, num_days * SLOTS_PER_DAY, station_ids, equipment_ids)
+        capacity = np.maximum(np.asarray(base_capacity)[None] + deltas, 0)
+        capacity = capacity.reshape(num_days, SLOTS_PER_DAY, len(station_ids), len(equipment_ids))[day_index]
+
+        slot_periods = dim_time_slot.sort_values('slot_id')['period_id'].to_numpy()
+        periods = np.sort(np.unique(slot_periods))
+        return np.stack([capacity[:, slot_periods == period].min(axis=1) for period in periods], axis=1)
+
+    def row_capacity(self, base_capacity, station_ids, equipment_ids, times, first_date_key):
+        """Effective capacity at each row's absolute slot time (see interval_allocation.absolute_demand_times)
+
+        base_capacity is the [station_id, equipment_id] array; times count slots 1..288 of the
+        first date, 0 and below being the day before.
+        """
+        origin = pd.to_datetime(str(first_date_key), format='%Y%m%d') - pd.Timedelta(days=1)
+        index = np.asarray(times, dtype=np.int64) - 1 + SLOTS_PER_DAY
+        deltas = self.slot_deltas(origin, int(index.max()) + 1, np.arange(base_capacity.shape[0]), np.arange(base_capacity.shape[1]))
+        station_ids = np.asarray(station_ids, dtype=np.int64)
+        equipment_ids = np.asarray(equipment_ids, dtype=np.int64)
+        return np.maximum(base_capacity[station_ids, equipment_ids] + deltas[index, station_ids, equipment_ids], 0)
+
+
+if __name__ == '__main__':
+    import time
+    from stock_kernel import capacity_matrix
+
+    # Load prerequisite files
+    calendar = CapacityCalendar.load()
+    dim_station = pd.read_csv('dim_station.csv')
+    dim_equipment = pd.read_csv('dim_equipment.csv')
+    dim_time_slot = pd.read_csv('dim_time_slot.csv')
+    dim_date = pd.read_csv('dim_date.csv')
+
+    equipment_types = [1, 2, 4, 6]
+    stations = list(dim_station['station_id'])
+    base = capacity_matrix(dim_station, dim_equipment, equipment_types)
+
+    start_time = time.perf_counter()
+    capacity = calendar.period_capacity(dim_date['date_key'], stations, equipment_types, base, dim_time_slot)
+    elapsed = time.perf_counter() - start_time
+
+    # Spot check against a direct interval lookup for one event
+    event = calendar.frame.iloc[len(calendar.frame) // 2]
+    when = pd.Timestamp(event['effective_from']) + pd.Timedelta(minutes=1)
+    active = calendar.active(when)
+    active = active[(active['station_id'] == event['station_id']) & (active['equipment_id'] == event['equipment_id'])]
+    s = stations.index(event['station_id'])
+    e = equipment_types.index(event['equipment_id'])
+    deltas = calendar.slot_deltas(when.normalize(), SLOTS_PER_DAY, stations, equipment_types)
+    slot = (when - when.normalize()) // SLOT
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nEvents: {len(calendar.frame)}, dense capacity {capacity.shape} built in {elapsed * 1000:.0f} ms")
+    changed = capacity != base[None, None]
+    print(f"Date/period/station/equipment cells with changed capacity: {changed.sum():,} ({changed.mean() * 100:.1f}%)")
+    print(f"Cells closed (capacity 0 where base > 0): {((capacity == 0) & (base[None, None] > 0)).sum():,}")
+    print(f"Difference array matches interval lookup at {when}: "
+          f"{deltas[slot, s, e] == active['capacity_delta'].sum()} ✓")
+    print(f"Capacity never negative: {(capacity >= 0).all()} ✓")
+
+    print("\n" + "=" * 80)
@@ -0,0 +1,258 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import os
+
+# Cached model and forward cube
+MODEL_PATH = 'demand_forecast_model.npz'
+FORECAST_PATH = 'forecast_station_demand.csv'
+
+# Days of recent history used for the level (trend) adjustment
+ROLLING_WINDOW = 28
+
+# Default horizon: one season (184 days, like March-August)
+HORIZON_DAYS = 184
+
+PERIODS = 4
+
+# Demand columns the fitted statistics depend on (hashed to detect changed history)
+SIGNATURE_COLUMNS = ['date_key', 'pickup_slot_id', 'station_id', 'equipment_id', 'qty_required']
+
+
+def date_keys_to_dates(date_keys):
+    """Convert integer YYYYMMDD date_keys to a DatetimeIndex"""
+    return pd.to_datetime(pd.Series(date_keys).astype(str), format='%Y%m%d')
+
+
+def dates_to_date_keys(dates):
+    """Convert dates to integer YYYYMMDD date_keys"""
+    dates = pd.DatetimeIndex(dates)
+    return (dates.year * 10000 + dates.month * 100 + dates.day).to_numpy()
+
+
+def build_daily_cube(fact_flight_demand, dim_time_slot, num_stations, num_equipment, start_date=None):
+    """Aggregate demand rows into a dense [day, period, station, equipment] cube
+
+    Days run from start_date (default: the first demand day) to the last demand day.
+    """
+    slot_period = np.zeros(dim_time_slot['slot_id'].max() + 1, dtype=np.int64)
+    slot_period[dim_time_slot['slot_id'].to_numpy()] = dim_time_slot['period_id'].to_numpy()
+
+    date_keys = np.sort(fact_flight_demand['date_key'].unique())
+    dates = date_keys_to_dates(date_keys)
+
+    # Keep every calendar day in range so days without demand count as zeros
+    all_dates = pd.date_range(dates.min() if start_date is None else start_date, dates.max(), freq='D')
+    day_index = pd.Index(dates_to_date_keys(all_dates)).get_indexer(fact_flight_demand['date_key'])
+
+    cube = np.zeros((len(all_dates), PERIODS, num_stations, num_equipment))
+    np.add.at(cube, (
+        day_index,
+        slot_period[fact_flight_demand['pickup_slot_id'].to_numpy()] - 1,
+        fact_flight_demand['station_id'].to_numpy() - 1,
+        fact_flight_demand['equipment_id'].to_numpy() - 1
+    ), fact_flight_demand['qty_required'].to_numpy())
+
+    return dates_to_date_keys(all_dates), cube
+
+
+def history_signature(fact_flight_demand, dim_time_slot, last_date_key):
+    """Content hash of the demand rows up to last_date_key and the slot->period mapping"""
+    rows = fact_flight_demand.loc[fact_flight_demand['date_key'] <= last_date_key, SIGNATURE_COLUMNS]
+    rows = rows.sort_values(SIGNATURE_COLUMNS).to_numpy(dtype=np.int64)
+    digest = hashlib.sha256(np.ascontiguousarray(rows).tobytes())
+    digest.update(dim_time_slot[['slot_id', 'period_id']].to_numpy(dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+class DemandForecastModel:
+    """Day-of-week x period x station x equipment profile with a rolling level adjustment"""
+
+    def __init__(self, num_stations, num_equipment):
+        shape = (7, PERIODS, num_stations, num_equipment)
+        self.sums = np.zeros(shape)
+        self.sumsq = np.zeros(shape)
+        self.day_counts = np.zeros(7)
+        self.recent_totals = np.zeros(0)
+        self.total_demand = 0.0
+        self.total_days = 0
+        self.last_date_key = 0
+        self.signature = ''
+
+    @property
+    def mean(self):
+        """Per day-of-week mean demand"""
+        return self.sums / np.maximum(self.day_counts, 1)[:, None, None, None]
+
+    @property
+    def std(self):
+        """Per day-of-week demand standard deviation"""
+        counts = np.maximum(self.day_counts, 1)[:, None, None, None]
+        variance = self.sumsq / counts - (self.sums / counts) ** 2
+        return np.sqrt(np.maximum(variance, 0.0))
+
+    @property
+    def level_factor(self):
+        """Recent rolling mean of daily demand relative to the long-run mean"""
+        if self.total_days == 0 or self.total_demand == 0 or len(self.recent_totals) == 0:
+            return 1.0
+        return self.recent_totals.mean() / (self.total_demand / self.total_days)
+
+    def update(self, date_keys, cube):
+        """Add new days to the sufficient statistics; days already fitted are skipped"""
+        new_days = date_keys > self.last_date_key
+        if not new_days.any():
+            return 0
+        date_keys = date_keys[new_days]
+        cube = cube[new_days]
+
+        day_of_week = date_keys_to_dates(date_keys).dt.dayofweek.to_numpy()
+        np.add.at(self.sums, day_of_week, cube)
+        np.add.at(self.sumsq, day_of_week, cube ** 2)
+        self.day_counts += np.bincount(day_of_week, minlength=7)
+
+        # Rolling window of daily totals for the level adjustment
+        daily_totals = cube.sum(axis=(1, 2, 3))
+        self.recent_totals = np.concatenate([self.recent_totals, daily_totals])[-ROLLING_WINDOW:]
+        self.total_demand += daily_totals.sum()
+        self.total_days += len(date_keys)
+        self.last_date_key = int(date_keys.max())
+        return len(date_keys)
+
+    def forecast(self, start_date, horizon_days=HORIZON_DAYS):
+        """Forward demand cube [day, period, station, equipment] for the horizon"""
+        dates = pd.date_range(start=start_date, periods=horizon_days, freq='D')
+        expected = self.mean[dates.dayofweek.to_numpy()] * self.level_factor
+        spread = self.std[dates.dayofweek.to_numpy()] * self.level_factor
+        return dates_to_date_keys(dates), expected, spread
+
+    def save(self, path=MODEL_PATH):
+        """Cache the fitted statistics to disk"""
+        np.savez_compressed(
+            path,
+            sums=self.sums,
+            sumsq=self.sumsq,
+            day_counts=self.day_counts,
+            recent_totals=self.recent_totals,
+            totals=np.array([self.total_demand, self.total_days, self.last_date_key], dtype=float),
+            dims=np.array(self.sums.shape[2:]),
+            signature=self.signature
+        )
+
+    @classmethod
+    def load(cls, path=MODEL_PATH, num_stations=None, num_equipment=None):
+        """Load cached statistics saved with save()
+
+        Raises ValueError when the cache lacks its dims/signature or was fitted for other
+        station/equipment dims than requested.
+        """
+        data = np.load(path)
+        if 'dims' not in data or 'signature' not in data:
+            raise ValueError(f"{path} has no dims/signature; refit")
+        dims = tuple(int(d) for d in data['dims'])
+        if dims != data['sums'].shape[2:] or (num_stations is not None and dims != (num_stations, num_equipment)):
+            raise ValueError(f"{path} was fitted for {dims[0]} stations x {dims[1]} equipment")
+        num_stations, num_equipment = dims
+        model = cls(num_stations, num_equipment)
+        model.sums = data['sums']
+        model.sumsq = data['sumsq']
+        model.day_counts = data['day_counts']
+        model.recent_totals = data['recent_totals']
+        model.total_demand = float(data['totals'][0])
+        model.total_days = int(data['totals'][1])
+        model.last_date_key = int(data['totals'][2])
+        model.signature = str(data['signature'])
+        return model
+
+
+def cube_to_frame(date_keys, expected, spread):
+    """Flatten a forecast cube into station/date/period/equipment rows with non-zero demand"""
+    day, period, station, equipment = np.nonzero(expected > 0)
+    return pd.DataFrame({
+        'station_id': station + 1,
+        'date_key': date_keys[day],
+        'period_id': period + 1,
+        'equipment_id': equipment + 1,
+        'demand_qty': np.rint(expected[day, period, station, equipment]).astype(int),
+        'demand_std': np.round(spread[day, period, station, equipment], 1)
+    }).sort_values(['date_key', 'period_id', 'station_id', 'equipment_id']).reset_index(drop=True)
+
+
+def fit_or_update(fact_flight_demand, dim_time_slot, num_stations, num_equipment, path=MODEL_PATH):
+    """Load the cached model and refit only days newer than its last fitted date
+
+    The cache is dropped and the model refitted from scratch when it was fitted for other
+    dims or the demand history it covers has changed (its signature no longer matches).
+    """
+    model = None
+    start_date = None
+    if os.path.exists(path):
+        try:
+            model = DemandForecastModel.load(path, num_stations, num_equipment)
+        except ValueError:
+            model = None
+        if model is not None and model.signature != history_signature(fact_flight_demand, dim_time_slot, model.last_date_key):
+            model = None
+    if model is None:
+        model = DemandForecastModel(num_stations, num_equipment)
+        new_rows = fact_flight_demand
+    else:
+        new_rows = fact_flight_demand[fact_flight_demand['date_key'] > model.last_date_key]
+        # Days without demand between the last fit and the new rows still count as zeros
+        start_date = date_keys_to_dates([model.last_date_key]).iloc[0] + pd.Timedelta(days=1)
+
+    added_days = 0
+    if len(new_rows) > 0:
+        date_keys, cube = build_daily_cube(new_rows, dim_time_slot, num_stations, num_equipment, start_date)
+        added_days = model.update(date_keys, cube)
+        model.signature = history_signature(fact_flight_demand, dim_time_slot, model.last_date_key)
+        model.save(path)
+    return model, added_days
+
+
+if __name__ == '__main__':
+    import time
+
+    # Load prerequisite files
+    fact_flight_demand = pd.read_csv('fact_flight_demand.csv')
+    dim_time_slot = pd.read_csv('dim_time_slot.csv')
+    dim_station = pd.read_csv('dim_station.csv')
+    dim_equipment = pd.read_csv('dim_equipment.csv')
+
+    start_time = time.perf_counter()
+
+    # Fit (or incrementally refit) and forecast the next season
+    model, added_days = fit_or_update(
+        fact_flight_demand, dim_time_slot,
+        dim_station['station_id'].max(), dim_equipment['equipment_id'].max()
+    )
+    next_day = date_keys_to_dates([model.last_date_key]).iloc[0] + pd.Timedelta(days=1)
+    date_keys, expected, spread = model.forecast(next_day)
+    forecast_station_demand = cube_to_frame(date_keys, expected, spread)
+
+    elapsed = time.perf_counter() - start_time
+
+    # Save to CSV
+    forecast_station_demand.to_csv(FORECAST_PATH, index=False, float_format='%.1f')
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nDays fitted this run: {added_days} (model covers {model.total_days} days up to {model.last_date_key})")
+    print(f"Level factor (last {ROLLING_WINDOW} days vs long-run): {model.level_factor:.3f}")
+    print(f"Forecast horizon: {date_keys.min()} to {date_keys.max()} ({len(date_keys)} days)")
+    print(f"Total row count: {len(forecast_station_demand):,}")
+    print(f"Fit + forecast time: {elapsed:.2f}s")
+
+    print("\nForecast daily demand by equipment:")
+    for equip_id, qty in forecast_station_demand.groupby('equipment_id')['demand_qty'].sum().items():
+        print(f"  equipment_id={equip_id}: {qty / len(date_keys):.1f} per day")
+
+    print("\n--- First 5 rows ---")
+    print(forecast_station_demand.head(5).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print(f"CSV file '{FORECAST_PATH}' created successfully!")
+    print("=" * 80)
@@ -0,0 +1,105 @@
+import pandas as pd
+
+# Load prerequisite files
+dim_station = pd.read_csv('dim_station.csv')
+dim_parking_stand = pd.read_csv('dim_parking_stand.csv')
+
+# Apron service roads (positions in metres, same grid as dim_station/dim_parking_stand)
+FRONT_ROAD_Y = 180   # one-way eastbound, between aircraft stands and equipment stations
+REAR_ROAD_Y = 400    # one-way westbound, behind the equipment stations
+JUNCTION_X = list(range(600, 4201, 200))
+ROAD_SPEED_KMH = 25
+LINK_SPEED_KMH = 10  # stand/station access links
+CROSS_LINK_X = [600, 1400, 2200, 3000, 4200]  # two-way connectors between the roads
+
+nodes = []
+edges = []
+
+
+def add_node(node_code, node_type, ref_id, x, y):
+    """Append a node and return its node_id"""
+    node_id = len(nodes) + 1
+    nodes.append({
+        'node_id': node_id,
+        'node_code': node_code,
+        'node_type': node_type,
+        'ref_id': ref_id,
+        'location_x': x,
+        'location_y': y
+    })
+    return node_id
+
+
+def add_edge(from_node, to_node, speed_kmh, one_way):
+    """Append a road segment with its straight-line length"""
+    a = nodes[from_node - 1]
+    b = nodes[to_node - 1]
+    length = ((a['location_x'] - b['location_x']) ** 2 + (a['location_y'] - b['location_y']) ** 2) ** 0.5
+    edges.append({
+        'edge_id': len(edges) + 1,
+        'from_node_id': from_node,
+        'to_node_id': to_node,
+        'length_m': round(length, 1),
+        'speed_kmh': speed_kmh,
+        'is_one_way': 'TRUE' if one_way else 'FALSE'
+    })
+
+
+# Road junctions
+front = {x: add_node(f'F{x}', 'junction', 0, x, FRONT_ROAD_Y) for x in JUNCTION_X}
+rear = {x: add_node(f'R{x}', 'junction', 0, x, REAR_ROAD_Y) for x in JUNCTION_X}
+
+for x1, x2 in zip(JUNCTION_X[:-1], JUNCTION_X[1:]):
+    add_edge(front[x1], front[x2], ROAD_SPEED_KMH, one_way=True)   # eastbound
+    add_edge(rear[x2], rear[x1], ROAD_SPEED_KMH, one_way=True)     # westbound
+
+for x in CROSS_LINK_X:
+    add_edge(front[x], rear[x], ROAD_SPEED_KMH, one_way=False)
+
+
+def nearest_junction(x):
+    """Road junction x closest to a location"""
+    return min(JUNCTION_X, key=lambda j: abs(j - x))
+
+
+# Equipment stations reach both roads, aircraft stands the front road
+for _, station in dim_station.iterrows():
+    node = add_node(f"S{station['stand_number']}", 'station', station['station_id'],
+                    station['location_x'], station['location_y'])
+    junction_x = nearest_junction(station['location_x'])
+    add_edge(node, front[junction_x], LINK_SPEED_KMH, one_way=False)
+    add_edge(node, rear[junction_x], LINK_SPEED_KMH, one_way=False)
+
+for _, stand in dim_parking_stand.iterrows():
+    node = add_node(f"P{stand['stand_code']}", 'parking_stand', stand['parking_stand_id'],
+                    stand['location_x'], stand['location_y'])
+    add_edge(node, front[nearest_junction(stand['location_x'])], LINK_SPEED_KMH, one_way=False)
+
+# Create DataFrames
+dim_apron_node = pd.DataFrame(nodes)
+dim_apron_edge = pd.DataFrame(edges)
+
+# Save to CSV
+dim_apron_node.to_csv('dim_apron_node.csv', index=False)
+dim_apron_edge.to_csv('dim_apron_edge.csv', index=False)
+
+# Validation
+print("=" * 80)
+print("VALIDATION REPORT")
+print("=" * 80)
+
+print(f"\nNodes: {len(dim_apron_node)}")
+for node_type, count in dim_apron_node['node_type'].value_counts().items():
+    print(f"  {node_type}: {count}")
+
+print(f"\nEdges: {len(dim_apron_edge)}")
+print(f"  One-way: {(dim_apron_edge['is_one_way'] == 'TRUE').sum()}")
+print(f"  Two-way: {(dim_apron_edge['is_one_way'] == 'FALSE').sum()}")
+print(f"  Total length: {dim_apron_edge['length_m'].sum() / 1000:.1f} km")
+
+print(f"\nAll stations connected: {dim_apron_node['node_type'].eq('station').sum() == len(dim_station)} ✓")
+print(f"All parking stands connected: {dim_apron_node['node_type'].eq('parking_stand').sum() == len(dim_parking_stand)} ✓")
+
+print("\n" + "=" * 80)
+print("CSV files 'dim_apron_node.csv' and 'dim_apron_edge.csv' created successfully!")
+print("=" * 80)
@@ -0,0 +1,100 @@
+import pandas as pd
+import numpy as np
+
+# Set seed for reproducibility
+rng = np.random.default_rng(42)
+
+# Load prerequisite files
+dim_station = pd.read_csv('dim_station.csv')
+dim_equipment = pd.read_csv('dim_equipment.csv')
+dim_date = pd.read_csv('dim_date.csv')
+
+EQUIPMENT_TYPES = [1, 2, 4, 6]  # 13C, 14P, 26-O, 26-C
+YEAR_START = pd.Timestamp(str(dim_date['date_key'].min()))
+YEAR_DAYS = len(dim_date)
+
+# Events per year: units sent to the workshop, stand closures, units on loan from the pool
+WORKSHOP_EVENTS = 240
+CLOSURE_EVENTS = 24
+LOAN_EVENTS = 30
+
+codes = dim_equipment.set_index('equipment_id')['asset_code']
+capacity = pd.DataFrame({
+    e: dim_station['capacity_' + codes[e].lower().replace('-', '')].to_numpy() for e in EQUIPMENT_TYPES
+}, index=dim_station['station_id'])
+
+# Station/equipment pairs that hold units
+pairs = capacity.stack()
+pairs = pairs[pairs > 0]
+
+events = []
+
+
+def add_event(station_id, equipment_id, start, hours, delta, reason):
+    """Append one effective-dated capacity delta over [start, start + hours)"""
+    events.append({
+        'calendar_id': len(events) + 1,
+        'station_id': int(station_id),
+        'equipment_id': int(equipment_id),
+        'effective_from': start,
+        'effective_to': start + pd.Timedelta(hours=int(hours)),
+        'capacity_delta': int(delta),
+        'reason': reason,
+        'is_active': 'TRUE'
+    })
+
+
+def random_start():
+    """Random whole hour within the year"""
+    return YEAR_START + pd.Timedelta(hours=int(rng.integers(0, YEAR_DAYS * 24)))
+
+
+# Workshop maintenance: 1-15% of a station's units out for 1-5 days
+for index in rng.integers(0, len(pairs), size=WORKSHOP_EVENTS):
+    (station_id, equipment_id), units = pairs.index[index], pairs.iloc[index]
+    delta = -max(1, int(round(units * rng.uniform(0.01, 0.15))))
+    add_event(station_id, equipment_id, random_start(), rng.integers(1, 6) * 24, delta, 'Workshop maintenance')
+
+# Stand closures (resurfacing, works): every equipment type at the station unavailable for 4-48 hours
+stations_with_units = pairs.index.get_level_values(0).unique()
+for station_id in rng.choice(stations_with_units, size=CLOSURE_EVENTS):
+    start, hours = random_start(), rng.integers(4, 49)
+    for equipment_id, units in pairs[station_id].items():
+        add_event(station_id, equipment_id, start, hours, -units, 'Stand closure')
+
+# Units on loan from the central pool for 1-2 weeks
+for index in rng.integers(0, len(pairs), size=LOAN_EVENTS):
+    (station_id, equipment_id), units = pairs.index[index], pairs.iloc[index]
+    delta = max(1, int(round(units * rng.uniform(0.05, 0.20))))
+    add_event(station_id, equipment_id, random_start(), rng.integers(7, 15) * 24, delta, 'Pool loan')
+
+# Create DataFrame, ordered by effective date
+dim_capacity_calendar = pd.DataFrame(events).sort_values(['effective_from', 'station_id', 'equipment_id'], kind='stable')
+dim_capacity_calendar['calendar_id'] = range(1, len(dim_capacity_calendar) + 1)
+
+# Save to CSV
+dim_capacity_calendar.to_csv('dim_capacity_calendar.csv', index=False, date_format='%Y-%m-%d %H:%M:%S')
+
+# Validation
+print("=" * 80)
+print("VALIDATION REPORT")
+print("=" * 80)
+
+print(f"\nTotal row count: {len(dim_capacity_calendar)}")
+print(f"Range: {dim_capacity_calendar['effective_from'].min()} to {dim_capacity_calendar['effective_to'].max()}")
+
+print("\nEvents by reason:")
+for reason, group in dim_capacity_calendar.groupby('reason'):
+    hours = (group['effective_to'] - group['effective_from']).dt.total_seconds() / 3600
+    print(f"  {reason}: {len(group)} rows, delta {group['capacity_delta'].min()} to {group['capacity_delta'].max()}, "
+          f"mean {hours.mean():.0f} h")
+
+print(f"\nOnly stations/equipment holding units: {dim_capacity_calendar.set_index(['station_id', 'equipment_id']).index.isin(pairs.index).all()} ✓")
+print(f"Intervals well formed: {(dim_capacity_calendar['effective_to'] > dim_capacity_calendar['effective_from']).all()} ✓")
+
+print("\n--- First 5 rows ---")
+print(dim_capacity_calendar.head(5).to_string(index=False))
+
+print("\n" + "=" * 80)
+print("CSV file 'dim_capacity_calendar.csv' created successfully!")
+print("=" * 80)
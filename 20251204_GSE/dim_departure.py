@@ -0,0 +1,98 @@
+import pandas as pd
+import numpy as np
+from arrival_sampler import slot_to_time
+from dim_flight import origins
+
+SLOTS_PER_DAY = 288
+
+# Ground time between an aircraft's arrival and its departure (minutes, inclusive range)
+TURNAROUND_MIN = {'Widebody': (120, 180), 'Narrowbody': (45, 75)}
+
+
+def generate_departures(dim_flight, dim_aircraft, seed=42):
+    """One departure per arriving aircraft once its turnaround is over, drawn for all flights at once
+
+    flight_id links the departure to the arrival of the same aircraft; a departure past
+    midnight falls on the next date. Loads are drawn as for arrivals.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(dim_flight)
+    widebody = (dim_flight['aircraft_category'] == 'Widebody').to_numpy()
+
+    low = np.where(widebody, TURNAROUND_MIN['Widebody'][0], TURNAROUND_MIN['Narrowbody'][0])
+    high = np.where(widebody, TURNAROUND_MIN['Widebody'][1], TURNAROUND_MIN['Narrowbody'][1])
+    turnaround_min = rng.integers(low, high + 1)
+
+    # Slots since the arrival date's midnight, split into a day offset and a slot of that day
+    departure = dim_flight['arrival_slot_id'].to_numpy() - 1 + np.ceil(turnaround_min / 5).astype(np.int64)
+    departure_slot_id = departure % SLOTS_PER_DAY + 1
+    dates = pd.to_datetime(dim_flight['date_key'].astype(str), format='%Y%m%d') + pd.to_timedelta(departure // SLOTS_PER_DAY, unit='D')
+    hours, minutes = slot_to_time(departure_slot_id)
+
+    # Passengers (70-95% load), bags (1.2-1.5 per pax), cargo (39% have actual data)
+    aircraft = dim_aircraft.set_index('aircraft_id').reindex(dim_flight['aircraft_id'])
+    estimated_pax = (aircraft['typical_pax'].to_numpy() * rng.uniform(0.70, 0.95, size=n)).astype(int)
+    estimated_bags = (estimated_pax * rng.uniform(1.2, 1.5, size=n)).astype(int)
+    has_cargo_data = rng.random(n) < 0.39
+    cargo_kg = np.where(has_cargo_data, np.round(aircraft['typical_cargo_kg'].to_numpy() * rng.uniform(0.30, 0.80, size=n), 1), 0.0)
+
+    # Outbound flight number is the inbound one plus one, as airlines pair them
+    flight_numbers = dim_flight['flight_number'].str[2:].astype(int) + 1
+
+    dim_departure = pd.DataFrame({
+        'flight_id': dim_flight['flight_id'].to_numpy(),
+        'flight_number': dim_flight['airline_code'] + flight_numbers.astype(str),
+        'airline_code': dim_flight['airline_code'].to_numpy(),
+        'aircraft_id': dim_flight['aircraft_id'].to_numpy(),
+        'aircraft_category': dim_flight['aircraft_category'].to_numpy(),
+        'destination_airport': rng.choice(origins, size=n),
+        'date_key': dates.dt.strftime('%Y%m%d').astype(int).to_numpy(),
+        'departure_time': [f"{h:02d}:{m:02d}:00" for h, m in zip(hours, minutes)],
+        'departure_slot_id': departure_slot_id,
+        'turnaround_min': turnaround_min,
+        'estimated_pax': estimated_pax,
+        'estimated_bags': estimated_bags,
+        'cargo_kg': cargo_kg,
+        'has_cargo_data': np.where(has_cargo_data, 'TRUE', 'FALSE'),
+        'is_active': 'TRUE'
+    })
+
+    # Sort by date_key, then departure slot
+    dim_departure = dim_departure.sort_values(['date_key', 'departure_slot_id', 'flight_id'], kind='stable').reset_index(drop=True)
+    dim_departure.insert(0, 'departure_id', range(1, n + 1))
+    return dim_departure
+
+
+if __name__ == '__main__':
+    # Load prerequisite files
+    dim_flight = pd.read_csv('dim_flight.csv')
+    dim_aircraft = pd.read_csv('dim_aircraft.csv')
+
+    dim_departure = generate_departures(dim_flight, dim_aircraft)
+
+    # Save to CSV
+    dim_departure.to_csv('dim_departure.csv', index=False, float_format='%.1f')
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nTotal row count: {len(dim_departure):,} (one per arrival: {len(dim_flight):,})")
+    print(f"Date range: {dim_departure['date_key'].min()} to {dim_departure['date_key'].max()}")
+    print(f"Departures after midnight of the arrival date: "
+          f"{(dim_departure['date_key'] > dim_flight.set_index('flight_id')['date_key'].reindex(dim_departure['flight_id']).to_numpy()).sum():,}")
+
+    print("\nTurnaround minutes by aircraft category:")
+    for category, group in dim_departure.groupby('aircraft_category'):
+        print(f"  {category}: {group['turnaround_min'].min()}-{group['turnaround_min'].max()}, mean {group['turnaround_min'].mean():.0f}")
+
+    print(f"\nEvery arrival departs once: {dim_departure['flight_id'].is_unique and set(dim_departure['flight_id']) == set(dim_flight['flight_id'])} ✓")
+
+    # Sample rows
+    print("\n--- First 5 rows ---")
+    print(dim_departure.head(5).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("CSV file 'dim_departure.csv' created successfully!")
+    print("=" * 80)
@@ -0,0 +1,42 @@
+import pandas as pd
+
+# Which equipment can stand in for which: units_per_unit substitute units cover one
+# required unit; lower preference_cost is tried first
+data = {
+    'substitution_id': [1, 2, 3],
+    'required_equipment_id': [4, 2, 3],      # 26-O, 14P, 20FT
+    'substitute_equipment_id': [6, 3, 2],    # 26-C, 20FT, 14P
+    'units_per_unit': [1, 1, 2],
+    'preference_cost': [1, 2, 3],
+    'description': [
+        'Closed trolley carries bulk baggage in place of an open trolley',
+        '20 FT dolly carries a single 10 FT pallet',
+        'Two 10 FT dollies carry a 20 FT load split over two pallets'
+    ],
+    'is_active': ['TRUE'] * 3
+}
+
+# Create DataFrame
+dim_equipment_substitution = pd.DataFrame(data)
+
+# Save to CSV
+dim_equipment_substitution.to_csv('dim_equipment_substitution.csv', index=False)
+
+# Validation
+print("=" * 80)
+print("VALIDATION REPORT")
+print("=" * 80)
+print(f"\nTotal row count: {len(dim_equipment_substitution)} (expected: 3)")
+
+print("\n--- All 3 rows ---")
+print(dim_equipment_substitution.to_string(index=False))
+
+dim_equipment = pd.read_csv('dim_equipment.csv')
+known = dim_equipment['equipment_id']
+print(f"\nAll equipment ids in dim_equipment: "
+      f"{(dim_equipment_substitution['required_equipment_id'].isin(known) & dim_equipment_substitution['substitute_equipment_id'].isin(known)).all()} ✓")
+print(f"No self-substitution: {(dim_equipment_substitution['required_equipment_id'] != dim_equipment_substitution['substitute_equipment_id']).all()} ✓")
+
+print("\n" + "=" * 80)
+print("CSV file 'dim_equipment_substitution.csv' created successfully!")
+print("=" * 80)
@@ -2,17 +2,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
-
-# Set seed for reproducibility
-np.random.seed(42)
-random.seed(42)
-
-# Load prerequisite files
-dim_aircraft = pd.read_csv('dim_aircraft.csv')
-dim_time_slot = pd.read_csv('dim_time_slot.csv')
-
-# Create aircraft lookup
-aircraft_lookup = dim_aircraft.set_index('aircraft_id').to_dict('index')
+import os
+from arrival_sampler import ArrivalProfileSampler, slot_to_time
+from flight_rotation import (
+    FLIGHT_NUMBER_RANGE, build_weekly_pattern, expand_pattern, perturb_slots, draw_operating, broadcast_to_dates
+)
+from jit_kernels import unique_flight_numbers
 
 # Airlines with revenue-based weights
 airlines = [
@@ -51,6 +46,16 @@ time_periods = [
     (20, 6, 0.15)    # Night (wraps midnight)
 ]
 
+# Optional learned arrival profile (see arrival_sampler.py)
+ARRIVAL_PROFILE_PATH = 'arrival_profile.npz'
+
+# Schedule model: 'daily' redraws every flight each day, 'rotation' expands a weekly pattern
+SCHEDULE_MODEL = 'daily'
+FLIGHTS_PER_DAY = 80  # average flights per day for the rotation pattern
+
+# Pre-drawn flight number candidates per flight in the daily model
+FLIGHT_NUMBER_CANDIDATES = 4
+
 def get_aircraft_for_airline(airline_code):
     """Select aircraft based on airline rules"""
     widebody_ids = [1, 2, 3, 4, 5, 6]  # A380, B777, B747, A350, B787, A330
@@ -74,164 +79,236 @@ def get_aircraft_for_airline(airline_code):
         else:
             return random.choice(narrowbody_ids)
 
-def generate_arrival_time():
-    """Generate arrival time based on peak period distribution"""
-    period_start, period_end, _ = random.choices(
-        [(p[0], p[1], p[2]) for p in time_periods],
-        weights=[p[2] for p in time_periods],
-        k=1
-    )[0]
-    
-    if period_end < period_start:  # Night period wraps
-        if random.random() < 0.5:
-            hour = random.randint(period_start, 23)
-        else:
-            hour = random.randint(0, period_end - 1)
-    else:
-        hour = random.randint(period_start, period_end - 1)
-    
-    minute = random.choice([0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55])
-    return hour, minute
-
 def calculate_slot_id(hour, minute):
     """Calculate slot_id from time"""
     return (hour * 12) + (minute // 5) + 1
 
-# Generate flights
-flights = []
-flight_id = 1
-
-# Date range: March 1 to August 31, 2025
-start_date = datetime(2025, 3, 1)
-end_date = datetime(2025, 8, 31)
-current_date = start_date
+def load_arrival_sampler(path=ARRIVAL_PROFILE_PATH):
+    """Arrival slot sampler, built once (use a fitted profile when one is available)"""
+    if os.path.exists(path):
+        return ArrivalProfileSampler.load(path)
+    return ArrivalProfileSampler.from_periods(time_periods)
 
-while current_date <= end_date:
-    date_key = int(current_date.strftime('%Y%m%d'))
+def generate_rotation_schedule(start_date, end_date, dim_aircraft, arrival_sampler, rng, flights_per_day=FLIGHTS_PER_DAY):
+    """Expand a weekly rotation pattern across the season with per-day perturbations
     
-    # Random flights per day (75-85)
-    num_flights = random.randint(75, 85)
+    Returns the expanded schedule and the compact weekly pattern.
+    """
+    pattern = build_weekly_pattern(
+        airlines, get_aircraft_for_airline, arrival_sampler, origins, flights_per_day, rng
+    )
+    rotation_index, date_keys, _ = expand_pattern(pattern, start_date, end_date)
     
-    # Track used flight numbers per airline
-    used_flight_numbers = {airline[0]: set() for airline in airlines}
+    # Cancel a few instances, jitter the rest around their scheduled slot
+    operated = draw_operating(len(rotation_index), rng)
+    rotation_index = rotation_index[operated]
+    date_keys = date_keys[operated]
+    arrival_slot_ids = perturb_slots(broadcast_to_dates(pattern['base_slot_id'], rotation_index), rng)
+    hours, minutes = slot_to_time(arrival_slot_ids)
     
-    for _ in range(num_flights):
-        # Select airline
-        airline_code, airline_name, _ = random.choices(
-            [(a[0], a[1], a[2]) for a in airlines],
-            weights=[a[2] for a in airlines],
-            k=1
-        )[0]
-        
-        # Generate unique flight number
-        while True:
-            flight_num = random.randint(100, 9999)
-            if flight_num not in used_flight_numbers[airline_code]:
-                used_flight_numbers[airline_code].add(flight_num)
-                break
-        
-        flight_number = f"{airline_code}{flight_num}"
-        
-        # Select aircraft
-        aircraft_id = get_aircraft_for_airline(airline_code)
-        aircraft_info = aircraft_lookup[aircraft_id]
-        
-        # Generate arrival time
-        hour, minute = generate_arrival_time()
-        arrival_time = f"{hour:02d}:{minute:02d}:00"
-        arrival_slot_id = calculate_slot_id(hour, minute)
+    # Aircraft attributes are looked up once per rotation and broadcast
+    rotation_aircraft = dim_aircraft.set_index('aircraft_id').loc[pattern['aircraft_id']]
+    typical_pax = broadcast_to_dates(rotation_aircraft['typical_pax'], rotation_index)
+    typical_cargo_kg = broadcast_to_dates(rotation_aircraft['typical_cargo_kg'], rotation_index)
+    
+    # Passengers (70-95% load), bags (1.2-1.5 per pax), cargo (39% have actual data)
+    n = len(rotation_index)
+    estimated_pax = (typical_pax * rng.uniform(0.70, 0.95, size=n)).astype(int)
+    estimated_bags = (estimated_pax * rng.uniform(1.2, 1.5, size=n)).astype(int)
+    has_cargo_data = rng.random(n) < 0.39
+    cargo_kg = np.where(has_cargo_data, np.round(typical_cargo_kg * rng.uniform(0.30, 0.80, size=n), 1), 0.0)
+    
+    dim_flight = pd.DataFrame({
+        'flight_id': np.arange(1, n + 1),
+        'flight_number': broadcast_to_dates(pattern['flight_number'], rotation_index),
+        'airline_code': broadcast_to_dates(pattern['airline_code'], rotation_index),
+        'airline_name': broadcast_to_dates(pattern['airline_name'], rotation_index),
+        'aircraft_id': broadcast_to_dates(pattern['aircraft_id'], rotation_index),
+        'aircraft_series': broadcast_to_dates(rotation_aircraft['aircraft_series'], rotation_index),
+        'aircraft_category': broadcast_to_dates(rotation_aircraft['aircraft_category'], rotation_index),
+        'origin_airport': broadcast_to_dates(pattern['origin_airport'], rotation_index),
+        'date_key': date_keys,
+        'arrival_time': [f"{h:02d}:{m:02d}:00" for h, m in zip(hours, minutes)],
+        'arrival_slot_id': arrival_slot_ids,
+        'estimated_pax': estimated_pax,
+        'estimated_bags': estimated_bags,
+        'cargo_kg': cargo_kg,
+        'has_cargo_data': np.where(has_cargo_data, 'TRUE', 'FALSE'),
+        'is_active': 'TRUE',
+        'rotation_id': broadcast_to_dates(pattern['rotation_id'], rotation_index)
+    })
+    return dim_flight, pattern
+
+def generate_daily_schedule(start_date, end_date, dim_aircraft, arrival_sampler, rng, flights_per_day=(75, 85)):
+    """Redraw every flight of every day (flights_per_day is an inclusive (min, max) range)"""
+    aircraft_lookup = dim_aircraft.set_index('aircraft_id').to_dict('index')
+    airline_weights = [a[2] for a in airlines]
+    airline_index = {a[0]: i for i, a in enumerate(airlines)}
+    flights = []
+    flight_id = 1
+    current_date = start_date
+    
+    while current_date <= end_date:
+        date_key = int(current_date.strftime('%Y%m%d'))
         
-        # Select origin
-        origin_airport = random.choice(origins)
+        # Random flights per day
+        num_flights = random.randint(*flights_per_day)
         
-        # Calculate passengers (70-95% load)
-        load_factor = random.uniform(0.70, 0.95)
-        estimated_pax = int(aircraft_info['typical_pax'] * load_factor)
+        # Select airlines for the whole day
+        day_airlines = random.choices(airlines, weights=airline_weights, k=num_flights)
         
-        # Calculate bags (1.2-1.5 per pax)
-        bags_per_pax = random.uniform(1.2, 1.5)
-        estimated_bags = int(estimated_pax * bags_per_pax)
+        # Draw all arrival slots for the day in one call
+        arrival_slots = arrival_sampler.sample(
+            airline_codes=[a[0] for a in day_airlines],
+            days_of_week=current_date.isoweekday(),
+            rng=rng
+        )
+        arrival_hours, arrival_minutes = slot_to_time(arrival_slots)
         
-        # Cargo (39% have actual data)
-        has_cargo_data = random.random() < 0.39
-        if has_cargo_data:
-            cargo_factor = random.uniform(0.30, 0.80)
-            cargo_kg = round(aircraft_info['typical_cargo_kg'] * cargo_factor, 1)
-        else:
-            cargo_kg = 0.0
+        # Flight numbers unique per airline for the day, from pre-drawn candidates
+        low, high = FLIGHT_NUMBER_RANGE
+        day_flight_nums = unique_flight_numbers(
+            np.array([airline_index[a[0]] for a in day_airlines], dtype=np.int64),
+            rng.integers(low, high + 1, size=(num_flights, FLIGHT_NUMBER_CANDIDATES)),
+            low, high, len(airlines)
+        )
         
-        flights.append({
-            'flight_id': flight_id,
-            'flight_number': flight_number,
-            'airline_code': airline_code,
-            'airline_name': airline_name,
-            'aircraft_id': aircraft_id,
-            'aircraft_series': aircraft_info['aircraft_series'],
-            'aircraft_category': aircraft_info['aircraft_category'],
-            'origin_airport': origin_airport,
-            'date_key': date_key,
-            'arrival_time': arrival_time,
-            'arrival_slot_id': arrival_slot_id,
-            'estimated_pax': estimated_pax,
-            'estimated_bags': estimated_bags,
-            'cargo_kg': cargo_kg,
-            'has_cargo_data': 'TRUE' if has_cargo_data else 'FALSE',
-            'is_active': 'TRUE'
-        })
+        for (airline_code, airline_name, _), hour, minute, flight_num in zip(
+            day_airlines, arrival_hours, arrival_minutes, day_flight_nums.tolist()
+        ):
+            flight_number = f"{airline_code}{flight_num}"
+            
+            # Select aircraft
+            aircraft_id = get_aircraft_for_airline(airline_code)
+            aircraft_info = aircraft_lookup[aircraft_id]
+            
+            # Arrival time from sampled slot
+            arrival_time = f"{hour:02d}:{minute:02d}:00"
+            arrival_slot_id = calculate_slot_id(hour, minute)
+            
+            # Select origin
+            origin_airport = random.choice(origins)
+            
+            # Calculate passengers (70-95% load)
+            load_factor = random.uniform(0.70, 0.95)
+            estimated_pax = int(aircraft_info['typical_pax'] * load_factor)
+            
+            # Calculate bags (1.2-1.5 per pax)
+            bags_per_pax = random.uniform(1.2, 1.5)
+            estimated_bags = int(estimated_pax * bags_per_pax)
+            
+            # Cargo (39% have actual data)
+            has_cargo_data = random.random() < 0.39
+            if has_cargo_data:
+                cargo_factor = random.uniform(0.30, 0.80)
+                cargo_kg = round(aircraft_info['typical_cargo_kg'] * cargo_factor, 1)
+            else:
+                cargo_kg = 0.0
+            
+            flights.append({
+                'flight_id': flight_id,
+                'flight_number': flight_number,
+                'airline_code': airline_code,
+                'airline_name': airline_name,
+                'aircraft_id': aircraft_id,
+                'aircraft_series': aircraft_info['aircraft_series'],
+                'aircraft_category': aircraft_info['aircraft_category'],
+                'origin_airport': origin_airport,
+                'date_key': date_key,
+                'arrival_time': arrival_time,
+                'arrival_slot_id': arrival_slot_id,
+                'estimated_pax': estimated_pax,
+                'estimated_bags': estimated_bags,
+                'cargo_kg': cargo_kg,
+                'has_cargo_data': 'TRUE' if has_cargo_data else 'FALSE',
+                'is_active': 'TRUE'
+            })
+            
+            flight_id += 1
         
-        flight_id += 1
+        current_date += timedelta(days=1)
+    
+    return pd.DataFrame(flights)
+
+def generate_flights(start_date=datetime(2025, 3, 1), end_date=datetime(2025, 8, 31), dim_aircraft=None,
+                     flights_per_day=(75, 85), seed=42, schedule_model=SCHEDULE_MODEL, arrival_sampler=None):
+    """dim_flight for the season, sorted and renumbered; also the weekly pattern in rotation mode"""
+    # Set seed for reproducibility
+    np.random.seed(seed)
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    
+    if dim_aircraft is None:
+        dim_aircraft = pd.read_csv('dim_aircraft.csv')
+    if arrival_sampler is None:
+        arrival_sampler = load_arrival_sampler()
+    
+    pattern = None
+    if schedule_model == 'rotation':
+        dim_flight, pattern = generate_rotation_schedule(
+            start_date, end_date, dim_aircraft, arrival_sampler, rng, round(sum(flights_per_day) / 2)
+        )
+    else:
+        dim_flight = generate_daily_schedule(start_date, end_date, dim_aircraft, arrival_sampler, rng, flights_per_day)
+    
+    # Sort by date_key, then arrival_time
+    dim_flight = dim_flight.sort_values(['date_key', 'arrival_time']).reset_index(drop=True)
+    dim_flight['flight_id'] = range(1, len(dim_flight) + 1)
+    return dim_flight, pattern
+
+if __name__ == '__main__':
+    # Date range: March 1 to August 31, 2025
+    start_date = datetime(2025, 3, 1)
+    end_date = datetime(2025, 8, 31)
+    
+    dim_flight, pattern = generate_flights(start_date, end_date)
     
-    current_date += timedelta(days=1)
-
-# Create DataFrame
-dim_flight = pd.DataFrame(flights)
-
-# Sort by date_key, then arrival_time
-dim_flight = dim_flight.sort_values(['date_key', 'arrival_time']).reset_index(drop=True)
-dim_flight['flight_id'] = range(1, len(dim_flight) + 1)
-
-# Save to CSV
-dim_flight.to_csv('dim_flight.csv', index=False, float_format='%.1f')
-
-# Validation
-print("=" * 80)
-print("VALIDATION REPORT")
-print("=" * 80)
-
-print(f"\nTotal row count: {len(dim_flight):,}")
-print(f"Date range: {dim_flight['date_key'].min()} to {dim_flight['date_key'].max()}")
-days = (end_date - start_date).days + 1
-print(f"Number of days: {days}")
-print(f"Average flights per day: {len(dim_flight) / days:.1f}")
-
-# Airline distribution
-print("\nTop 5 airlines by flight count:")
-airline_dist = dim_flight['airline_code'].value_counts().head(5)
-for code, count in airline_dist.items():
-    name = next(a[1] for a in airlines if a[0] == code)
-    pct = count / len(dim_flight) * 100
-    print(f"  {code} ({name}): {count:,} ({pct:.1f}%)")
-
-# Aircraft category
-widebody_pct = (dim_flight['aircraft_category'] == 'Widebody').sum() / len(dim_flight) * 100
-narrowbody_pct = (dim_flight['aircraft_category'] == 'Narrowbody').sum() / len(dim_flight) * 100
-print(f"\nAircraft category split:")
-print(f"  Widebody: {widebody_pct:.1f}%")
-print(f"  Narrowbody: {narrowbody_pct:.1f}%")
-
-# Cargo data
-cargo_pct = (dim_flight['has_cargo_data'] == 'TRUE').sum() / len(dim_flight) * 100
-print(f"\nhas_cargo_data distribution:")
-print(f"  TRUE: {cargo_pct:.1f}%")
-print(f"  FALSE: {100 - cargo_pct:.1f}%")
-
-# Sample rows
-print("\n--- First 5 rows ---")
-print(dim_flight.head(5).to_string(index=False))
-
-print("\n--- Last 5 rows ---")
-print(dim_flight.tail(5).to_string(index=False))
-
-print("\n" + "=" * 80)
-print("CSV file 'dim_flight.csv' created successfully!")
-print("=" * 80)
\ No newline at end of file
+    # Compact pattern is kept alongside the expanded schedule
+    if pattern is not None:
+        pattern.to_csv('dim_flight_rotation.csv', index=False)
+    
+    # Save to CSV
+    dim_flight.to_csv('dim_flight.csv', index=False, float_format='%.1f')
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nTotal row count: {len(dim_flight):,}")
+    print(f"Date range: {dim_flight['date_key'].min()} to {dim_flight['date_key'].max()}")
+    days = (end_date - start_date).days + 1
+    print(f"Number of days: {days}")
+    print(f"Average flights per day: {len(dim_flight) / days:.1f}")
+
+    # Airline distribution
+    print("\nTop 5 airlines by flight count:")
+    airline_dist = dim_flight['airline_code'].value_counts().head(5)
+    for code, count in airline_dist.items():
+        name = next(a[1] for a in airlines if a[0] == code)
+        pct = count / len(dim_flight) * 100
+        print(f"  {code} ({name}): {count:,} ({pct:.1f}%)")
+
+    # Aircraft category
+    widebody_pct = (dim_flight['aircraft_category'] == 'Widebody').sum() / len(dim_flight) * 100
+    narrowbody_pct = (dim_flight['aircraft_category'] == 'Narrowbody').sum() / len(dim_flight) * 100
+    print(f"\nAircraft category split:")
+    print(f"  Widebody: {widebody_pct:.1f}%")
+    print(f"  Narrowbody: {narrowbody_pct:.1f}%")
+
+    # Cargo data
+    cargo_pct = (dim_flight['has_cargo_data'] == 'TRUE').sum() / len(dim_flight) * 100
+    print(f"\nhas_cargo_data distribution:")
+    print(f"  TRUE: {cargo_pct:.1f}%")
+    print(f"  FALSE: {100 - cargo_pct:.1f}%")
+
+    # Sample rows
+    print("\n--- First 5 rows ---")
+    print(dim_flight.head(5).to_string(index=False))
+
+    print("\n--- Last 5 rows ---")
+    print(dim_flight.tail(5).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("CSV file 'dim_flight.csv' created successfully!")
+    print("=" * 80)
\ No newline at end of file
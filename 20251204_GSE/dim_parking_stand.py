@@ -0,0 +1,38 @@
+import pandas as pd
+
+# Aircraft parking stands on the apron (positions in metres, same grid as dim_station)
+widebody_x = [760, 920, 1080, 1240, 1400, 1560, 1720, 1880, 2040]
+narrowbody_x = [2240, 2400, 2560, 2720, 2880, 3040, 3200, 3360, 3520, 3680, 3840, 4000]
+
+data = {
+    'parking_stand_id': list(range(1, len(widebody_x) + len(narrowbody_x) + 1)),
+    'stand_code': [f'W{i + 1}' for i in range(len(widebody_x))] + [f'N{i + 1}' for i in range(len(narrowbody_x))],
+    'aircraft_category': ['Widebody'] * len(widebody_x) + ['Narrowbody'] * len(narrowbody_x),
+    'location_x': widebody_x + narrowbody_x,
+    'location_y': [80] * len(widebody_x) + [100] * len(narrowbody_x),
+    'is_contact_stand': ['TRUE'] * 6 + ['FALSE'] * 3 + ['TRUE'] * 8 + ['FALSE'] * 4,
+    'is_active': ['TRUE'] * (len(widebody_x) + len(narrowbody_x))
+}
+
+# Create DataFrame
+dim_parking_stand = pd.DataFrame(data)
+
+# Save to CSV
+dim_parking_stand.to_csv('dim_parking_stand.csv', index=False)
+
+# Validation
+print("=" * 80)
+print("VALIDATION REPORT")
+print("=" * 80)
+print(f"\nTotal row count: {len(dim_parking_stand)} (expected: 21)")
+
+print("\n--- All rows ---")
+print(dim_parking_stand.to_string(index=False))
+
+print(f"\nWidebody stands: {(dim_parking_stand['aircraft_category'] == 'Widebody').sum()} (expected: 9)")
+print(f"Narrowbody stands: {(dim_parking_stand['aircraft_category'] == 'Narrowbody').sum()} (expected: 12)")
+print(f"All is_active = TRUE: {(dim_parking_stand['is_active'] == 'TRUE').all()} ✓")
+
+print("\n" + "=" * 80)
+print("CSV file 'dim_parking_stand.csv' created successfully!")
+print("=" * 80)
@@ -34,6 +34,9 @@ data = {
     'capacity_26o': [0, 0, 0, 100, 20, 30, 40, 45, 25, 50],
     'capacity_40ft': [0, 0, 0, 0, 0, 0, 0, 1, 0, 0],
     'capacity_26c': [0, 0, 0, 50, 10, 15, 20, 25, 12, 30],
+    # Apron position in metres (x along the stand line, y away from the terminal)
+    'location_x': [2440, 3120, 2720, 3960, 840, 1000, 1280, 1640, 1720, 1880],
+    'location_y': [260, 320, 260, 300, 240, 300, 240, 260, 300, 240],
     'is_storage_location': ['TRUE', 'FALSE', 'TRUE', 'TRUE', 'TRUE', 'TRUE', 'TRUE', 'TRUE', 'TRUE', 'TRUE'],
     'is_active': ['TRUE'] * 10
 }
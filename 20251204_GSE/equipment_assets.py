@@ -0,0 +1,267 @@
+import pandas as pd
+import numpy as np
+from interval_allocation import absolute_demand_times
+
+SLOTS_PER_DAY = 288
+
+# Unit status codes
+STATUS_IDLE = 0
+STATUS_IN_USE = 1
+STATUS_IN_TRANSIT = 2
+STATUS_MAINTENANCE = 3
+STATUS_NAMES = ['Idle', 'In-Use', 'In-Transit', 'Maintenance']
+
+# Share of each fleet held in the workshop at the start
+MAINTENANCE_SHARE = 0.03
+
+# One record per physical unit; unit_id is dense so unit X lives at row X - 1
+UNIT_DTYPE = np.dtype([
+    ('unit_id', np.int32),
+    ('equipment_id', np.int8),
+    ('station_id', np.int16),   # 0 = not stationed (no capacity for this type anywhere)
+    ('status', np.int8),
+    ('last_flight_id', np.int32),
+    ('last_date_key', np.int32),
+    ('last_slot_id', np.int16)
+])
+
+# Replay event types, in processing order within a slot
+EVENT_RETURN = 0
+EVENT_ARRIVE = 1
+EVENT_DISPATCH = 2
+EVENT_PICKUP = 3
+
+
+def split_by_capacity(total, capacities):
+    """Largest-remainder split of `total` units proportionally to station capacities"""
+    capacities = np.asarray(capacities, dtype=float)
+    if capacities.sum() == 0:
+        return np.zeros(len(capacities), dtype=np.int64)
+    share = total * capacities / capacities.sum()
+    counts = np.floor(share).astype(np.int64)
+    remainder = total - counts.sum()
+    counts[np.argsort(-(share - counts), kind='stable')[:remainder]] += 1
+    return counts
+
+
+class EquipmentFleet:
+    """Array-backed per-unit state with O(1) location and per-station status counts"""
+
+    def __init__(self, units, num_stations, num_equipment):
+        self.units = units
+        self.counts = np.zeros((num_stations + 1, num_equipment + 1, len(STATUS_NAMES)), dtype=np.int32)
+        np.add.at(self.counts, (units['station_id'], units['equipment_id'], units['status']), 1)
+
+        # Idle units per (station, equipment) as stacks for O(1) pickup
+        self.idle = {}
+        for unit in units[units['status'] == STATUS_IDLE]:
+            self.idle.setdefault((int(unit['station_id']), int(unit['equipment_id'])), []).append(int(unit['unit_id']))
+
+    @classmethod
+    def from_dimensions(cls, dim_equipment, dim_station, maintenance_share=MAINTENANCE_SHARE):
+        """Place units_in_operation at stations in proportion to their capacity"""
+        blocks = []
+        for _, equipment in dim_equipment.iterrows():
+            column = 'capacity_' + equipment['asset_code'].lower().replace('-', '')
+            per_station = split_by_capacity(equipment['units_in_operation'], dim_station[column])
+            station_ids = np.repeat(dim_station['station_id'].to_numpy(), per_station)
+            unplaced = equipment['units_in_operation'] - len(station_ids)
+            station_ids = np.concatenate([station_ids, np.zeros(unplaced, dtype=np.int64)])
+
+            block = np.zeros(len(station_ids), dtype=UNIT_DTYPE)
+            block['equipment_id'] = equipment['equipment_id']
+            block['station_id'] = station_ids
+
+            # Every n-th unit starts in the workshop
+            if maintenance_share > 0:
+                block['status'][::max(1, int(round(1 / maintenance_share)))] = STATUS_MAINTENANCE
+            blocks.append(block)
+
+        units = np.concatenate(blocks)
+        units['unit_id'] = np.arange(1, len(units) + 1)
+        return cls(units, dim_station['station_id'].max(), dim_equipment['equipment_id'].max())
+
+    def where(self, unit_id):
+        """(station_id, status name) of a unit"""
+        unit = self.units[unit_id - 1]
+        return int(unit['station_id']), STATUS_NAMES[unit['status']]
+
+    def count(self, station_id, equipment_id, status=STATUS_IDLE):
+        """Number of units of a type at a station in a status"""
+        return int(self.counts[station_id, equipment_id, status])
+
+    def _set_status(self, unit_ids, station_id, status):
+        rows = np.asarray(unit_ids) - 1
+        units = self.units[rows]
+        np.subtract.at(self.counts, (units['station_id'], units['equipment_id'], units['status']), 1)
+        self.units['station_id'][rows] = station_id
+        self.units['status'][rows] = status
+        np.add.at(self.counts, (np.full(len(rows), station_id), units['equipment_id'], np.full(len(rows), status)), 1)
+
+    def pickup(self, station_id, equipment_id, qty, flight_id, date_key, slot_id):
+        """Take up to qty idle units for a flight; returns the unit_ids taken"""
+        stack = self.idle.get((station_id, equipment_id), [])
+        take = min(qty, len(stack))
+        if take == 0:
+            return []
+        unit_ids = stack[-take:]
+        del stack[-take:]
+
+        self._set_status(unit_ids, station_id, STATUS_IN_USE)
+        rows = np.asarray(unit_ids) - 1
+        self.units['last_flight_id'][rows] = flight_id
+        self.units['last_date_key'][rows] = date_key
+        self.units['last_slot_id'][rows] = slot_id
+        return unit_ids
+
+    def release(self, unit_ids, station_id):
+        """Return in-use or in-transit units as idle at a station"""
+        if len(unit_ids) == 0:
+            return
+        self._set_status(unit_ids, station_id, STATUS_IDLE)
+        equipment_id = int(self.units['equipment_id'][unit_ids[0] - 1])
+        self.idle.setdefault((station_id, equipment_id), []).extend(unit_ids)
+
+    def dispatch(self, from_station_id, to_station_id, equipment_id, qty):
+        """Move up to qty idle units into transit; returns the unit_ids moved"""
+        stack = self.idle.get((from_station_id, equipment_id), [])
+        take = min(qty, len(stack))
+        if take == 0:
+            return []
+        unit_ids = stack[-take:]
+        del stack[-take:]
+        self._set_status(unit_ids, from_station_id, STATUS_IN_TRANSIT)
+        return unit_ids
+
+    def snapshot(self):
+        """Current unit states as a DataFrame"""
+        frame = pd.DataFrame(self.units)
+        frame['status'] = np.asarray(STATUS_NAMES)[self.units['status']]
+        return frame
+
+
+def period_start_slots(dim_peak_period):
+    """{period_id: first 5-minute slot_id} from dim_peak_period start_time (moves must arrive by then)"""
+    start = pd.to_timedelta(dim_peak_period['start_time']).dt.total_seconds().to_numpy() // 300
+    return dict(zip(dim_peak_period['period_id'], start.astype(np.int64) + 1))
+
+
+def build_events(fact_flight_demand, fact_replenishment, period_start_slot):
+    """Pickup/return/move events as parallel arrays ordered by absolute slot"""
+    first_date = pd.to_datetime(str(min(
+        fact_flight_demand['date_key'].min(),
+        fact_replenishment['date_key'].min() if len(fact_replenishment) else fact_flight_demand['date_key'].min()
+    )), format='%Y%m%d')
+
+    def day_index(date_keys):
+        return (pd.to_datetime(date_keys.astype(str), format='%Y%m%d') - first_date).dt.days.to_numpy()
+
+    # Demand rows, with pickup/return wrapped across midnight
+    pickup_time, return_time = absolute_demand_times(
+        fact_flight_demand['date_key'], fact_flight_demand['arrival_slot_id'],
+        fact_flight_demand['pickup_slot_id'], fact_flight_demand['return_slot_id'],
+        first_date_key=first_date.strftime('%Y%m%d')
+    )
+    demand_rows = np.arange(len(fact_flight_demand))
+
+    # Replenishment moves leave estimated_time_min before their period starts
+    move_day = day_index(fact_replenishment['date_key'])
+    period_start = fact_replenishment['before_period_id'].map(period_start_slot).to_numpy()
+    lead_slots = np.ceil(fact_replenishment['estimated_time_min'].to_numpy() / 5).astype(np.int64)
+    arrive_time = move_day * SLOTS_PER_DAY + period_start
+    dispatch_time = arrive_time - lead_slots
+    move_rows = np.arange(len(fact_replenishment))
+
+    times = np.concatenate([return_time, pickup_time, arrive_time, dispatch_time])
+    kinds = np.concatenate([
+        np.full(len(demand_rows), EVENT_RETURN), np.full(len(demand_rows), EVENT_PICKUP),
+        np.full(len(move_rows), EVENT_ARRIVE), np.full(len(move_rows), EVENT_DISPATCH)
+    ])
+    rows = np.concatenate([demand_rows, demand_rows, move_rows, move_rows])
+
+    order = np.lexsort((rows, kinds, times))
+    return times[order], kinds[order], rows[order]
+
+
+def replay(fleet, fact_flight_demand, fact_replenishment, period_start_slot):
+    """Apply a year of demand pickups/returns and replenishment moves to the fleet"""
+    times, kinds, rows = build_events(fact_flight_demand, fact_replenishment, period_start_slot)
+
+    # Plain Python lists are much faster than per-row pandas access in the event loop
+    demand = {c: fact_flight_demand[c].tolist() for c in
+              ['flight_id', 'date_key', 'station_id', 'equipment_id', 'qty_allocated', 'pickup_slot_id']}
+    moves = {c: fact_replenishment[c].tolist() for c in
+             ['from_station_id', 'to_station_id', 'equipment_id', 'qty_to_move']}
+
+    in_use = {}
+    in_transit = {}
+    short_units = 0
+    for kind, row in zip(kinds.tolist(), rows.tolist()):
+        if kind == EVENT_PICKUP:
+            unit_ids = fleet.pickup(
+                demand['station_id'][row], demand['equipment_id'][row], demand['qty_allocated'][row],
+                demand['flight_id'][row], demand['date_key'][row], demand['pickup_slot_id'][row]
+            )
+            short_units += demand['qty_allocated'][row] - len(unit_ids)
+            in_use[row] = unit_ids
+        elif kind == EVENT_RETURN:
+            fleet.release(in_use.pop(row, []), demand['station_id'][row])
+        elif kind == EVENT_DISPATCH:
+            in_transit[row] = fleet.dispatch(
+                moves['from_station_id'][row], moves['to_station_id'][row],
+                moves['equipment_id'][row], moves['qty_to_move'][row]
+            )
+        else:
+            fleet.release(in_transit.pop(row, []), moves['to_station_id'][row])
+
+    return len(times), short_units
+
+
+if __name__ == '__main__':
+    import time
+
+    # Load prerequisite files
+    dim_equipment = pd.read_csv('dim_equipment.csv')
+    dim_station = pd.read_csv('dim_station.csv')
+    dim_peak_period = pd.read_csv('dim_peak_period.csv')
+    fact_flight_demand = pd.read_csv('fact_flight_demand.csv')
+    fact_replenishment = pd.read_csv('fact_replenishment.csv')
+
+    fleet = EquipmentFleet.from_dimensions(dim_equipment, dim_station)
+
+    start_time = time.perf_counter()
+    num_events, short_units = replay(fleet, fact_flight_demand, fact_replenishment, period_start_slots(dim_peak_period))
+    elapsed = time.perf_counter() - start_time
+
+    fact_equipment_unit = fleet.snapshot()
+
+    # Save to CSV
+    fact_equipment_unit.to_csv('fact_equipment_unit.csv', index=False)
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nTotal units: {len(fact_equipment_unit):,} (expected: {dim_equipment['units_in_operation'].sum():,})")
+    print(f"Events replayed: {num_events:,} in {elapsed:.2f}s")
+    print(f"Units requested but not idle at pickup: {short_units:,}")
+
+    print("\nUnits by status:")
+    for status, count in fact_equipment_unit['status'].value_counts().items():
+        print(f"  {status}: {count:,}")
+
+    station_641 = int(dim_station.loc[dim_station['stand_number'].astype(str) == '641', 'station_id'].iloc[0])
+    print(f"\nIdle at stand 641 by equipment:")
+    for equip_id, code in zip(dim_equipment['equipment_id'], dim_equipment['asset_code']):
+        print(f"  {code}: {fleet.count(station_641, equip_id)}")
+
+    station_id, status = fleet.where(1)
+    print(f"\nUnit 1: station_id={station_id}, status={status}")
+
+    print("\n--- First 5 rows ---")
+    print(fact_equipment_unit.head(5).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("CSV file 'fact_equipment_unit.csv' created successfully!")
+    print("=" * 80)
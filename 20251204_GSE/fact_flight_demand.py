@@ -1,58 +1,28 @@
 import pandas as pd
 import numpy as np
 import random
+from interval_allocation import allocate_demand
+from station_assignment import assign_demand_stations
+from apron_network import ApronPaths
+from uld_packing import pack_flights
+from substitution import SubstitutionMatrix, SUBSTITUTION_PATH
+from flight_rotation import broadcast_to_dates
 
-# Set seed for reproducibility
-np.random.seed(42)
-random.seed(42)
-
-# Load prerequisite files
-dim_flight = pd.read_csv('dim_flight.csv')
-dim_aircraft = pd.read_csv('dim_aircraft.csv')
-dim_equipment = pd.read_csv('dim_equipment.csv')
-dim_station = pd.read_csv('dim_station.csv')
-dim_time_slot = pd.read_csv('dim_time_slot.csv')
-
-# Create aircraft ULD lookup
-aircraft_uld = dim_aircraft.set_index('aircraft_id')['uld_positions'].to_dict()
-
-# Station preferences
-widebody_stations = [7, 8, 10]  # 632, 641, 647
-narrowbody_stations = [1, 3, 4]  # 661, 668, 699
-storage_stations = [1, 3, 4, 5, 6, 7, 8, 9, 10]  # Exclude station 2
-
-def assign_station(aircraft_category):
-    """Assign station based on aircraft category"""
-    if aircraft_category == 'Widebody':
-        preferred = widebody_stations
-    else:
-        preferred = narrowbody_stations
-    
-    if random.random() < 0.70:
-        return random.choice(preferred)
-    else:
-        return random.choice(storage_stations)
-
-def calculate_allocation(qty_required):
-    """Calculate allocation with shortage distribution"""
-    rand = random.random()
-    if rand < 0.85:
-        return qty_required
-    elif rand < 0.95:
-        return max(0, qty_required - random.randint(1, 2))
-    else:
-        return max(0, qty_required - random.randint(2, 4))
-
-def get_risk_level(shortage_qty):
-    """Determine risk level from shortage"""
-    if shortage_qty == 0:
-        return "OK"
-    elif shortage_qty == -1:
-        return "LOW"
-    elif shortage_qty >= -3:
-        return "MEDIUM"
-    else:
-        return "HIGH"
+# Dolly demand model: 'formula' (positions and cargo heuristic) or 'packing' (ULD bin-packing)
+DEMAND_MODEL = 'formula'
+
+# Allocation: per equipment type, or short rows also take dim_equipment_substitution.csv substitutes
+USE_SUBSTITUTION = False
+
+# Outbound demand: none (the stock reserves a share of capacity), or loading for dim_departure.csv flights
+USE_DEPARTURES = False
+DEPARTURE_PATH = 'dim_departure.csv'
+
+# Weekly pattern of a rotation schedule (dim_flight.py with SCHEDULE_MODEL = 'rotation')
+ROTATION_PATH = 'dim_flight_rotation.csv'
+
+# Outbound equipment leaves the station 60-90 min before departure and is free again when the hold closes
+LOADING_LEAD_SLOTS = (12, 18)
 
 def calculate_slot(arrival_slot_id, offset_min, offset_max=None):
     """Calculate slot with wrapping"""
@@ -69,240 +39,265 @@ def calculate_slot(arrival_slot_id, offset_min, offset_max=None):
     
     return slot
 
-# Generate demand records
-demands = []
-demand_id = 1
-
-for _, flight in dim_flight.iterrows():
-    flight_id = flight['flight_id']
-    date_key = flight['date_key']
-    arrival_slot_id = flight['arrival_slot_id']
-    aircraft_category = flight['aircraft_category']
-    aircraft_id = flight['aircraft_id']
-    estimated_bags = flight['estimated_bags']
-    cargo_kg = flight['cargo_kg']
-    has_cargo_data = flight['has_cargo_data']
+def rotation_quantities(dim_flight_rotation, dim_aircraft):
+    """Demand terms fixed by a rotation's aircraft, computed once per weekly pattern row
+
+    Returns widebody, the positions part of the 14P count and the 13C count per rotation.
+    """
+    aircraft = dim_aircraft.set_index('aircraft_id').reindex(dim_flight_rotation['aircraft_id'])
+    uld_positions = aircraft['uld_positions'].to_numpy()
+    return {
+        'widebody': (aircraft['aircraft_category'] == 'Widebody').to_numpy(),
+        'positions_14p': np.ceil(uld_positions * 0.6).astype(np.int64),
+        'qty_13c': np.clip(np.ceil(uld_positions * 0.8).astype(np.int64), 3, 8)
+    }
+
+def equipment_quantities(flights, dim_aircraft, dim_equipment, demand_model=DEMAND_MODEL, seed=42,
+                         dim_flight_rotation=None):
+    """{equipment_id: qty per flight} for arrivals or departures (0 where a type is not used)
+
+    flights needs flight_id, date_key, aircraft_id, aircraft_category, estimated_bags,
+    cargo_kg and has_cargo_data. Widebodies take 14P and narrowbodies 13C dollies, from
+    positions and cargo or from ULD bin-packing; both take 26-O and 26-C trolleys by bags.
+    With dim_flight_rotation (and a rotation_id per flight) the aircraft terms are computed
+    once per rotation and broadcast to its operating dates; cargo and bags stay per flight.
+    """
+    if dim_flight_rotation is not None and 'rotation_id' in flights:
+        rotation_index = pd.Index(dim_flight_rotation['rotation_id']).get_indexer(flights['rotation_id'])
+        per_rotation = rotation_quantities(dim_flight_rotation, dim_aircraft)
+        widebody = broadcast_to_dates(per_rotation['widebody'], rotation_index)
+        positions_14p = broadcast_to_dates(per_rotation['positions_14p'], rotation_index)
+        qty_13c = broadcast_to_dates(per_rotation['qty_13c'], rotation_index)
+    else:
+        per_flight = rotation_quantities(flights, dim_aircraft)
+        widebody, positions_14p, qty_13c = per_flight['widebody'], per_flight['positions_14p'], per_flight['qty_13c']
+    bags = flights['estimated_bags'].to_numpy()
+    has_cargo_data = (flights['has_cargo_data'].astype(str).str.upper() == 'TRUE').to_numpy()
+
+    if demand_model == 'packing':
+        packed = pack_flights(flights, dim_aircraft, dim_equipment, seed)
+        qty_14p = packed['qty_14p'].to_numpy()
+        qty_13c = packed['qty_13c'].to_numpy()
+    else:
+        cargo_factor = np.where(has_cargo_data, np.ceil(flights['cargo_kg'].to_numpy() / 3000), 2).astype(np.int64)
+        qty_14p = np.clip(positions_14p + cargo_factor, 4, 12)
+
+    return {
+        1: np.where(widebody, 0, qty_13c),
+        2: np.where(widebody, qty_14p, 0),
+        4: np.where(widebody, np.clip(np.ceil(bags / 30), 8, 22), np.clip(np.ceil(bags / 35), 4, 8)).astype(np.int64),
+        6: np.where(widebody, np.clip(np.ceil(bags / 60), 4, 11), np.clip(np.ceil(bags / 70), 2, 4)).astype(np.int64)
+    }
+
+def outbound_demand(dim_departure, dim_aircraft, dim_equipment, fact_flight_demand, demand_model=DEMAND_MODEL, seed=42):
+    """Outbound equipment demand rows per departure, before allocation
+
+    Quantities come from equipment_quantities() as for arrivals. Units are picked up
+    LOADING_LEAD_SLOTS before the departure slot and return at it. A departure is served
+    by the station of its aircraft's arrival (flight_id) in fact_flight_demand.
+    """
+    rng = np.random.default_rng([seed, 1])  # own stream, independent of dim_departure's draws
+    quantities = equipment_quantities(
+        dim_departure.assign(flight_id=dim_departure['departure_id']), dim_aircraft, dim_equipment, demand_model, seed + 1
+    )
+    departure_slot_id = dim_departure['departure_slot_id'].to_numpy()
+    lead = rng.integers(LOADING_LEAD_SLOTS[0], LOADING_LEAD_SLOTS[1] + 1, size=len(dim_departure))
+    pickup_slot_id = (departure_slot_id - 1 - lead) % 288 + 1
+
+    # One row per departure and equipment type it uses, departures in order then equipment_id
+    widebody = (dim_departure['aircraft_category'] == 'Widebody').to_numpy()
+    equipment_ids = np.array([1, 2, 4, 6])  # 13C narrowbody, 14P widebody, 26-O and 26-C for all
+    used = np.stack([~widebody, widebody, np.ones_like(widebody), np.ones_like(widebody)], axis=1)
+    departure_index, equipment_index = np.nonzero(used)
+    qty = np.stack([quantities[e] for e in equipment_ids], axis=1)[departure_index, equipment_index]
+
+    served_by = fact_flight_demand.groupby('flight_id')[['station_id', 'allocation_distance_km']].first()
+    served_by = served_by.reindex(dim_departure['flight_id'].to_numpy()[departure_index])
+    has_cargo_data = dim_departure['has_cargo_data'].astype(str).str.upper().to_numpy()[departure_index] == 'TRUE'
+
+    return pd.DataFrame({
+        'demand_id': np.arange(1, len(departure_index) + 1),
+        'departure_id': dim_departure['departure_id'].to_numpy()[departure_index],
+        'date_key': dim_departure['date_key'].to_numpy()[departure_index],
+        'departure_slot_id': departure_slot_id[departure_index],
+        'station_id': served_by['station_id'].to_numpy(),
+        'equipment_id': equipment_ids[equipment_index],
+        'qty_required': qty,
+        'pickup_slot_id': pickup_slot_id[departure_index],
+        'return_slot_id': departure_slot_id[departure_index],
+        'allocation_distance_km': served_by['allocation_distance_km'].to_numpy(),
+        'demand_calc_method': np.where(has_cargo_data, 'Cargo-based', 'Estimated'),
+        'is_active': 'TRUE'
+    })
+
+def generate_flight_demand(dim_flight, dim_aircraft, dim_equipment, dim_station, dim_parking_stand,
+                           apron_paths=None, seed=42, demand_model=DEMAND_MODEL, capacity_calendar=None,
+                           substitution=None, dim_departure=None, dim_flight_rotation=None):
+    """Equipment demand rows per flight with station assignment and allocation
+
+    With substitution (a substitution.SubstitutionMatrix) short rows may take other equipment
+    types and a qty_substituted column follows qty_allocated. With dim_departure, outbound
+    rows compete with arrivals for the same units. Returns (fact_flight_demand,
+    fact_outbound_demand); fact_outbound_demand is None without dim_departure.
+    dim_flight_rotation (rotation schedules) lets per-rotation demand terms be computed once.
+    """
+    # Set seed for reproducibility
+    np.random.seed(seed)
+    random.seed(seed)
+    
+    # Equipment quantities for every flight at once
+    quantities = equipment_quantities(dim_flight, dim_aircraft, dim_equipment, demand_model, seed, dim_flight_rotation)
+    
+    # Generate demand records
+    demands = []
+    demand_id = 1
+
+    for row, flight in enumerate(dim_flight.itertuples(index=False)):
+        arrival_slot_id = flight.arrival_slot_id
+        has_cargo_data = str(flight.has_cargo_data).upper() == 'TRUE'  # bool when read back from CSV
     
-    # Get ULD positions
-    uld_positions = aircraft_uld[aircraft_id]
+        # Calculate time slots
+        pickup_slot_id = calculate_slot(arrival_slot_id, 3, 6)
+        return_slot_id = calculate_slot(arrival_slot_id, 9)
     
-    # Assign station
-    station_id = assign_station(aircraft_category)
+        # Demand calc method
+        demand_calc_method = "Cargo-based" if has_cargo_data else "Estimated"
     
-    # Calculate time slots
-    pickup_slot_id = calculate_slot(arrival_slot_id, 3, 6)
-    return_slot_id = calculate_slot(arrival_slot_id, 9)
+        # Dollies by aircraft category (14P widebody, 13C narrowbody), then 26-O and 26-C trolleys
+        equipment_ids = [2, 4, 6] if flight.aircraft_category == 'Widebody' else [1, 4, 6]
+        for equipment_id in equipment_ids:
+            demands.append({
+                'demand_id': demand_id,
+                'flight_id': flight.flight_id,
+                'date_key': flight.date_key,
+                'arrival_slot_id': arrival_slot_id,
+                'equipment_id': equipment_id,
+                'qty_required': int(quantities[equipment_id][row]),
+                'pickup_slot_id': pickup_slot_id,
+                'return_slot_id': return_slot_id,
+                'demand_calc_method': demand_calc_method,
+                'is_active': 'TRUE'
+            })
+            demand_id += 1
+
+    # Create DataFrame
+    fact_flight_demand = pd.DataFrame(demands)
+
+    # Sort by date_key, arrival_slot_id, flight_id
+    fact_flight_demand = fact_flight_demand.sort_values(
+        ['date_key', 'arrival_slot_id', 'flight_id']
+    ).reset_index(drop=True)
+    fact_flight_demand['demand_id'] = range(1, len(fact_flight_demand) + 1)
+
+    # Capacity-aware station assignment by free units at pickup and stand-to-station road distance
+    if apron_paths is None:
+        apron_paths = ApronPaths.load()
+    stand_station_km = apron_paths.stand_station_distance_km(
+        dim_parking_stand['parking_stand_id'], dim_station['station_id']
+    )
+    fact_flight_demand['station_id'], fact_flight_demand['allocation_distance_km'] = assign_demand_stations(
+        dim_flight, fact_flight_demand, dim_station, dim_equipment, dim_parking_stand, stand_station_km
+    )
+
+    # Deterministic allocation in pickup-slot order, reusing equipment returned at the same station
+    substituted = ['qty_substituted'] if substitution is not None else []
+    if dim_departure is None:
+        allocation = allocate_demand(fact_flight_demand, dim_station, dim_equipment, capacity_calendar, substitution)
+        return fact_flight_demand.assign(**allocation)[[
+            'demand_id', 'flight_id', 'date_key', 'arrival_slot_id', 'station_id', 'equipment_id',
+            'qty_required', 'qty_allocated'] + substituted + ['shortage_qty', 'pickup_slot_id', 'return_slot_id',
+            'allocation_distance_km', 'demand_calc_method', 'risk_level', 'sla_compliant', 'is_active'
+        ]], None
+
+    # Arrivals and departures in one allocation pass; the departure slot anchors the midnight wrap
+    fact_outbound_demand = outbound_demand(dim_departure, dim_aircraft, dim_equipment, fact_flight_demand, demand_model, seed)
+    columns = ['date_key', 'arrival_slot_id', 'station_id', 'equipment_id', 'qty_required', 'pickup_slot_id', 'return_slot_id']
+    combined = pd.concat([
+        fact_flight_demand[columns],
+        fact_outbound_demand.rename(columns={'departure_slot_id': 'arrival_slot_id'})[columns]
+    ], ignore_index=True)
+    allocation = allocate_demand(combined, dim_station, dim_equipment, capacity_calendar, substitution)
+    inbound = len(fact_flight_demand)
+    fact_flight_demand = fact_flight_demand.assign(**{name: values[:inbound] for name, values in allocation.items()})
+    fact_outbound_demand = fact_outbound_demand.assign(**{name: values[inbound:] for name, values in allocation.items()})
+    return fact_flight_demand[[
+        'demand_id', 'flight_id', 'date_key', 'arrival_slot_id', 'station_id', 'equipment_id',
+        'qty_required', 'qty_allocated'] + substituted + ['shortage_qty', 'pickup_slot_id', 'return_slot_id',
+        'allocation_distance_km', 'demand_calc_method', 'risk_level', 'sla_compliant', 'is_active'
+    ]], fact_outbound_demand[[
+        'demand_id', 'departure_id', 'date_key', 'departure_slot_id', 'station_id', 'equipment_id',
+        'qty_required', 'qty_allocated'] + substituted + ['shortage_qty', 'pickup_slot_id', 'return_slot_id',
+        'allocation_distance_km', 'demand_calc_method', 'risk_level', 'sla_compliant', 'is_active'
+    ]]
+
+if __name__ == '__main__':
+    # Load prerequisite files
+    dim_flight = pd.read_csv('dim_flight.csv')
+    dim_aircraft = pd.read_csv('dim_aircraft.csv')
+    dim_equipment = pd.read_csv('dim_equipment.csv')
+    dim_station = pd.read_csv('dim_station.csv')
+    dim_parking_stand = pd.read_csv('dim_parking_stand.csv')
     
-    # Demand calc method
-    demand_calc_method = "Cargo-based" if has_cargo_data == 'TRUE' else "Estimated"
+    substitution = SubstitutionMatrix.load(SUBSTITUTION_PATH) if USE_SUBSTITUTION else None
+    dim_departure = pd.read_csv(DEPARTURE_PATH) if USE_DEPARTURES else None
+    dim_flight_rotation = pd.read_csv(ROTATION_PATH) if 'rotation_id' in dim_flight else None
+    fact_flight_demand, fact_outbound_demand = generate_flight_demand(
+        dim_flight, dim_aircraft, dim_equipment, dim_station, dim_parking_stand,
+        substitution=substitution, dim_departure=dim_departure, dim_flight_rotation=dim_flight_rotation
+    )
     
-    # Generate equipment demands
-    if aircraft_category == 'Widebody':
-        # 14P Pallet Dolly
-        cargo_factor = int(np.ceil(cargo_kg / 3000)) if has_cargo_data == 'TRUE' else 2
-        qty_14p = min(12, max(4, int(np.ceil(uld_positions * 0.6)) + cargo_factor))
-        qty_alloc_14p = calculate_allocation(qty_14p)
-        shortage_14p = qty_alloc_14p - qty_14p
-        
-        demands.append({
-            'demand_id': demand_id,
-            'flight_id': flight_id,
-            'date_key': date_key,
-            'arrival_slot_id': arrival_slot_id,
-            'station_id': station_id,
-            'equipment_id': 2,
-            'qty_required': qty_14p,
-            'qty_allocated': qty_alloc_14p,
-            'shortage_qty': shortage_14p,
-            'pickup_slot_id': pickup_slot_id,
-            'return_slot_id': return_slot_id,
-            'allocation_distance_km': round(random.uniform(0.3, 2.5), 1),
-            'demand_calc_method': demand_calc_method,
-            'risk_level': get_risk_level(shortage_14p),
-            'sla_compliant': 'TRUE' if shortage_14p >= -1 else 'FALSE',
-            'is_active': 'TRUE'
-        })
-        demand_id += 1
-        
-        # 26-O Open Baggage Trolley
-        qty_26o = min(22, max(8, int(np.ceil(estimated_bags / 30))))
-        qty_alloc_26o = calculate_allocation(qty_26o)
-        shortage_26o = qty_alloc_26o - qty_26o
-        
-        demands.append({
-            'demand_id': demand_id,
-            'flight_id': flight_id,
-            'date_key': date_key,
-            'arrival_slot_id': arrival_slot_id,
-            'station_id': station_id,
-            'equipment_id': 4,
-            'qty_required': qty_26o,
-            'qty_allocated': qty_alloc_26o,
-            'shortage_qty': shortage_26o,
-            'pickup_slot_id': pickup_slot_id,
-            'return_slot_id': return_slot_id,
-            'allocation_distance_km': round(random.uniform(0.3, 2.5), 1),
-            'demand_calc_method': demand_calc_method,
-            'risk_level': get_risk_level(shortage_26o),
-            'sla_compliant': 'TRUE' if shortage_26o >= -1 else 'FALSE',
-            'is_active': 'TRUE'
-        })
-        demand_id += 1
-        
-        # 26-C Closed Baggage Trolley
-        qty_26c = min(11, max(4, int(np.ceil(estimated_bags / 60))))
-        qty_alloc_26c = calculate_allocation(qty_26c)
-        shortage_26c = qty_alloc_26c - qty_26c
-        
-        demands.append({
-            'demand_id': demand_id,
-            'flight_id': flight_id,
-            'date_key': date_key,
-            'arrival_slot_id': arrival_slot_id,
-            'station_id': station_id,
-            'equipment_id': 6,
-            'qty_required': qty_26c,
-            'qty_allocated': qty_alloc_26c,
-            'shortage_qty': shortage_26c,
-            'pickup_slot_id': pickup_slot_id,
-            'return_slot_id': return_slot_id,
-            'allocation_distance_km': round(random.uniform(0.3, 2.5), 1),
-            'demand_calc_method': demand_calc_method,
-            'risk_level': get_risk_level(shortage_26c),
-            'sla_compliant': 'TRUE' if shortage_26c >= -1 else 'FALSE',
-            'is_active': 'TRUE'
-        })
-        demand_id += 1
-        
-    else:  # Narrowbody
-        # 13C Container Dolly
-        qty_13c = min(8, max(3, int(np.ceil(uld_positions * 0.8))))
-        qty_alloc_13c = calculate_allocation(qty_13c)
-        shortage_13c = qty_alloc_13c - qty_13c
-        
-        demands.append({
-            'demand_id': demand_id,
-            'flight_id': flight_id,
-            'date_key': date_key,
-            'arrival_slot_id': arrival_slot_id,
-            'station_id': station_id,
-            'equipment_id': 1,
-            'qty_required': qty_13c,
-            'qty_allocated': qty_alloc_13c,
-            'shortage_qty': shortage_13c,
-            'pickup_slot_id': pickup_slot_id,
-            'return_slot_id': return_slot_id,
-            'allocation_distance_km': round(random.uniform(0.3, 2.5), 1),
-            'demand_calc_method': demand_calc_method,
-            'risk_level': get_risk_level(shortage_13c),
-            'sla_compliant': 'TRUE' if shortage_13c >= -1 else 'FALSE',
-            'is_active': 'TRUE'
-        })
-        demand_id += 1
-        
-        # 26-O Open Baggage Trolley
-        qty_26o = min(8, max(4, int(np.ceil(estimated_bags / 35))))
-        qty_alloc_26o = calculate_allocation(qty_26o)
-        shortage_26o = qty_alloc_26o - qty_26o
-        
-        demands.append({
-            'demand_id': demand_id,
-            'flight_id': flight_id,
-            'date_key': date_key,
-            'arrival_slot_id': arrival_slot_id,
-            'station_id': station_id,
-            'equipment_id': 4,
-            'qty_required': qty_26o,
-            'qty_allocated': qty_alloc_26o,
-            'shortage_qty': shortage_26o,
-            'pickup_slot_id': pickup_slot_id,
-            'return_slot_id': return_slot_id,
-            'allocation_distance_km': round(random.uniform(0.3, 2.5), 1),
-            'demand_calc_method': demand_calc_method,
-            'risk_level': get_risk_level(shortage_26o),
-            'sla_compliant': 'TRUE' if shortage_26o >= -1 else 'FALSE',
-            'is_active': 'TRUE'
-        })
-        demand_id += 1
-        
-        # 26-C Closed Baggage Trolley
-        qty_26c = min(4, max(2, int(np.ceil(estimated_bags / 70))))
-        qty_alloc_26c = calculate_allocation(qty_26c)
-        shortage_26c = qty_alloc_26c - qty_26c
-        
-        demands.append({
-            'demand_id': demand_id,
-            'flight_id': flight_id,
-            'date_key': date_key,
-            'arrival_slot_id': arrival_slot_id,
-            'station_id': station_id,
-            'equipment_id': 6,
-            'qty_required': qty_26c,
-            'qty_allocated': qty_alloc_26c,
-            'shortage_qty': shortage_26c,
-            'pickup_slot_id': pickup_slot_id,
-            'return_slot_id': return_slot_id,
-            'allocation_distance_km': round(random.uniform(0.3, 2.5), 1),
-            'demand_calc_method': demand_calc_method,
-            'risk_level': get_risk_level(shortage_26c),
-            'sla_compliant': 'TRUE' if shortage_26c >= -1 else 'FALSE',
-            'is_active': 'TRUE'
-        })
-        demand_id += 1
-
-# Create DataFrame
-fact_flight_demand = pd.DataFrame(demands)
-
-# Sort by date_key, arrival_slot_id, flight_id
-fact_flight_demand = fact_flight_demand.sort_values(
-    ['date_key', 'arrival_slot_id', 'flight_id']
-).reset_index(drop=True)
-fact_flight_demand['demand_id'] = range(1, len(fact_flight_demand) + 1)
-
-# Save to CSV
-fact_flight_demand.to_csv('fact_flight_demand.csv', index=False, float_format='%.1f')
-
-# Validation
-print("=" * 80)
-print("VALIDATION REPORT")
-print("=" * 80)
-
-print(f"\nTotal row count: {len(fact_flight_demand):,}")
-print(f"Ratio to flights: {len(fact_flight_demand) / len(dim_flight):.2f}x")
-print(f"Date range: {fact_flight_demand['date_key'].min()} to {fact_flight_demand['date_key'].max()}")
-
-# Equipment distribution
-print("\nEquipment distribution:")
-equip_names = {1: '13C Container', 2: '14P Pallet', 4: '26-O Open Trolley', 6: '26-C Closed Trolley'}
-for equip_id in sorted(fact_flight_demand['equipment_id'].unique()):
-    count = (fact_flight_demand['equipment_id'] == equip_id).sum()
-    pct = count / len(fact_flight_demand) * 100
-    print(f"  {equip_id} ({equip_names[equip_id]}): {count:,} ({pct:.1f}%)")
-
-# Risk level distribution
-print("\nRisk level distribution:")
-for level in ['OK', 'LOW', 'MEDIUM', 'HIGH']:
-    count = (fact_flight_demand['risk_level'] == level).sum()
-    pct = count / len(fact_flight_demand) * 100
-    print(f"  {level}: {count:,} ({pct:.1f}%)")
-
-# SLA compliance
-sla_rate = (fact_flight_demand['sla_compliant'] == 'TRUE').sum() / len(fact_flight_demand) * 100
-print(f"\nSLA compliance rate: {sla_rate:.1f}%")
-
-# Average qty_required by equipment
-print("\nAverage qty_required by equipment:")
-for equip_id in sorted(fact_flight_demand['equipment_id'].unique()):
-    avg = fact_flight_demand[fact_flight_demand['equipment_id'] == equip_id]['qty_required'].mean()
-    print(f"  {equip_id} ({equip_names[equip_id]}): {avg:.1f}")
-
-# Sample rows
-print("\n--- First 5 rows ---")
-print(fact_flight_demand.head(5).to_string(index=False))
-
-print("\n--- Last 5 rows ---")
-print(fact_flight_demand.tail(5).to_string(index=False))
-
-print("\n" + "=" * 80)
-print("CSV file 'fact_flight_demand.csv' created successfully!")
-print("=" * 80)
\ No newline at end of file
+    # Save to CSV
+    fact_flight_demand.to_csv('fact_flight_demand.csv', index=False, float_format='%.1f')
+    if fact_outbound_demand is not None:
+        fact_outbound_demand.to_csv('fact_outbound_demand.csv', index=False, float_format='%.1f')
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nTotal row count: {len(fact_flight_demand):,}")
+    print(f"Ratio to flights: {len(fact_flight_demand) / len(dim_flight):.2f}x")
+    print(f"Date range: {fact_flight_demand['date_key'].min()} to {fact_flight_demand['date_key'].max()}")
+
+    # Equipment distribution
+    print("\nEquipment distribution:")
+    equip_names = {1: '13C Container', 2: '14P Pallet', 4: '26-O Open Trolley', 6: '26-C Closed Trolley'}
+    for equip_id in sorted(fact_flight_demand['equipment_id'].unique()):
+        count = (fact_flight_demand['equipment_id'] == equip_id).sum()
+        pct = count / len(fact_flight_demand) * 100
+        print(f"  {equip_id} ({equip_names[equip_id]}): {count:,} ({pct:.1f}%)")
+
+    # Risk level distribution
+    print("\nRisk level distribution:")
+    for level in ['OK', 'LOW', 'MEDIUM', 'HIGH']:
+        count = (fact_flight_demand['risk_level'] == level).sum()
+        pct = count / len(fact_flight_demand) * 100
+        print(f"  {level}: {count:,} ({pct:.1f}%)")
+
+    # SLA compliance
+    sla_rate = (fact_flight_demand['sla_compliant'] == 'TRUE').sum() / len(fact_flight_demand) * 100
+    print(f"\nSLA compliance rate: {sla_rate:.1f}%")
+    if 'qty_substituted' in fact_flight_demand:
+        print(f"Units covered by substitute equipment: {fact_flight_demand['qty_substituted'].sum():,}")
+    if fact_outbound_demand is not None:
+        outbound_sla = (fact_outbound_demand['sla_compliant'] == 'TRUE').mean() * 100
+        print(f"Outbound rows: {len(fact_outbound_demand):,} for {len(dim_departure):,} departures, "
+              f"{fact_outbound_demand['qty_required'].sum():,} units, SLA compliance {outbound_sla:.1f}%")
+
+    # Average qty_required by equipment
+    print("\nAverage qty_required by equipment:")
+    for equip_id in sorted(fact_flight_demand['equipment_id'].unique()):
+        avg = fact_flight_demand[fact_flight_demand['equipment_id'] == equip_id]['qty_required'].mean()
+        print(f"  {equip_id} ({equip_names[equip_id]}): {avg:.1f}")
+
+    # Sample rows
+    print("\n--- First 5 rows ---")
+    print(fact_flight_demand.head(5).to_string(index=False))
+
+    print("\n--- Last 5 rows ---")
+    print(fact_flight_demand.tail(5).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("CSV file 'fact_flight_demand.csv' created successfully!")
+    print("=" * 80)
\ No newline at end of file
@@ -1,211 +1,194 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
 import random
+from apron_network import ApronPaths
+from jit_kernels import deplete_surplus
+from stock_kernel import CHUNK_ROWS
 
-# Set seed for reproducibility
-np.random.seed(42)
-random.seed(42)
+# Share of shortages that get a recommendation (to get target volume)
+SAMPLING_GATE = 0.30
 
-# Load prerequisite data
-fact_station_stock = pd.read_csv('fact_station_stock.csv')
-dim_station = pd.read_csv('dim_station.csv')
-
-# Create station coordinates lookup
-station_coords = {}
-for _, row in dim_station.iterrows():
-    station_coords[row['station_id']] = (row['location_x'], row['location_y'])
-
-def calculate_distance(from_id, to_id):
-    """Calculate Euclidean distance between stations in km"""
-    x1, y1 = station_coords[from_id]
-    x2, y2 = station_coords[to_id]
-    distance = np.sqrt((x2 - x1)**2 + (y2 - y1)**2) / 30  # Scale to km
-    return round(distance, 1)
+# Moves before this date already went through approval
+STATUS_REFERENCE_DATE = 20250601
 
 def get_priority(shortage_qty):
     """Determine priority based on shortage severity"""
-    if shortage_qty <= -4:
-        return "HIGH"
-    elif shortage_qty <= -2:
-        return "MEDIUM"
-    else:
-        return "LOW"
-
-def get_status(date_key):
-    """Determine status based on date"""
-    reference_date = 20250601
-    if date_key < reference_date:
-        rand = random.random()
-        if rand < 0.60:
-            return "Completed"
-        elif rand < 0.90:
-            return "Approved"
-        else:
-            return "Recommended"
-    else:
-        return "Recommended"
-
-# Generate replenishment records
-replenishments = []
-replenishment_id = 1
-
-# Group by date, period, equipment to find shortage/surplus matches
-grouped = fact_station_stock.groupby(['date_key', 'period_id', 'equipment_id'])
-
-for (date_key, period_id, equipment_id), group in grouped:
-    # Find shortages and surpluses
-    shortages = group[group['shortage_qty'] < 0].copy()
-    surpluses = group[group['surplus_qty'] > 0].copy()
+    shortage_qty = np.asarray(shortage_qty)
+    return np.select([shortage_qty <= -4, shortage_qty <= -2], ['HIGH', 'MEDIUM'], default='LOW')
+
+def get_trigger_reason(draw):
+    """Trigger reason from a uniform draw: 70% Shortage, 20% Balance, 10% Preventive"""
+    draw = np.asarray(draw)
+    return np.select([draw < 0.70, draw < 0.90], ['Shortage', 'Balance'], default='Preventive')
+
+def get_status(date_key, draw):
+    """Determine status based on date (draw is only used before the reference date)"""
+    date_key = np.asarray(date_key)
+    draw = np.asarray(draw)
+    past = date_key < STATUS_REFERENCE_DATE
+    return np.select(
+        [past & (draw < 0.60), past & (draw < 0.90)], ['Completed', 'Approved'], default='Recommended'
+    )
+
+def read_stock_candidates(path, chunk_rows=CHUNK_ROWS):
+    """Rows of a fact_station_stock CSV with a shortage or surplus, read chunk by chunk
+
+    Only the matching columns of those rows are kept, which is all generate_replenishment()
+    needs, so balanced cells never stay in memory.
+    """
+    columns = ['date_key', 'period_id', 'station_id', 'equipment_id', 'shortage_qty', 'surplus_qty']
+    parts = [
+        chunk[(chunk['shortage_qty'] < 0) | (chunk['surplus_qty'] > 0)]
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_rows)
+    ]
+    return pd.concat(parts, ignore_index=True)
+
+def generate_replenishment(fact_station_stock, dim_station, apron_paths=None, seed=42):
+    """Replenishment moves matching station surpluses to shortages per date, period and equipment"""
+    # Group by date, period, equipment to find shortage/surplus matches
+    group = fact_station_stock.groupby(['date_key', 'period_id', 'equipment_id'], sort=True).ngroup().to_numpy()
+    shortage_qty = fact_station_stock['shortage_qty'].to_numpy().astype(np.int64)
+    surplus_qty = fact_station_stock['surplus_qty'].to_numpy().astype(np.int64)
+    
+    # Shortages most severe first, surpluses largest first (ties keep row order)
+    shortage_rows = np.flatnonzero(shortage_qty < 0)
+    shortage_rows = shortage_rows[np.lexsort((shortage_rows, shortage_qty[shortage_rows], group[shortage_rows]))]
+    surplus_rows = np.flatnonzero(surplus_qty > 0)
+    surplus_rows = surplus_rows[np.lexsort((surplus_rows, -surplus_qty[surplus_rows], group[surplus_rows]))]
+    
+    return match_replenishment(fact_station_stock, group, shortage_rows, surplus_rows, dim_station, apron_paths, seed)
+
+def match_replenishment(fact_station_stock, group, shortage_rows, surplus_rows, dim_station, apron_paths=None, seed=42):
+    """Replenishment moves from already ordered shortage and surplus rows
+
+    group is the (date, period, equipment) group number of every row; shortage_rows and
+    surplus_rows are row positions sorted by group, then severity/size, then row order.
+    """
+    # Set seed for reproducibility
+    np.random.seed(seed)
+    random.seed(seed)
     
-    if len(shortages) == 0 or len(surpluses) == 0:
-        continue
+    # Road distance/time between stations from the cached apron network (O(1) lookups)
+    if apron_paths is None:
+        apron_paths = ApronPaths.load()
+    station_distance_km = np.round(apron_paths.station_distance_km(dim_station['station_id']), 1)
+    station_time_min = apron_paths.station_time_min(dim_station['station_id'])
     
-    # Sort by severity
-    shortages = shortages.sort_values('shortage_qty')
-    surpluses = surpluses.sort_values('surplus_qty', ascending=False)
+    num_groups = group.max() + 1 if len(group) else 0
+    station = fact_station_stock['station_id'].to_numpy()
+    date_key = fact_station_stock['date_key'].to_numpy()
+    shortage_qty = fact_station_stock['shortage_qty'].to_numpy().astype(np.int64)
+    surplus_qty = fact_station_stock['surplus_qty'].to_numpy().astype(np.int64)
+    
+    draw_status = np.zeros(num_groups, dtype=bool)
+    draw_status[group] = date_key < STATUS_REFERENCE_DATE
+    
+    # At most three uniforms per shortage (gate, trigger reason, status), drawn in loop order
+    draws = np.array([random.random() for _ in range(3 * len(shortage_rows) + 1)])
+    
+    # Greedy nearest-surplus depletion (numba-compiled when available)
+    moves, move_shortage, move_from, move_qty, move_trigger, move_status, _ = deplete_surplus(
+        np.searchsorted(group[shortage_rows], np.arange(num_groups + 1)),
+        station[shortage_rows], shortage_qty[shortage_rows],
+        np.searchsorted(group[surplus_rows], np.arange(num_groups + 1)),
+        station[surplus_rows], surplus_qty[surplus_rows],
+        station_distance_km, draw_status, draws, SAMPLING_GATE
+    )
+    rows = shortage_rows[move_shortage]
+    to_station = station[rows]
+    
+    # Create DataFrame
+    fact_replenishment = pd.DataFrame({
+        'replenishment_id': np.arange(1, moves + 1),
+        'from_station_id': move_from,
+        'to_station_id': to_station,
+        'date_key': date_key[rows],
+        'before_period_id': fact_station_stock['period_id'].to_numpy()[rows],
+        'equipment_id': fact_station_stock['equipment_id'].to_numpy()[rows],
+        'scenario_id': 1,
+        'qty_to_move': move_qty,
+        'distance_km': station_distance_km[move_from, to_station],
+        'estimated_time_min': np.maximum(2, np.ceil(station_time_min[move_from, to_station])).astype(np.int64),
+        'priority': get_priority(shortage_qty[rows]),
+        'trigger_reason': get_trigger_reason(move_trigger),
+        'status': get_status(date_key[rows], move_status),
+        'is_active': 'TRUE'
+    })
+
+    # Sort by date_key, before_period_id, priority
+    priority_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+    fact_replenishment['priority_sort'] = fact_replenishment['priority'].map(priority_order)
+    fact_replenishment = fact_replenishment.sort_values(
+        ['date_key', 'before_period_id', 'priority_sort']
+    ).reset_index(drop=True)
+    fact_replenishment = fact_replenishment.drop('priority_sort', axis=1)
+
+    # Update replenishment_id to be sequential after sorting
+    fact_replenishment['replenishment_id'] = range(1, len(fact_replenishment) + 1)
+    
+    return fact_replenishment
+
+if __name__ == '__main__':
+    # Load prerequisite data (only stock rows with a shortage or surplus)
+    fact_station_stock = read_stock_candidates('fact_station_stock.csv')
+    dim_station = pd.read_csv('dim_station.csv')
     
-    # Match surplus to shortage
-    surplus_dict = {row['station_id']: row['surplus_qty'] for _, row in surpluses.iterrows()}
+    fact_replenishment = generate_replenishment(fact_station_stock, dim_station)
     
-    for _, shortage_row in shortages.iterrows():
-        to_station_id = shortage_row['station_id']
-        needed = abs(shortage_row['shortage_qty'])
-        
-        # Only generate replenishment for ~30% of shortages (to get target volume)
-        if random.random() > 0.30:
-            continue
-        
-        # Find best surplus station (closest with available surplus)
-        best_from = None
-        best_distance = float('inf')
-        
-        for from_station_id, available in surplus_dict.items():
-            if available <= 0 or from_station_id == to_station_id:
-                continue
-            
-            distance = calculate_distance(from_station_id, to_station_id)
-            if distance < best_distance:
-                best_distance = distance
-                best_from = from_station_id
-        
-        if best_from is None:
-            continue
-        
-        # Determine quantity to move
-        qty_to_move = min(needed, surplus_dict[best_from])
-        if qty_to_move == 0:
-            continue
-        
-        # Update surplus
-        surplus_dict[best_from] -= qty_to_move
-        
-        # Calculate distance and time
-        distance_km = calculate_distance(best_from, to_station_id)
-        estimated_time_min = max(2, min(15, int(np.ceil(distance_km * 4))))
-        
-        # Determine priority
-        priority = get_priority(shortage_row['shortage_qty'])
-        
-        # Determine trigger reason
-        rand = random.random()
-        if rand < 0.70:
-            trigger_reason = "Shortage"
-        elif rand < 0.90:
-            trigger_reason = "Balance"
-        else:
-            trigger_reason = "Preventive"
-        
-        # Determine status
-        status = get_status(date_key)
-        
-        replenishments.append({
-            'replenishment_id': replenishment_id,
-            'from_station_id': best_from,
-            'to_station_id': to_station_id,
-            'date_key': date_key,
-            'before_period_id': period_id,
-            'equipment_id': equipment_id,
-            'scenario_id': 1,
-            'qty_to_move': qty_to_move,
-            'distance_km': distance_km,
-            'estimated_time_min': estimated_time_min,
-            'priority': priority,
-            'trigger_reason': trigger_reason,
-            'status': status,
-            'is_active': 'TRUE'
-        })
-        
-        replenishment_id += 1
-
-# Create DataFrame
-fact_replenishment = pd.DataFrame(replenishments)
-
-# Sort by date_key, before_period_id, priority
-priority_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
-fact_replenishment['priority_sort'] = fact_replenishment['priority'].map(priority_order)
-fact_replenishment = fact_replenishment.sort_values(
-    ['date_key', 'before_period_id', 'priority_sort']
-).reset_index(drop=True)
-fact_replenishment = fact_replenishment.drop('priority_sort', axis=1)
-
-# Update replenishment_id to be sequential after sorting
-fact_replenishment['replenishment_id'] = range(1, len(fact_replenishment) + 1)
-
-# Save to CSV
-fact_replenishment.to_csv('fact_replenishment.csv', index=False, float_format='%.1f')
-
-# Validation
-print("=" * 80)
-print("VALIDATION REPORT")
-print("=" * 80)
-
-print(f"\nTotal row count: {len(fact_replenishment):,}")
-print(f"Date range: {fact_replenishment['date_key'].min()} to {fact_replenishment['date_key'].max()}")
-print(f"Average per day: {len(fact_replenishment) / 365:.1f}")
-
-# Priority distribution
-print("\nPriority distribution:")
-priority_dist = fact_replenishment['priority'].value_counts()
-for priority in ['HIGH', 'MEDIUM', 'LOW']:
-    count = priority_dist.get(priority, 0)
-    pct = count / len(fact_replenishment) * 100
-    print(f"  {priority}: {count:,} ({pct:.1f}%)")
-
-# Trigger reason distribution
-print("\nTrigger reason distribution:")
-trigger_dist = fact_replenishment['trigger_reason'].value_counts()
-for reason in ['Shortage', 'Balance', 'Preventive']:
-    count = trigger_dist.get(reason, 0)
-    pct = count / len(fact_replenishment) * 100
-    print(f"  {reason}: {count:,} ({pct:.1f}%)")
-
-# Status distribution
-print("\nStatus distribution:")
-status_dist = fact_replenishment['status'].value_counts()
-for status in ['Completed', 'Approved', 'Recommended']:
-    count = status_dist.get(status, 0)
-    pct = count / len(fact_replenishment) * 100
-    print(f"  {status}: {count:,} ({pct:.1f}%)")
-
-# Averages
-print(f"\nAverage qty_to_move: {fact_replenishment['qty_to_move'].mean():.1f}")
-print(f"Average distance_km: {fact_replenishment['distance_km'].mean():.1f}")
-
-# Top station pairs
-print("\nTop 3 most common from_station → to_station pairs:")
-fact_replenishment['pair'] = fact_replenishment['from_station_id'].astype(str) + ' → ' + fact_replenishment['to_station_id'].astype(str)
-top_pairs = fact_replenishment['pair'].value_counts().head(3)
-for pair, count in top_pairs.items():
-    print(f"  Station {pair}: {count:,} times")
-
-# Sample rows
-print("\n--- First 5 rows ---")
-print(fact_replenishment.drop('pair', axis=1).head(5).to_string(index=False))
-
-print("\n--- Last 5 rows ---")
-print(fact_replenishment.drop('pair', axis=1).tail(5).to_string(index=False))
-
-print("\n" + "=" * 80)
-print("CSV file 'fact_replenishment.csv' created successfully!")
-print("=" * 80)
\ No newline at end of file
+    # Save to CSV
+    fact_replenishment.to_csv('fact_replenishment.csv', index=False, float_format='%.1f')
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nTotal row count: {len(fact_replenishment):,}")
+    print(f"Date range: {fact_replenishment['date_key'].min()} to {fact_replenishment['date_key'].max()}")
+    print(f"Average per day: {len(fact_replenishment) / 365:.1f}")
+
+    # Priority distribution
+    print("\nPriority distribution:")
+    priority_dist = fact_replenishment['priority'].value_counts()
+    for priority in ['HIGH', 'MEDIUM', 'LOW']:
+        count = priority_dist.get(priority, 0)
+        pct = count / len(fact_replenishment) * 100
+        print(f"  {priority}: {count:,} ({pct:.1f}%)")
+
+    # Trigger reason distribution
+    print("\nTrigger reason distribution:")
+    trigger_dist = fact_replenishment['trigger_reason'].value_counts()
+    for reason in ['Shortage', 'Balance', 'Preventive']:
+        count = trigger_dist.get(reason, 0)
+        pct = count / len(fact_replenishment) * 100
+        print(f"  {reason}: {count:,} ({pct:.1f}%)")
+
+    # Status distribution
+    print("\nStatus distribution:")
+    status_dist = fact_replenishment['status'].value_counts()
+    for status in ['Completed', 'Approved', 'Recommended']:
+        count = status_dist.get(status, 0)
+        pct = count / len(fact_replenishment) * 100
+        print(f"  {status}: {count:,} ({pct:.1f}%)")
+
+    # Averages
+    print(f"\nAverage qty_to_move: {fact_replenishment['qty_to_move'].mean():.1f}")
+    print(f"Average distance_km: {fact_replenishment['distance_km'].mean():.1f}")
+
+    # Top station pairs
+    print("\nTop 3 most common from_station → to_station pairs:")
+    fact_replenishment['pair'] = fact_replenishment['from_station_id'].astype(str) + ' → ' + fact_replenishment['to_station_id'].astype(str)
+    top_pairs = fact_replenishment['pair'].value_counts().head(3)
+    for pair, count in top_pairs.items():
+        print(f"  Station {pair}: {count:,} times")
+
+    # Sample rows
+    print("\n--- First 5 rows ---")
+    print(fact_replenishment.drop('pair', axis=1).head(5).to_string(index=False))
+
+    print("\n--- Last 5 rows ---")
+    print(fact_replenishment.drop('pair', axis=1).tail(5).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("CSV file 'fact_replenishment.csv' created successfully!")
+    print("=" * 80)
\ No newline at end of file
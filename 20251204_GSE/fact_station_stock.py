@@ -1,143 +1,132 @@
 import pandas as pd
 import numpy as np
-
-# Load prerequisite data
-fact_flight_demand = pd.read_csv('fact_flight_demand.csv')
-dim_station = pd.read_csv('dim_station.csv')
-
-# Aggregate demand by station, date, period, equipment
-demand_agg = fact_flight_demand.groupby(
-    ['station_id', 'date_key', 'period_id', 'equipment_id']
-)['qty_required'].sum().reset_index()
-demand_agg.rename(columns={'qty_required': 'demand_qty'}, inplace=True)
-
-# Create capacity mapping from dim_station
-capacity_map = {}
-for _, row in dim_station.iterrows():
-    station_id = row['station_id']
-    capacity_map[station_id] = {
-        1: row['capacity_pallet_dolly'],
-        2: row['capacity_container_dolly'],
-        3: row['capacity_baggage_trolley']
-    }
-
-# Generate all combinations for baseline scenario
-stations = list(range(1, 11))
-dates = list(range(20250101, 20251232))  # All date_keys from dim_date
-dates = [d for d in dates if d <= 20251231]  # Filter valid dates
-periods = [1, 2, 3, 4]
-equipment_types = [1, 2, 3]  # Exclude equipment_id=4 (Bulk Cart)
-scenario_id = 1
-
-# Create all combinations
-stock_records = []
-stock_id = 1
-
-for date_key in dates:
-    for period_id in periods:
-        for station_id in stations:
-            for equipment_id in equipment_types:
-                # Get capacity
-                capacity = capacity_map[station_id][equipment_id]
-                
-                # Calculate reserved and available
-                reserved_outbound = int(np.floor(capacity * 0.5))
-                available_inbound = capacity - reserved_outbound
-                
-                # Get demand (default to 0 if no demand)
-                demand_row = demand_agg[
-                    (demand_agg['station_id'] == station_id) &
-                    (demand_agg['date_key'] == date_key) &
-                    (demand_agg['period_id'] == period_id) &
-                    (demand_agg['equipment_id'] == equipment_id)
-                ]
-                demand_qty = int(demand_row['demand_qty'].iloc[0]) if len(demand_row) > 0 else 0
-                
-                # Calculate allocation
-                allocated_qty = min(demand_qty, available_inbound)
-                
-                # Calculate shortage/surplus
-                gap = available_inbound - demand_qty
-                shortage_qty = min(0, gap)
-                surplus_qty = max(0, gap)
-                
-                # Calculate utilization
-                if available_inbound > 0:
-                    utilization_pct = min(150.0, (demand_qty / available_inbound) * 100)
-                else:
-                    utilization_pct = 0.0
-                
-                # Bottleneck flag
-                bottleneck_flag = 'TRUE' if utilization_pct > 100.0 else 'FALSE'
-                
-                stock_records.append({
-                    'stock_id': stock_id,
-                    'station_id': station_id,
-                    'date_key': date_key,
-                    'period_id': period_id,
-                    'equipment_id': equipment_id,
-                    'scenario_id': scenario_id,
-                    'capacity': capacity,
-                    'reserved_outbound': reserved_outbound,
-                    'available_inbound': available_inbound,
-                    'demand_qty': demand_qty,
-                    'allocated_qty': allocated_qty,
-                    'shortage_qty': shortage_qty,
-                    'surplus_qty': surplus_qty,
-                    'utilization_pct': round(utilization_pct, 1),
-                    'bottleneck_flag': bottleneck_flag,
-                    'is_active': 'TRUE'
-                })
-                
-                stock_id += 1
-
-# Create DataFrame
-fact_station_stock = pd.DataFrame(stock_records)
-
-# Sort by date_key, period_id, station_id, equipment_id
-fact_station_stock = fact_station_stock.sort_values(
-    ['date_key', 'period_id', 'station_id', 'equipment_id']
-).reset_index(drop=True)
-
-# Update stock_id to be sequential after sorting
-fact_station_stock['stock_id'] = range(1, len(fact_station_stock) + 1)
-
-# Save to CSV
-fact_station_stock.to_csv('fact_station_stock.csv', index=False, float_format='%.1f')
-
-# Validation
-print("=" * 80)
-print("VALIDATION REPORT")
-print("=" * 80)
-
-print(f"\nTotal row count: {len(fact_station_stock):,} (expected: 43,800)")
-print(f"Date range: {fact_station_stock['date_key'].min()} to {fact_station_stock['date_key'].max()}")
-
-# Bottleneck rate
-bottleneck_rate = (fact_station_stock['bottleneck_flag'] == 'TRUE').sum() / len(fact_station_stock) * 100
-print(f"\nBottleneck rate: {bottleneck_rate:.1f}%")
-
-# Average utilization by equipment
-print("\nAverage utilization_pct by equipment:")
-equip_names = {1: 'Pallet Dolly', 2: 'Container Dolly', 3: 'Baggage Trolley'}
-for equip_id in sorted(fact_station_stock['equipment_id'].unique()):
-    avg_util = fact_station_stock[fact_station_stock['equipment_id'] == equip_id]['utilization_pct'].mean()
-    print(f"  equipment_id={equip_id} ({equip_names[equip_id]}): {avg_util:.1f}%")
-
-# Stations with most bottlenecks
-print("\nStations with most bottlenecks (top 3):")
-bottleneck_by_station = fact_station_stock[fact_station_stock['bottleneck_flag'] == 'TRUE'].groupby('station_id').size().sort_values(ascending=False).head(3)
-for station_id, count in bottleneck_by_station.items():
-    pct = count / len(fact_station_stock[fact_station_stock['station_id'] == station_id]) * 100
-    print(f"  station_id={station_id}: {count:,} bottlenecks ({pct:.1f}%)")
-
-# Sample rows
-print("\n--- First 5 rows ---")
-print(fact_station_stock.head(5).to_string(index=False))
-
-print("\n--- Last 5 rows ---")
-print(fact_station_stock.tail(5).to_string(index=False))
-
-print("\n" + "=" * 80)
-print("CSV file 'fact_station_stock.csv' created successfully!")
-print("=" * 80)
\ No newline at end of file
+from peak_detection import PeriodMapping
+from stock_kernel import PERIODS, RESERVE_RATIO, capacity_matrix, aggregate_flight_demand_chunked, build_demand_cube, compute_stock, stock_to_frame
+from capacity_calendar import CapacityCalendar, CALENDAR_PATH
+from substitution import SubstitutionMatrix, SUBSTITUTION_PATH, supply_available, substitute_stock
+
+# Demand source: actual flight demand, or the forward cube from demand_forecast.py
+USE_FORECAST = False
+FORECAST_PATH = 'forecast_station_demand.csv'
+
+# Period windows: static dim_time_slot mapping, or detected waves from peak_detection.py
+USE_DYNAMIC_PERIODS = False
+DYNAMIC_PERIOD_PATH = 'dim_dynamic_period.csv'
+
+# Capacity: constant dim_station capacity, or adjusted by the dim_capacity_calendar.csv events
+USE_CAPACITY_CALENDAR = False
+
+# Outbound: reserve RESERVE_RATIO of capacity, or net the fact_outbound_demand.csv departure loading
+USE_DEPARTURES = False
+OUTBOUND_PATH = 'fact_outbound_demand.csv'
+
+# Shortages: per equipment type, or after dim_equipment_substitution.csv cover (26-C for 26-O, ...)
+USE_SUBSTITUTION = False
+
+# Equipment with flight demand: 13C, 14P, 26-O, 26-C
+EQUIPMENT_TYPES = [1, 2, 4, 6]
+
+def build_station_stock(dim_station, dim_equipment, dates, demand_agg, scenario_id=1,
+                        capacity_calendar=None, dim_time_slot=None, substitution=None, outbound_agg=None):
+    """Stock position for every date x period x station x equipment combination
+    
+    demand_agg has station_id, date_key, period_id, equipment_id and demand_qty.
+    capacity_calendar (with dim_time_slot for the period windows) makes capacity date/period specific.
+    substitution (a substitution.SubstitutionMatrix) lets spare units of one type cover another's shortage.
+    outbound_agg (same columns, from fact_outbound_demand) replaces the fixed outbound reservation.
+    """
+    stations = list(dim_station['station_id'])
+    
+    # Station x equipment capacity from dim_station (capacity_13c, capacity_14p, ... per asset_code)
+    capacity = capacity_matrix(dim_station, dim_equipment, EQUIPMENT_TYPES)
+    if capacity_calendar is not None:
+        capacity = capacity_calendar.period_capacity(dates, stations, EQUIPMENT_TYPES, capacity, dim_time_slot)
+    
+    # Dense demand cube and vectorized stock position for every combination
+    demand_cube = build_demand_cube(demand_agg, dates, stations, EQUIPMENT_TYPES)
+    outbound_cube = None if outbound_agg is None else build_demand_cube(outbound_agg, dates, stations, EQUIPMENT_TYPES)
+    stock = compute_stock(demand_cube, capacity, outbound=outbound_cube)
+    if substitution is not None:
+        supply = supply_available(dim_station, dim_equipment, substitution.supply_types(EQUIPMENT_TYPES), RESERVE_RATIO)
+        stock = substitute_stock(stock, substitution, EQUIPMENT_TYPES, supply[None, None])
+    
+    # Create DataFrame, already sorted by date_key, period_id, station_id, equipment_id
+    return stock_to_frame(stock, dates, stations, EQUIPMENT_TYPES, scenario_id)
+
+if __name__ == '__main__':
+    # Load prerequisite data
+    dim_station = pd.read_csv('dim_station.csv')
+    dim_equipment = pd.read_csv('dim_equipment.csv')
+    dim_time_slot = pd.read_csv('dim_time_slot.csv')
+    dim_date = pd.read_csv('dim_date.csv')
+    
+    outbound_agg = None
+    if USE_FORECAST:
+        demand_agg = pd.read_csv(FORECAST_PATH)[['station_id', 'date_key', 'period_id', 'equipment_id', 'demand_qty']]
+        dates = sorted(demand_agg['date_key'].unique())  # Forecast horizon
+    else:
+        if USE_DYNAMIC_PERIODS:
+            period_mapping = PeriodMapping.from_frame(pd.read_csv(DYNAMIC_PERIOD_PATH))
+        else:
+            period_mapping = None
+        
+        # Aggregate demand by station, date, period (of the pickup slot), equipment, chunk by chunk
+        demand_agg = aggregate_flight_demand_chunked('fact_flight_demand.csv', dim_time_slot, period_mapping)
+        if USE_DEPARTURES:
+            outbound_agg = aggregate_flight_demand_chunked(OUTBOUND_PATH, dim_time_slot, period_mapping)
+        dates = list(dim_date['date_key'])  # All date_keys from dim_date
+    
+    stations = list(dim_station['station_id'])
+    periods = PERIODS
+    equipment_types = EQUIPMENT_TYPES
+    capacity_calendar = CapacityCalendar.load(CALENDAR_PATH) if USE_CAPACITY_CALENDAR else None
+    substitution = SubstitutionMatrix.load(SUBSTITUTION_PATH) if USE_SUBSTITUTION else None
+    fact_station_stock = build_station_stock(dim_station, dim_equipment, dates, demand_agg,
+                                             capacity_calendar=capacity_calendar, dim_time_slot=dim_time_slot,
+                                             substitution=substitution, outbound_agg=outbound_agg)
+    
+    # Save to CSV
+    fact_station_stock.to_csv('fact_station_stock.csv', index=False, float_format='%.1f')
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    expected_rows = len(dates) * len(periods) * len(stations) * len(equipment_types)
+    print(f"\nTotal row count: {len(fact_station_stock):,} (expected: {expected_rows:,})")
+    print(f"Date range: {fact_station_stock['date_key'].min()} to {fact_station_stock['date_key'].max()}")
+
+    # Bottleneck rate
+    bottleneck_rate = (fact_station_stock['bottleneck_flag'] == 'TRUE').sum() / len(fact_station_stock) * 100
+    print(f"\nBottleneck rate: {bottleneck_rate:.1f}%")
+    if outbound_agg is not None:
+        print(f"Outbound units netted off capacity: {fact_station_stock['reserved_outbound'].sum():,} "
+              f"(fixed {RESERVE_RATIO:.0%} reservation: {np.floor(fact_station_stock['capacity'] * RESERVE_RATIO).sum():,.0f})")
+    if 'substituted_qty' in fact_station_stock:
+        print(f"Shortage units covered by substitute equipment: {fact_station_stock['substituted_qty'].sum():,}")
+
+    # Average utilization by equipment
+    print("\nAverage utilization_pct by equipment:")
+    equip_names = {1: '13C Container', 2: '14P Pallet', 4: '26-O Open Trolley', 6: '26-C Closed Trolley'}
+    for equip_id in sorted(fact_station_stock['equipment_id'].unique()):
+        avg_util = fact_station_stock[fact_station_stock['equipment_id'] == equip_id]['utilization_pct'].mean()
+        print(f"  equipment_id={equip_id} ({equip_names[equip_id]}): {avg_util:.1f}%")
+
+    # Stations with most bottlenecks
+    print("\nStations with most bottlenecks (top 3):")
+    bottleneck_by_station = fact_station_stock[fact_station_stock['bottleneck_flag'] == 'TRUE'].groupby('station_id').size().sort_values(ascending=False).head(3)
+    for station_id, count in bottleneck_by_station.items():
+        pct = count / len(fact_station_stock[fact_station_stock['station_id'] == station_id]) * 100
+        print(f"  station_id={station_id}: {count:,} bottlenecks ({pct:.1f}%)")
+
+    # Sample rows
+    print("\n--- First 5 rows ---")
+    print(fact_station_stock.head(5).to_string(index=False))
+
+    print("\n--- Last 5 rows ---")
+    print(fact_station_stock.tail(5).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("CSV file 'fact_station_stock.csv' created successfully!")
+    print("=" * 80)
\ No newline at end of file
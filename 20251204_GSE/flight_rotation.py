@@ -0,0 +1,110 @@
+import pandas as pd
+import numpy as np
+
+# Weekly operating frequencies for a rotation and how often each occurs
+FREQUENCY_OPTIONS = [7, 6, 5, 4, 3, 2, 1]
+FREQUENCY_WEIGHTS = [0.45, 0.05, 0.10, 0.10, 0.15, 0.10, 0.05]
+
+# Per-day perturbations applied when expanding the pattern
+SLOT_JITTER_SD = 1.5     # slots (5 min each)
+MAX_SLOT_JITTER = 6      # never move a flight more than 30 min from its scheduled slot
+CANCELLATION_RATE = 0.02
+
+FLIGHT_NUMBER_RANGE = (100, 9999)
+
+
+def days_to_mask(operating_days):
+    """Encode a [n, 7] Monday-first boolean matrix as 7-bit days_mask integers"""
+    operating_days = np.asarray(operating_days, dtype=np.int64)
+    return (operating_days << np.arange(7)).sum(axis=1)
+
+
+def mask_to_days(days_mask):
+    """Decode days_mask integers into a [n, 7] Monday-first boolean matrix"""
+    days_mask = np.asarray(days_mask, dtype=np.int64)
+    return ((days_mask[:, None] >> np.arange(7)) & 1).astype(bool)
+
+
+def mask_to_label(days_mask):
+    """Format a days_mask as the usual '1234567' schedule string"""
+    return ''.join(str(d + 1) if days_mask >> d & 1 else '.' for d in range(7))
+
+
+def draw_flight_numbers(airline_codes, rng, number_range=FLIGHT_NUMBER_RANGE):
+    """Draw flight numbers unique per airline, without rejection sampling"""
+    airline_codes = np.asarray(airline_codes)
+    flight_nums = np.zeros(len(airline_codes), dtype=np.int64)
+    low, high = number_range
+
+    for code in np.unique(airline_codes):
+        rows = np.flatnonzero(airline_codes == code)
+        if len(rows) > high - low + 1:
+            raise ValueError(f"Airline {code} needs {len(rows)} flight numbers, only {high - low + 1} available")
+        flight_nums[rows] = rng.choice(np.arange(low, high + 1), size=len(rows), replace=False)
+
+    return flight_nums
+
+
+def build_weekly_pattern(airlines, choose_aircraft, arrival_sampler, origins, flights_per_day, rng):
+    """Define the weekly rotation pattern (flight number, aircraft, slot, operating days) once"""
+    # Add rotations until the week carries the target number of flights
+    target = flights_per_day * 7
+    frequencies = []
+    while sum(frequencies) < target:
+        frequency = int(rng.choice(FREQUENCY_OPTIONS, p=FREQUENCY_WEIGHTS))
+        frequencies.append(min(frequency, target - sum(frequencies)))
+    frequencies = np.array(frequencies)
+    num_rotations = len(frequencies)
+
+    # Airline per rotation by revenue weight
+    airline_weights = np.array([a[2] for a in airlines])
+    airline_idx = rng.choice(len(airlines), size=num_rotations, p=airline_weights / airline_weights.sum())
+    airline_codes = np.array([airlines[i][0] for i in airline_idx])
+    airline_names = np.array([airlines[i][1] for i in airline_idx])
+
+    # Operating days: the `frequency` lowest random keys of each row
+    day_rank = np.argsort(np.argsort(rng.random((num_rotations, 7)), axis=1), axis=1)
+    operating_days = day_rank < frequencies[:, None]
+    days_mask = days_to_mask(operating_days)
+    first_day = operating_days.argmax(axis=1) + 1
+
+    pattern = pd.DataFrame({
+        'rotation_id': np.arange(1, num_rotations + 1),
+        'airline_code': airline_codes,
+        'airline_name': airline_names,
+        'flight_num': draw_flight_numbers(airline_codes, rng),
+        'aircraft_id': [choose_aircraft(code) for code in airline_codes],
+        'origin_airport': rng.choice(origins, size=num_rotations),
+        'base_slot_id': arrival_sampler.sample(airline_codes=airline_codes, days_of_week=first_day, rng=rng),
+        'days_mask': days_mask,
+        'weekly_frequency': frequencies
+    })
+    pattern['flight_number'] = pattern['airline_code'] + pattern['flight_num'].astype(str)
+    return pattern
+
+
+def expand_pattern(pattern, start_date, end_date):
+    """Return (rotation_index, date_key, day_of_week) for every operating date, in date order"""
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    operating = mask_to_days(pattern['days_mask'].to_numpy())[:, dates.dayofweek]
+
+    # Date-major order so each day's flights are contiguous
+    day_index, rotation_index = np.nonzero(operating.T)
+    date_keys = (dates.year * 10000 + dates.month * 100 + dates.day).to_numpy()
+    return rotation_index, date_keys[day_index], dates.dayofweek.to_numpy()[day_index] + 1
+
+
+def perturb_slots(base_slots, rng, jitter_sd=SLOT_JITTER_SD, max_jitter=MAX_SLOT_JITTER):
+    """Jitter scheduled slots per operating day, staying within the same day"""
+    jitter = np.clip(np.rint(rng.normal(0.0, jitter_sd, size=len(base_slots))), -max_jitter, max_jitter)
+    return np.clip(np.asarray(base_slots) + jitter.astype(np.int64), 1, 288)
+
+
+def draw_operating(size, rng, cancellation_rate=CANCELLATION_RATE):
+    """Boolean mask of operated (not cancelled) flight instances"""
+    return rng.random(size) >= cancellation_rate
+
+
+def broadcast_to_dates(per_rotation_values, rotation_index):
+    """Broadcast values computed once per rotation to each of its operating dates"""
+    return np.asarray(per_rotation_values)[rotation_index]
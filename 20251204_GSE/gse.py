@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Run GSE pipeline stages in one process
+
+    python gse.py generate --start 2025-03-01 --end 2025-08-31 --flights-per-day 75-85 --seed 42
+    python gse.py stock --output-dir out --backend polars
+    python gse.py all --output-dir out --format parquet
+    python gse.py all --output-dir out --departures
+
+Tables produced by an earlier stage stay in memory for the later ones. Missing inputs are
+read from the output directory, then from the reference CSVs next to this script; the large
+fact inputs of stock and replenish are streamed in chunks when read from CSV.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from datetime import datetime
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Stages per subcommand, in run order
+COMMANDS = {
+    'generate': ['dim_date', 'dim_flight', 'dim_departure', 'fact_flight_demand'],
+    'stock': ['fact_station_stock'],
+    'replenish': ['fact_replenishment']
+}
+COMMANDS['all'] = COMMANDS['generate'] + COMMANDS['stock'] + COMMANDS['replenish']
+
+# Stages that only run with their command-line flag
+OPTIONAL_STAGES = {'dim_departure': 'departures'}
+
+
+class PipelineState:
+    """Tables loaded or produced during one run, shared by every stage"""
+
+    def __init__(self, output_dir, data_dir=DATA_DIR, output_format='csv'):
+        self.output_dir = output_dir
+        self.data_dir = data_dir
+        self.output_format = output_format
+        self.tables = {}
+        self._apron_paths = None
+
+    def find(self, name):
+        """Path of a stored table: output directory first, then the reference data"""
+        candidates = [
+            os.path.join(self.output_dir, f'{name}.{self.output_format}'),
+            os.path.join(self.output_dir, f'{name}.csv'),
+            os.path.join(self.data_dir, f'{name}.csv')
+        ]
+        for path in candidates:
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"No input for '{name}' in {self.output_dir} or {self.data_dir}")
+
+    def get(self, name):
+        """Table by name, loading it on first use"""
+        if name not in self.tables:
+            import pandas as pd
+            path = self.find(name)
+            self.tables[name] = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+        return self.tables[name]
+
+    def put(self, name, frame):
+        """Keep a produced table for later stages and write it to the output directory"""
+        self.tables[name] = frame
+        path = os.path.join(self.output_dir, f'{name}.{self.output_format}')
+        if self.output_format == 'parquet':
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False, float_format='%.1f')
+        return path
+
+    def apron_paths(self):
+        """Station/stand road network, cached in the output directory"""
+        if self._apron_paths is None:
+            from apron_network import ApronPaths
+            self._apron_paths = ApronPaths.load(
+                os.path.join(self.data_dir, 'dim_apron_node.csv'),
+                os.path.join(self.data_dir, 'dim_apron_edge.csv'),
+                os.path.join(self.output_dir, 'apron_paths.npz')
+            )
+        return self._apron_paths
+
+    def capacity_calendar(self):
+        """Capacity deltas from dim_capacity_calendar"""
+        from capacity_calendar import CapacityCalendar
+        return CapacityCalendar(self.get('dim_capacity_calendar'))
+
+    def substitution(self):
+        """Equipment substitution rules from dim_equipment_substitution"""
+        from substitution import SubstitutionMatrix
+        return SubstitutionMatrix(self.get('dim_equipment_substitution'))
+
+
+def run_dim_date(state, args):
+    """Calendar covering every year of the date range"""
+    from dim_date import build_dim_date
+    return build_dim_date(datetime(args.start.year, 1, 1), datetime(args.end.year, 12, 31))
+
+
+def run_dim_flight(state, args):
+    """Flight schedule for the date range"""
+    from dim_flight import generate_flights, load_arrival_sampler, ARRIVAL_PROFILE_PATH
+    dim_flight, pattern = generate_flights(
+        args.start, args.end, state.get('dim_aircraft'), args.flights_per_day, args.seed, args.schedule_model,
+        load_arrival_sampler(os.path.join(state.data_dir, ARRIVAL_PROFILE_PATH))
+    )
+    if pattern is not None:
+        state.put('dim_flight_rotation', pattern)
+    return dim_flight
+
+
+def run_dim_departure(state, args):
+    """Departure of every arriving aircraft after its turnaround"""
+    from dim_departure import generate_departures
+    return generate_departures(state.get('dim_flight'), state.get('dim_aircraft'), args.seed)
+
+
+def run_fact_flight_demand(state, args):
+    """Equipment demand per flight (and per departure with --departures)"""
+    from fact_flight_demand import generate_flight_demand
+    fact_flight_demand, fact_outbound_demand = generate_flight_demand(
+        state.get('dim_flight'), state.get('dim_aircraft'), state.get('dim_equipment'),
+        state.get('dim_station'), state.get('dim_parking_stand'), state.apron_paths(), args.seed, args.demand_model,
+        state.capacity_calendar() if args.capacity_calendar else None,
+        state.substitution() if args.substitution else None,
+        state.get('dim_departure') if args.departures else None,
+        state.get('dim_flight_rotation') if args.schedule_model == 'rotation' else None
+    )
+    if fact_outbound_demand is not None:
+        state.put('fact_outbound_demand', fact_outbound_demand)
+    return fact_flight_demand
+
+
+def run_fact_station_stock(state, args):
+    """Station stock positions from the flight demand"""
+    capacity_calendar = state.capacity_calendar() if args.capacity_calendar else None
+    substitution = state.substitution() if args.substitution else None
+    demand_names = ['fact_flight_demand'] + (['fact_outbound_demand'] if args.departures else [])
+    if args.backend == 'polars':
+        from polars_backend import build_station_stock as build_station_stock_polars
+        sources = [state.tables[name] if name in state.tables else state.find(name) for name in demand_names]
+        return build_station_stock_polars(
+            sources[0], state.get('dim_time_slot'),
+            state.get('dim_station'), state.get('dim_equipment'), list(state.get('dim_date')['date_key']),
+            capacity_calendar=capacity_calendar, substitution=substitution,
+            fact_outbound_demand=sources[1] if args.departures else None
+        )
+
+    from stock_kernel import aggregate_flight_demand, aggregate_flight_demand_chunked
+    from fact_station_stock import build_station_stock
+    aggregates = []
+    for name in demand_names:
+        path = None if name in state.tables else state.find(name)
+        if path is not None and path.endswith('.csv'):
+            aggregates.append(aggregate_flight_demand_chunked(path, state.get('dim_time_slot')))
+        else:
+            aggregates.append(aggregate_flight_demand(state.get(name), state.get('dim_time_slot')))
+    return build_station_stock(
+        state.get('dim_station'), state.get('dim_equipment'), list(state.get('dim_date')['date_key']), aggregates[0],
+        capacity_calendar=capacity_calendar, dim_time_slot=state.get('dim_time_slot'), substitution=substitution,
+        outbound_agg=aggregates[1] if args.departures else None
+    )
+
+
+def run_fact_replenishment(state, args):
+    """Replenishment moves from the station stock"""
+    if args.backend == 'polars':
+        from polars_backend import generate_replenishment as generate_replenishment_polars
+        source = state.tables.get('fact_station_stock')
+        return generate_replenishment_polars(
+            state.find('fact_station_stock') if source is None else source,
+            state.get('dim_station'), state.apron_paths(), args.seed
+        )
+
+    from fact_replenishment import generate_replenishment, read_stock_candidates
+    path = None if 'fact_station_stock' in state.tables else state.find('fact_station_stock')
+    if path is not None and path.endswith('.csv'):
+        fact_station_stock = read_stock_candidates(path)
+    else:
+        fact_station_stock = state.get('fact_station_stock')
+    return generate_replenishment(fact_station_stock, state.get('dim_station'), state.apron_paths(), args.seed)
+
+
+STAGES = {
+    'dim_date': run_dim_date,
+    'dim_flight': run_dim_flight,
+    'dim_departure': run_dim_departure,
+    'fact_flight_demand': run_fact_flight_demand,
+    'fact_station_stock': run_fact_station_stock,
+    'fact_replenishment': run_fact_replenishment
+}
+
+
+def parse_date(value):
+    """YYYY-MM-DD or YYYYMMDD"""
+    for fmt in ('%Y-%m-%d', '%Y%m%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"invalid date '{value}' (expected YYYY-MM-DD)")
+
+
+def parse_flights_per_day(value):
+    """'80' or an inclusive range '75-85'"""
+    try:
+        low, _, high = value.partition('-')
+        low, high = int(low), int(high or low)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid flights per day '{value}' (expected N or MIN-MAX)")
+    if not 0 < low <= high:
+        raise argparse.ArgumentTypeError(f"invalid flights per day '{value}'")
+    return low, high
+
+
+def build_parser():
+    """Argument parser with one subcommand per stage group"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--start', type=parse_date, default=datetime(2025, 3, 1), help='first flight date (default 2025-03-01)')
+    common.add_argument('--end', type=parse_date, default=datetime(2025, 8, 31), help='last flight date (default 2025-08-31)')
+    common.add_argument('--flights-per-day', type=parse_flights_per_day, default=(75, 85), metavar='N|MIN-MAX',
+                        help='flights per day, drawn uniformly from the range (default 75-85)')
+    common.add_argument('--schedule-model', choices=['daily', 'rotation'], default='daily', help='flight schedule model')
+    common.add_argument('--demand-model', choices=['formula', 'packing'], default='formula',
+                        help='dolly demand model: position/cargo formula or ULD bin-packing')
+    common.add_argument('--capacity-calendar', action='store_true',
+                        help='apply the dim_capacity_calendar maintenance/closure deltas to station capacity')
+    common.add_argument('--departures', action='store_true',
+                        help='generate departures and net their outbound demand instead of reserving 50%% of capacity')
+    common.add_argument('--substitution', action='store_true',
+                        help='let dim_equipment_substitution types cover shortages (e.g. 26-C for 26-O)')
+    common.add_argument('--seed', type=int, default=42, help='random seed for every stage (default 42)')
+    common.add_argument('--output-dir', default='.', help='directory for outputs and intermediate inputs')
+    common.add_argument('--backend', choices=['pandas', 'polars'], default='pandas',
+                        help='engine for the stock and replenish stages (polars runs them as lazy multi-threaded plans)')
+    common.add_argument('--format', dest='output_format', choices=['csv', 'parquet'], default='csv', help='output file format')
+
+    parser = argparse.ArgumentParser(prog='gse', description='GSE demand, stock and replenishment pipeline')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('generate', parents=[common], help='dim_date, dim_flight (dim_departure) and fact_flight_demand')
+    subparsers.add_parser('stock', parents=[common], help='fact_station_stock from fact_flight_demand')
+    subparsers.add_parser('replenish', parents=[common], help='fact_replenishment from fact_station_stock')
+    subparsers.add_parser('all', parents=[common], help='every stage in one process')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.end < args.start:
+        print(f"gse: --end {args.end:%Y-%m-%d} is before --start {args.start:%Y-%m-%d}", file=sys.stderr)
+        return 2
+
+    if args.output_format == 'parquet' and not any(importlib.util.find_spec(m) for m in ('pyarrow', 'fastparquet')):
+        print("gse: --format parquet needs pyarrow or fastparquet installed", file=sys.stderr)
+        return 2
+
+    if args.backend == 'polars' and importlib.util.find_spec('polars') is None:
+        print("gse: --backend polars needs polars installed", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    state = PipelineState(args.output_dir, output_format=args.output_format)
+
+    total_start = time.perf_counter()
+    for name in COMMANDS[args.command]:
+        if name in OPTIONAL_STAGES and not getattr(args, OPTIONAL_STAGES[name]):
+            continue
+        start_time = time.perf_counter()
+        frame = STAGES[name](state, args)
+        path = state.put(name, frame)
+        print(f"{name}: {len(frame):,} rows in {time.perf_counter() - start_time:.1f}s -> {path}")
+    print(f"Done in {time.perf_counter() - total_start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+import pandas as pd
+import numpy as np
+import heapq
+from jit_kernels import JIT_ENABLED, allocate_intervals_kernel, allocate_substitutes_kernel
+
+SLOTS_PER_DAY = 288
+
+
+def risk_levels(shortage_qty):
+    """Risk level from shortage: OK (0), LOW (-1), MEDIUM (-2..-3), HIGH (below -3)"""
+    shortage_qty = np.asarray(shortage_qty)
+    return np.select(
+        [shortage_qty == 0, shortage_qty == -1, shortage_qty >= -3],
+        ['OK', 'LOW', 'MEDIUM'],
+        default='HIGH'
+    )
+
+
+def absolute_demand_times(date_keys, arrival_slot_ids, pickup_slot_ids, return_slot_ids, first_date_key=None):
+    """Pickup/return times as slots since the first date, resolving midnight wrap
+
+    A pickup slot after the arrival slot belongs to the previous day and a return
+    slot before the arrival slot to the next day.
+    """
+    dates = pd.to_datetime(pd.Series(date_keys).astype(str), format='%Y%m%d')
+    first_date = dates.min() if first_date_key is None else pd.to_datetime(str(first_date_key), format='%Y%m%d')
+    day = (dates - first_date).dt.days.to_numpy()
+
+    arrival = np.asarray(arrival_slot_ids)
+    pickup = np.asarray(pickup_slot_ids)
+    ret = np.asarray(return_slot_ids)
+    pickup_time = (day - (pickup > arrival)) * SLOTS_PER_DAY + pickup
+    return_time = (day + (ret < arrival)) * SLOTS_PER_DAY + ret
+    return pickup_time, return_time
+
+
+def allocate_intervals(station_ids, equipment_ids, qty_required, pickup_time, return_time, capacity, row_capacity=None):
+    """Assign units in pickup order, releasing each allocation at its return time
+
+    capacity is a [station_id, equipment_id] array; row_capacity, when given, is the
+    effective capacity at each row's pickup time instead (see capacity_calendar). One
+    min-heap of outstanding (return_time, qty) per station/equipment tracks units in use.
+    With numba the same loop runs compiled over flat arrays (jit_kernels.allocate_intervals_kernel).
+    """
+    if row_capacity is None:
+        row_capacity = capacity[np.asarray(station_ids, dtype=np.int64), np.asarray(equipment_ids, dtype=np.int64)]
+
+    if JIT_ENABLED:
+        keys = np.asarray(station_ids, dtype=np.int64) * capacity.shape[1] + np.asarray(equipment_ids, dtype=np.int64)
+        key_offsets = np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=capacity.size))])
+        return allocate_intervals_kernel(
+            np.argsort(pickup_time, kind='stable'), keys, np.asarray(qty_required, dtype=np.int64),
+            np.asarray(pickup_time, dtype=np.int64), np.asarray(return_time, dtype=np.int64),
+            np.asarray(row_capacity, dtype=np.int64), key_offsets
+        )
+
+    station_ids = np.asarray(station_ids).tolist()
+    equipment_ids = np.asarray(equipment_ids).tolist()
+    qty_required = np.asarray(qty_required).tolist()
+    pickup_time = np.asarray(pickup_time)
+    return_time = np.asarray(return_time).tolist()
+    row_capacity = np.asarray(row_capacity).tolist()
+
+    allocated = [0] * len(station_ids)
+    outstanding = {}
+    in_use = {}
+
+    # Stable order: pickup time, then original row order
+    for row in np.argsort(pickup_time, kind='stable').tolist():
+        key = (station_ids[row], equipment_ids[row])
+        heap = outstanding.setdefault(key, [])
+        used = in_use.get(key, 0)
+
+        # Units returned by now are free again
+        now = pickup_time[row]
+        while heap and heap[0][0] <= now:
+            used -= heapq.heappop(heap)[1]
+
+        free = row_capacity[row] - used
+        qty = max(0, min(qty_required[row], free))
+        if qty > 0:
+            heapq.heappush(heap, (return_time[row], qty))
+            used += qty
+
+        in_use[key] = used
+        allocated[row] = qty
+
+    return np.array(allocated, dtype=np.int64)
+
+
+def allocate_with_substitutes(station_ids, equipment_ids, qty_required, pickup_time, return_time, capacity, rules,
+                              row_capacity=None, substitute_capacity=None):
+    """allocate_intervals() where a short row then takes free substitute units at its station
+
+    rules are (required, substitute, units_per_unit) in preference order (see
+    substitution.SubstitutionMatrix); substitute_capacity, when given, is the [row, rule]
+    capacity of each rule's substitute at the row's pickup time. Units lent stay in use
+    until the row's return time, in the same single pass over pickup order.
+    Returns (own units allocated, required units covered by substitutes).
+    """
+    station_ids = np.asarray(station_ids, dtype=np.int64)
+    equipment_ids = np.asarray(equipment_ids, dtype=np.int64)
+    if row_capacity is None:
+        row_capacity = capacity[station_ids, equipment_ids]
+    substitute_keys = np.full((len(station_ids), len(rules)), -1, dtype=np.int64)
+    units_per_unit = np.array([units for _, _, units in rules], dtype=np.int64)
+    for rule, (required, substitute, _) in enumerate(rules):
+        applies = equipment_ids == required
+        substitute_keys[applies, rule] = station_ids[applies] * capacity.shape[1] + substitute
+    if substitute_capacity is None:
+        substitute_capacity = capacity.reshape(-1)[np.maximum(substitute_keys, 0)]
+
+    if JIT_ENABLED:
+        keys = station_ids * capacity.shape[1] + equipment_ids
+        pushes = np.concatenate([keys, substitute_keys[substitute_keys >= 0]])
+        key_offsets = np.concatenate([[0], np.cumsum(np.bincount(pushes, minlength=capacity.size))])
+        return allocate_substitutes_kernel(
+            np.argsort(pickup_time, kind='stable'), keys, np.asarray(qty_required, dtype=np.int64),
+            np.asarray(pickup_time, dtype=np.int64), np.asarray(return_time, dtype=np.int64),
+            np.asarray(row_capacity, dtype=np.int64), key_offsets, substitute_keys,
+            np.asarray(substitute_capacity, dtype=np.int64), units_per_unit
+        )
+
+    keys = (station_ids * capacity.shape[1] + equipment_ids).tolist()
+    qty_required = np.asarray(qty_required).tolist()
+    pickup_time = np.asarray(pickup_time)
+    return_time = np.asarray(return_time).tolist()
+    row_capacity = np.asarray(row_capacity).tolist()
+    substitute_keys = substitute_keys.tolist()
+    substitute_capacity = np.asarray(substitute_capacity).tolist()
+    units_per_unit = units_per_unit.tolist()
+
+    allocated = [0] * len(keys)
+    substituted = [0] * len(keys)
+    outstanding = {}
+    in_use = {}
+
+    for row in np.argsort(pickup_time, kind='stable').tolist():
+        now = pickup_time[row]
+        need = qty_required[row]
+        # Own units first, then each substitute in preference order
+        pools = [(keys[row], row_capacity[row], 1)] + [
+            (key, key_capacity, units)
+            for key, key_capacity, units in zip(substitute_keys[row], substitute_capacity[row], units_per_unit)
+            if key >= 0
+        ]
+        for pool, (key, key_capacity, units) in enumerate(pools):
+            if need == 0:
+                break
+            heap = outstanding.setdefault(key, [])
+            used = in_use.get(key, 0)
+            while heap and heap[0][0] <= now:
+                used -= heapq.heappop(heap)[1]
+
+            qty = max(0, min(need, (key_capacity - used) // units))
+            if qty > 0:
+                heapq.heappush(heap, (return_time[row], qty * units))
+                used += qty * units
+                need -= qty
+                if pool == 0:
+                    allocated[row] = qty
+                else:
+                    substituted[row] += qty
+            in_use[key] = used
+
+    return np.array(allocated, dtype=np.int64), np.array(substituted, dtype=np.int64)
+
+
+def station_capacity_array(dim_station, dim_equipment):
+    """[station_id, equipment_id] capacity array from the capacity_<asset_code> columns"""
+    capacity = np.zeros((dim_station['station_id'].max() + 1, dim_equipment['equipment_id'].max() + 1), dtype=np.int64)
+    for _, equipment in dim_equipment.iterrows():
+        column = 'capacity_' + equipment['asset_code'].lower().replace('-', '')
+        capacity[dim_station['station_id'].to_numpy(), equipment['equipment_id']] = dim_station[column].to_numpy()
+    return capacity
+
+
+def allocate_demand(fact_flight_demand, dim_station, dim_equipment, capacity_calendar=None, substitution=None):
+    """qty_allocated, shortage_qty, risk_level and sla_compliant from real contention
+
+    capacity_calendar (a capacity_calendar.CapacityCalendar) makes capacity time-varying.
+    substitution (a substitution.SubstitutionMatrix) lets short rows take other equipment
+    types; qty_allocated then includes the covered units and qty_substituted is added.
+    """
+    pickup_time, return_time = absolute_demand_times(
+        fact_flight_demand['date_key'], fact_flight_demand['arrival_slot_id'],
+        fact_flight_demand['pickup_slot_id'], fact_flight_demand['return_slot_id']
+    )
+    capacity = station_capacity_array(dim_station, dim_equipment)
+    row_capacity = None
+    if capacity_calendar is not None:
+        row_capacity = capacity_calendar.row_capacity(
+            capacity, fact_flight_demand['station_id'], fact_flight_demand['equipment_id'],
+            pickup_time, fact_flight_demand['date_key'].min()
+        )
+    if substitution is None:
+        qty_allocated = allocate_intervals(
+            fact_flight_demand['station_id'], fact_flight_demand['equipment_id'],
+            fact_flight_demand['qty_required'], pickup_time, return_time, capacity, row_capacity
+        )
+        allocation = {'qty_allocated': qty_allocated}
+    else:
+        rules = substitution.allocation_rules(fact_flight_demand['equipment_id'])
+        substitute_capacity = None
+        if capacity_calendar is not None and rules:
+            substitute_capacity = np.stack([capacity_calendar.row_capacity(
+                capacity, fact_flight_demand['station_id'], np.full(len(fact_flight_demand), substitute),
+                pickup_time, fact_flight_demand['date_key'].min()
+            ) for _, substitute, _ in rules], axis=1)
+        qty_own, qty_substituted = allocate_with_substitutes(
+            fact_flight_demand['station_id'], fact_flight_demand['equipment_id'],
+            fact_flight_demand['qty_required'], pickup_time, return_time, capacity, rules,
+            row_capacity, substitute_capacity
+        )
+        qty_allocated = qty_own + qty_substituted
+        allocation = {'qty_allocated': qty_allocated, 'qty_substituted': qty_substituted}
+    shortage_qty = qty_allocated - fact_flight_demand['qty_required'].to_numpy()
+
+    return {
+        **allocation,
+        'shortage_qty': shortage_qty,
+        'risk_level': risk_levels(shortage_qty),
+        'sla_compliant': np.where(shortage_qty >= -1, 'TRUE', 'FALSE')
+    }
@@ -0,0 +1,283 @@
+import numpy as np
+import os
+
+# Optional numba: kernels are compiled when it is installed, plain Python otherwise.
+# Set GSE_DISABLE_JIT=1 to force the pure-Python path (outputs are identical either way).
+try:
+    if os.environ.get('GSE_DISABLE_JIT') == '1':
+        raise ImportError
+    from numba import njit
+    JIT_ENABLED = True
+except ImportError:
+    JIT_ENABLED = False
+
+    def njit(*args, **kwargs):
+        """Identity decorator used when numba is not available"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
+
+
+@njit(cache=True)
+def deplete_surplus(shortage_offsets, shortage_station, shortage_qty, surplus_offsets, surplus_station, surplus_qty,
+                    distance_km, draw_status, draws, gate=0.30):
+    """Greedy shortage/surplus matching per group, consuming pre-drawn uniforms in call order
+
+    Groups are (date, period, equipment); within a group shortages come most severe first
+    and surpluses largest first. Each shortage draws once for the sampling gate; a matched
+    move then draws its trigger reason and, when draw_status[group], its status.
+    Returns (number of moves, shortage row, from station, qty, trigger draw, status draw,
+    draws consumed); status draw is -1 when none was taken.
+    """
+    num_shortages = len(shortage_station)
+    move_shortage = np.empty(num_shortages, dtype=np.int64)
+    move_from = np.empty(num_shortages, dtype=np.int64)
+    move_qty = np.empty(num_shortages, dtype=np.int64)
+    move_trigger = np.empty(num_shortages, dtype=np.float64)
+    move_status = np.empty(num_shortages, dtype=np.float64)
+    available = surplus_qty.copy()
+
+    moves = 0
+    cursor = 0
+    for group in range(len(shortage_offsets) - 1):
+        s_start, s_end = shortage_offsets[group], shortage_offsets[group + 1]
+        p_start, p_end = surplus_offsets[group], surplus_offsets[group + 1]
+        if s_start == s_end or p_start == p_end:
+            continue
+
+        for s in range(s_start, s_end):
+            to_station = shortage_station[s]
+            needed = -shortage_qty[s]
+
+            gate_draw = draws[cursor]
+            cursor += 1
+            if gate_draw > gate:
+                continue
+
+            # Closest station with surplus left (first one wins ties)
+            best = -1
+            best_distance = np.inf
+            for p in range(p_start, p_end):
+                if available[p] <= 0 or surplus_station[p] == to_station:
+                    continue
+                distance = distance_km[surplus_station[p], to_station]
+                if distance < best_distance:
+                    best_distance = distance
+                    best = p
+            if best < 0:
+                continue
+
+            qty = min(needed, available[best])
+            if qty == 0:
+                continue
+            available[best] -= qty
+
+            move_shortage[moves] = s
+            move_from[moves] = surplus_station[best]
+            move_qty[moves] = qty
+            move_trigger[moves] = draws[cursor]
+            cursor += 1
+            move_status[moves] = -1.0
+            if draw_status[group]:
+                move_status[moves] = draws[cursor]
+                cursor += 1
+            moves += 1
+
+    return (moves, move_shortage[:moves], move_from[:moves], move_qty[:moves],
+            move_trigger[:moves], move_status[:moves], cursor)
+
+
+@njit(cache=True)
+def unique_flight_numbers(group_index, candidates, low, high, num_groups):
+    """First candidate per row not yet used in its group (e.g. airline on one day)
+
+    candidates is [rows, k] of pre-drawn numbers in [low, high]. If all k are taken the
+    next free number after the last candidate is used, so there is no rejection loop.
+    """
+    span = high - low + 1
+    used = np.zeros((num_groups, span), dtype=np.bool_)
+    numbers = np.empty(len(group_index), dtype=np.int64)
+    for row in range(len(group_index)):
+        group = group_index[row]
+        chosen = -1
+        for k in range(candidates.shape[1]):
+            if not used[group, candidates[row, k] - low]:
+                chosen = candidates[row, k]
+                break
+        if chosen < 0:
+            start = candidates[row, candidates.shape[1] - 1] - low
+            for step in range(1, span):
+                if not used[group, (start + step) % span]:
+                    chosen = low + (start + step) % span
+                    break
+        if chosen < 0:
+            raise ValueError("flight number range exhausted")
+        used[group, chosen - low] = True
+        numbers[row] = chosen
+    return numbers
+
+
+@njit(cache=True)
+def _heap_push(times, qtys, base, size, time, qty):
+    """Push (time, qty) onto the min-heap stored at times[base:base + size]"""
+    i = size
+    while i > 0:
+        parent = (i - 1) // 2
+        if times[base + parent] <= time:
+            break
+        times[base + i] = times[base + parent]
+        qtys[base + i] = qtys[base + parent]
+        i = parent
+    times[base + i] = time
+    qtys[base + i] = qty
+
+
+@njit(cache=True)
+def _heap_pop(times, qtys, base, size):
+    """Remove the root of the min-heap at times[base:base + size]; returns its qty"""
+    qty = qtys[base]
+    size -= 1
+    last_time = times[base + size]
+    last_qty = qtys[base + size]
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and times[base + child + 1] < times[base + child]:
+            child += 1
+        if times[base + child] >= last_time:
+            break
+        times[base + i] = times[base + child]
+        qtys[base + i] = qtys[base + child]
+        i = child
+    times[base + i] = last_time
+    qtys[base + i] = last_qty
+    return qty
+
+
+@njit(cache=True)
+def allocate_intervals_kernel(order, keys, qty_required, pickup_time, return_time, capacity, key_offsets):
+    """Interval allocation over plain arrays (see interval_allocation.allocate_intervals)
+
+    capacity holds each row's capacity at its pickup time; each key owns a heap region
+    [key_offsets[key], key_offsets[key + 1]) of outstanding (return_time, qty).
+    """
+    num_keys = len(key_offsets) - 1
+    heap_times = np.empty(len(keys), dtype=np.int64)
+    heap_qtys = np.empty(len(keys), dtype=np.int64)
+    heap_size = np.zeros(num_keys, dtype=np.int64)
+    used = np.zeros(num_keys, dtype=np.int64)
+    allocated = np.zeros(len(keys), dtype=np.int64)
+
+    for row in order:
+        key = keys[row]
+        base = key_offsets[key]
+
+        # Units returned by now are free again
+        now = pickup_time[row]
+        while heap_size[key] > 0 and heap_times[base] <= now:
+            used[key] -= _heap_pop(heap_times, heap_qtys, base, heap_size[key])
+            heap_size[key] -= 1
+
+        qty = max(0, min(qty_required[row], capacity[row] - used[key]))
+        if qty > 0:
+            _heap_push(heap_times, heap_qtys, base, heap_size[key], return_time[row], qty)
+            heap_size[key] += 1
+            used[key] += qty
+        allocated[row] = qty
+
+    return allocated
+
+
+@njit(cache=True)
+def allocate_substitutes_kernel(order, keys, qty_required, pickup_time, return_time, capacity, key_offsets,
+                                substitute_keys, substitute_capacity, units_per_unit):
+    """allocate_intervals_kernel where a short row then draws from substitute keys
+
+    substitute_keys[row, rule] is the key of the rule's substitute at the row's station
+    (-1 when the rule does not apply) and substitute_capacity[row, rule] its capacity at
+    pickup; units_per_unit[rule] substitute units cover one required unit. Heap regions
+    must hold the substitute pushes too. Returns (own units, required units covered).
+    """
+    num_keys = len(key_offsets) - 1
+    heap_times = np.empty(key_offsets[num_keys], dtype=np.int64)
+    heap_qtys = np.empty(key_offsets[num_keys], dtype=np.int64)
+    heap_size = np.zeros(num_keys, dtype=np.int64)
+    used = np.zeros(num_keys, dtype=np.int64)
+    allocated = np.zeros(len(keys), dtype=np.int64)
+    substituted = np.zeros(len(keys), dtype=np.int64)
+
+    for row in order:
+        now = pickup_time[row]
+        need = qty_required[row]
+        for rule in range(-1, substitute_keys.shape[1]):
+            if need == 0:
+                break
+            if rule < 0:
+                key, key_capacity, units = keys[row], capacity[row], 1
+            else:
+                key, key_capacity, units = substitute_keys[row, rule], substitute_capacity[row, rule], units_per_unit[rule]
+                if key < 0:
+                    continue
+            base = key_offsets[key]
+
+            # Units returned by now are free again
+            while heap_size[key] > 0 and heap_times[base] <= now:
+                used[key] -= _heap_pop(heap_times, heap_qtys, base, heap_size[key])
+                heap_size[key] -= 1
+
+            qty = max(0, min(need, (key_capacity - used[key]) // units))
+            if qty > 0:
+                _heap_push(heap_times, heap_qtys, base, heap_size[key], return_time[row], qty * units)
+                heap_size[key] += 1
+                used[key] += qty * units
+                need -= qty
+                if rule < 0:
+                    allocated[row] = qty
+                else:
+                    substituted[row] += qty
+
+    return allocated, substituted
+
+
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(42)
+
+    # Interval allocation on a synthetic year of demand rows
+    n = 45_000
+    keys = rng.integers(0, 40, size=n)
+    pickup_time = np.sort(rng.integers(0, 184 * 288, size=n))
+    return_time = pickup_time + rng.integers(9, 16, size=n)
+    qty_required = rng.integers(2, 12, size=n)
+    capacity = rng.integers(20, 60, size=40)[keys]
+    order = np.argsort(pickup_time, kind='stable')
+    key_offsets = np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=40))])
+
+    allocate_intervals_kernel(order[:10], keys, qty_required, pickup_time, return_time, capacity, key_offsets)
+    start_time = time.perf_counter()
+    allocated = allocate_intervals_kernel(order, keys, qty_required, pickup_time, return_time, capacity, key_offsets)
+    allocate_time = time.perf_counter() - start_time
+
+    # Flight numbers for a season of days
+    candidates = rng.integers(100, 10000, size=(80, 4))
+    groups = rng.integers(0, 22, size=80)
+    unique_flight_numbers(groups, candidates, 100, 9999, 22)
+    start_time = time.perf_counter()
+    for _ in range(184):
+        numbers = unique_flight_numbers(groups, candidates, 100, 9999, 22)
+    numbers_time = time.perf_counter() - start_time
+    pairs = set(zip(groups.tolist(), numbers.tolist()))
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nnumba JIT enabled: {JIT_ENABLED}")
+    print(f"Interval allocation: {n:,} rows in {allocate_time * 1000:.1f} ms, allocated {allocated.sum():,} units")
+    print(f"Flight numbers: 184 days x 80 flights in {numbers_time * 1000:.1f} ms, unique per airline: {len(pairs) == 80} ✓")
+
+    print("\n" + "=" * 80)
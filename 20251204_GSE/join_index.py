@@ -0,0 +1,166 @@
+import pandas as pd
+import numpy as np
+
+# Surrogate key of each dimension (date_key is dense within a year once offset by its minimum)
+DIMENSION_KEYS = {
+    'dim_flight': 'flight_id',
+    'dim_aircraft': 'aircraft_id',
+    'dim_station': 'station_id',
+    'dim_equipment': 'equipment_id',
+    'dim_time_slot': 'slot_id',
+    'dim_date': 'date_key'
+}
+
+
+def position_index(ids):
+    """Dense key -> row position array, offset by the smallest key; -1 marks keys not present
+
+    Returns (positions, offset) so that row = positions[key - offset].
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    offset = int(ids.min())
+    positions = np.full(int(ids.max()) - offset + 1, -1, dtype=np.int64)
+    positions[ids - offset] = np.arange(len(ids))
+    return positions, offset
+
+
+class DimensionIndex:
+    """Row positions of a dimension by surrogate key, so attribute lookups are one fancy-index"""
+
+    def __init__(self, frame, key):
+        self.frame = frame.reset_index(drop=True)
+        self.key = key
+        self.positions, self.offset = position_index(self.frame[key])
+        self._values = {}
+
+    def rows(self, ids):
+        """Row positions for keys; raises KeyError for keys not in the dimension"""
+        ids = np.asarray(ids, dtype=np.int64) - self.offset
+        in_range = (ids >= 0) & (ids < len(self.positions))
+        rows = np.full(len(ids), -1, dtype=np.int64)
+        rows[in_range] = self.positions[ids[in_range]]
+        if (rows < 0).any():
+            missing = np.asarray(ids)[rows < 0][:5] + self.offset
+            raise KeyError(f"{self.key} not found: {missing.tolist()}")
+        return rows
+
+    def attribute(self, ids, column):
+        """Column values for each key"""
+        if column not in self._values:
+            self._values[column] = self.frame[column].to_numpy()
+        return self._values[column][self.rows(ids)]
+
+    def attributes(self, ids, columns):
+        """DataFrame of several columns for each key (one row per key)"""
+        rows = self.rows(ids)
+        return pd.DataFrame({column: self.frame[column].to_numpy()[rows] for column in columns})
+
+
+class ChildIndex:
+    """CSR offsets from a parent key to its child rows (e.g. flight -> demand rows)
+
+    When the child rows are already grouped in key order the rows of a parent are a
+    plain slice; otherwise they go through one stored permutation.
+    """
+
+    def __init__(self, parent_ids, num_parents=None):
+        parent_ids = np.asarray(parent_ids, dtype=np.int64)
+        size = int(parent_ids.max()) + 1 if num_parents is None else num_parents + 1
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(parent_ids, minlength=size))])
+        grouped = (np.diff(parent_ids) >= 0).all()
+        self.order = None if grouped else np.argsort(parent_ids, kind='stable')
+
+    def rows(self, parent_id):
+        """Child row positions of one parent"""
+        start, end = self.offsets[parent_id], self.offsets[parent_id + 1]
+        if self.order is None:
+            return np.arange(start, end)
+        return self.order[start:end]
+
+    def slice(self, parent_id):
+        """Child rows of one parent as a slice (only when rows are grouped by parent)"""
+        if self.order is not None:
+            raise ValueError("child rows are not grouped by parent; use rows()")
+        return slice(self.offsets[parent_id], self.offsets[parent_id + 1])
+
+    def counts(self):
+        """Number of child rows per parent key"""
+        return np.diff(self.offsets)
+
+
+class JoinIndex:
+    """Position indexes for every dimension plus the flight -> demand offsets"""
+
+    def __init__(self, dimensions, fact_flight_demand=None):
+        self.dimensions = {
+            name: DimensionIndex(frame, DIMENSION_KEYS[name]) for name, frame in dimensions.items()
+        }
+        self.flight_demand = None
+        if fact_flight_demand is not None and 'dim_flight' in dimensions:
+            self.flight_demand = ChildIndex(fact_flight_demand['flight_id'], int(dimensions['dim_flight']['flight_id'].max()))
+
+    def __getitem__(self, name):
+        return self.dimensions[name]
+
+    def enrich(self, fact, name, columns, key=None):
+        """Copy of fact with dimension columns attached by key (key defaults to the dimension key)"""
+        dimension = self.dimensions[name]
+        attributes = dimension.attributes(fact[key or dimension.key], columns)
+        attributes.index = fact.index
+        return pd.concat([fact, attributes], axis=1)
+
+
+if __name__ == '__main__':
+    import time
+
+    # Load prerequisite files
+    dimensions = {name: pd.read_csv(f'{name}.csv') for name in DIMENSION_KEYS}
+    fact_flight_demand = pd.read_csv('fact_flight_demand.csv')
+
+    start_time = time.perf_counter()
+    join_index = JoinIndex(dimensions, fact_flight_demand)
+    build_time = time.perf_counter() - start_time
+
+    # Enrich demand rows with flight, station, pickup-slot and date attributes
+    start_time = time.perf_counter()
+    enriched = join_index.enrich(fact_flight_demand, 'dim_flight', ['aircraft_id', 'flight_number'])
+    enriched = join_index.enrich(enriched, 'dim_aircraft', ['aircraft_category'])
+    enriched = join_index.enrich(enriched, 'dim_station', ['stand_number'])
+    enriched = join_index.enrich(enriched, 'dim_time_slot', ['period_id'], key='pickup_slot_id')
+    enriched = join_index.enrich(enriched, 'dim_date', ['day_of_week'])
+    index_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    merged = fact_flight_demand.merge(dimensions['dim_flight'][['flight_id', 'aircraft_id', 'flight_number']], on='flight_id', how='left')
+    merged = merged.merge(dimensions['dim_aircraft'][['aircraft_id', 'aircraft_category']], on='aircraft_id', how='left')
+    merged = merged.merge(dimensions['dim_station'][['station_id', 'stand_number']], on='station_id', how='left')
+    merged = merged.merge(dimensions['dim_time_slot'][['slot_id', 'period_id']], left_on='pickup_slot_id', right_on='slot_id', how='left').drop(columns='slot_id')
+    merged = merged.merge(dimensions['dim_date'][['date_key', 'day_of_week']], on='date_key', how='left')
+    merge_time = time.perf_counter() - start_time
+
+    # Demand rows of every flight
+    flight_ids = dimensions['dim_flight']['flight_id'].to_numpy()
+    start_time = time.perf_counter()
+    slices = [join_index.flight_demand.rows(flight_id) for flight_id in flight_ids]
+    slice_time = time.perf_counter() - start_time
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nIndexes built in {build_time * 1000:.1f} ms:")
+    for name, dimension in join_index.dimensions.items():
+        print(f"  {name}: {len(dimension.frame):,} rows, key {dimension.key}, array size {len(dimension.positions):,}")
+
+    print(f"\nEnrich 5 dimensions: {index_time * 1000:.1f} ms (merges: {merge_time * 1000:.1f} ms)")
+    print(f"Identical to pandas merges: {enriched.equals(merged[enriched.columns])} ✓")
+
+    counts = join_index.flight_demand.counts()[flight_ids]
+    print(f"\nDemand rows grouped by flight (slice access): {join_index.flight_demand.order is None}")
+    print(f"Rows for all {len(flight_ids):,} flights in {slice_time * 1000:.1f} ms")
+    print(f"Rows per flight: min {counts.min()}, max {counts.max()}, total {counts.sum():,} (expected: {len(fact_flight_demand):,})")
+    first = join_index.flight_demand.rows(flight_ids[0])
+    print(f"Flight {flight_ids[0]} -> demand_id {fact_flight_demand['demand_id'].to_numpy()[first].tolist()}")
+
+    print("\n" + "=" * 80)
@@ -0,0 +1,208 @@
+import pandas as pd
+import numpy as np
+
+SLOTS_PER_DAY = 288
+
+# Box filter applied to slot histograms before thresholding (24 slots = 2 hours)
+SMOOTH_SLOTS = 24
+
+# A slot is part of a wave when its smoothed demand exceeds this multiple of the daily mean
+PEAK_THRESHOLD = 1.3
+
+# Waves shorter than this are treated as noise (18 slots = 90 minutes)
+MIN_PEAK_SLOTS = 18
+
+# Dips shorter than this do not split a wave, so Midday and Night last at least as long (2 hours)
+MIN_GAP_SLOTS = 24
+
+# Static windows from dim_peak_period as 0-based slot bounds [start, end)
+STATIC_BOUNDS = (72, 120, 168, 240)  # 06:00, 10:00, 14:00, 20:00
+
+PERIOD_NAMES = {1: 'Morning Peak', 2: 'Midday', 3: 'Evening Peak', 4: 'Night'}
+
+DYNAMIC_PERIOD_PATH = 'dim_dynamic_period.csv'
+
+
+def build_slot_histograms(fact_flight_demand):
+    """Slot-level demand histograms, one 288-slot row per day summed over all stations
+
+    Windows are detected per day for the whole apron, so a period_id covers the same clock
+    time at every station and replenishment can still match stations within a period.
+    """
+    keys = fact_flight_demand[['date_key']].drop_duplicates().sort_values('date_key').reset_index(drop=True)
+    row_index = pd.Index(keys['date_key']).get_indexer(fact_flight_demand['date_key'])
+
+    histograms = np.zeros((len(keys), SLOTS_PER_DAY))
+    np.add.at(
+        histograms,
+        (row_index, fact_flight_demand['pickup_slot_id'].to_numpy() - 1),
+        fact_flight_demand['qty_required'].to_numpy()
+    )
+    return keys, histograms
+
+
+def smooth(histograms, width=SMOOTH_SLOTS):
+    """Centered moving average along the slot axis (the day wraps at midnight)"""
+    half = width // 2
+    padded = np.concatenate([histograms[:, -half:], histograms, histograms[:, :width - half]], axis=1)
+    csum = np.cumsum(padded, axis=1)
+    csum = np.concatenate([np.zeros((len(histograms), 1)), csum], axis=1)
+    return (csum[:, width:width + SLOTS_PER_DAY] - csum[:, :SLOTS_PER_DAY]) / width
+
+
+def circular_runs(mask):
+    """(start, end) of each run of True slots in a 288-slot day; a run over midnight ends past 288"""
+    if mask.all():
+        return [(0, SLOTS_PER_DAY)]
+    # Scan from a False slot so no run is cut at the scan boundary
+    shift = int(np.flatnonzero(~mask)[0])
+    edges = np.diff(np.pad(np.roll(mask, -shift).astype(np.int8), 1))
+    starts = np.flatnonzero(edges == 1) + shift
+    ends = np.flatnonzero(edges == -1) + shift
+    wrap = starts >= SLOTS_PER_DAY
+    starts[wrap] -= SLOTS_PER_DAY
+    ends[wrap] -= SLOTS_PER_DAY
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def detect_peak_bounds(histograms, threshold=PEAK_THRESHOLD, min_slots=MIN_PEAK_SLOTS, min_gap=MIN_GAP_SLOTS):
+    """Period bounds (start1, end1, start3, end3) per row from the two heaviest demand waves
+
+    Bounds are 0-based slots with start1 < end1 <= start3 < end3 <= start1 + 288, so a wave
+    over midnight ends past 288. Dips shorter than min_gap are closed first, which merges
+    waves split by a short lull (including at midnight) and keeps Midday and Night at least
+    min_gap long. Rows without two qualifying waves fall back to the static windows; the
+    second return value flags rows whose bounds were detected.
+    """
+    num_rows = len(histograms)
+    smoothed = smooth(histograms)
+    above = smoothed > smoothed.mean(axis=1, keepdims=True) * threshold
+    above &= histograms.sum(axis=1, keepdims=True) > 0
+
+    # Cumulative demand over two days gives the mass of waves that cross midnight
+    csum = np.concatenate([np.zeros((num_rows, 1)), np.cumsum(np.tile(histograms, 2), axis=1)], axis=1)
+
+    bounds = np.tile(np.array(STATIC_BOUNDS), (num_rows, 1))
+    detected = np.zeros(num_rows, dtype=bool)
+    for row in np.flatnonzero(above.any(axis=1)):
+        mask = above[row].copy()
+        for start, end in circular_runs(~mask):
+            if end - start < min_gap:
+                mask[np.arange(start, end) % SLOTS_PER_DAY] = True
+
+        waves = [(start, end) for start, end in circular_runs(mask) if min_slots <= end - start < SLOTS_PER_DAY]
+        if len(waves) < 2:
+            continue
+        mass = [csum[row, end] - csum[row, start] for start, end in waves]
+        # Two heaviest waves in clock order: the earlier start is the morning peak
+        (start1, end1), (start3, end3) = sorted(waves[i] for i in np.argsort(mass, kind='stable')[::-1][:2])
+        bounds[row] = (start1, end1, start3, end3)
+        detected[row] = True
+    return bounds, detected
+
+
+def bounds_to_slot_periods(bounds):
+    """Expand (start1, end1, start3, end3) bounds into [row, 288] period_id arrays"""
+    start1, end1, start3, end3 = (bounds[:, i:i + 1] for i in range(4))
+    offset = (np.arange(SLOTS_PER_DAY)[None, :] - start1) % SLOTS_PER_DAY
+
+    periods = np.full((len(bounds), SLOTS_PER_DAY), 4, dtype=np.int8)
+    periods[offset < end3 - start1] = 3
+    periods[offset < start3 - start1] = 2
+    periods[offset < end1 - start1] = 1
+    return periods
+
+
+def bounds_to_frame(keys, bounds, detected):
+    """Four period rows per day with 1-based inclusive slot bounds"""
+    start1, end1, start3, end3 = bounds.T
+    starts = np.column_stack([start1, end1, start3, end3])
+    ends = np.column_stack([end1, start3, end3, start1 + SLOTS_PER_DAY])
+
+    num_rows = len(keys)
+    period_ids = np.tile(np.arange(1, 5), num_rows)
+    frame = pd.DataFrame({
+        'date_key': np.repeat(keys['date_key'].to_numpy(), 4),
+        'period_id': period_ids,
+        'period_name': [PERIOD_NAMES[p] for p in period_ids],
+        'start_slot_id': starts.reshape(-1) % SLOTS_PER_DAY + 1,
+        'end_slot_id': (ends.reshape(-1) - 1) % SLOTS_PER_DAY + 1,
+        'slot_count': (ends - starts).reshape(-1),
+        'is_peak': np.where(np.isin(period_ids, [1, 3]), 'TRUE', 'FALSE'),
+        'is_dynamic': np.where(np.repeat(detected, 4), 'TRUE', 'FALSE')
+    })
+    return frame
+
+
+class PeriodMapping:
+    """Dynamic slot -> period_id lookup per day (shared by all stations), static windows elsewhere"""
+
+    def __init__(self, date_keys, slot_periods):
+        self.index = pd.Index(np.asarray(date_keys))
+        self.slot_periods = slot_periods
+        self.static_periods = bounds_to_slot_periods(np.array([STATIC_BOUNDS]))[0]
+
+    @classmethod
+    def from_frame(cls, dim_dynamic_period):
+        """Rebuild the lookup from dim_dynamic_period rows"""
+        rows = dim_dynamic_period.sort_values(['date_key', 'period_id'])
+        date_keys = rows['date_key'].to_numpy()[::4]
+        start1 = rows['start_slot_id'].to_numpy()[::4] - 1
+        ends = start1[:, None] + np.cumsum(rows['slot_count'].to_numpy().reshape(-1, 4), axis=1)
+        bounds = np.column_stack([start1, ends[:, 0], ends[:, 1], ends[:, 2]])
+        return cls(date_keys, bounds_to_slot_periods(bounds))
+
+    def period_of(self, date_keys, slot_ids):
+        """Vectorized period_id for (date, slot) arrays"""
+        row = self.index.get_indexer(np.asarray(date_keys))
+        slot_index = np.asarray(slot_ids) - 1
+        return np.where(
+            row >= 0,
+            self.slot_periods[np.maximum(row, 0), slot_index],
+            self.static_periods[slot_index]
+        )
+
+
+if __name__ == '__main__':
+    import time
+
+    # Load prerequisite files
+    fact_flight_demand = pd.read_csv('fact_flight_demand.csv')
+
+    start_time = time.perf_counter()
+    keys, histograms = build_slot_histograms(fact_flight_demand)
+    bounds, detected = detect_peak_bounds(histograms)
+    dim_dynamic_period = bounds_to_frame(keys, bounds, detected)
+    elapsed = time.perf_counter() - start_time
+
+    # Save to CSV
+    dim_dynamic_period.to_csv(DYNAMIC_PERIOD_PATH, index=False)
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nDays analysed: {len(keys):,} (windows shared by all stations)")
+    print(f"Detection time: {elapsed * 1000:.0f} ms")
+    print(f"Rows with detected waves: {detected.sum():,} ({detected.mean() * 100:.1f}%)")
+    print(f"Total row count: {len(dim_dynamic_period):,} (expected: {len(keys) * 4:,})")
+    print(f"Slots per day: {dim_dynamic_period.groupby('date_key')['slot_count'].sum().unique()} (expected: [288])")
+    gaps = dim_dynamic_period[(dim_dynamic_period['is_dynamic'] == 'TRUE') & (dim_dynamic_period['is_peak'] == 'FALSE')]
+    print(f"Shortest Midday/Night window: {gaps['slot_count'].min() if len(gaps) else '-'} slots (minimum: {MIN_GAP_SLOTS})")
+    mapping = PeriodMapping.from_frame(dim_dynamic_period)
+    print(f"Mapping round-trips through the CSV: {np.array_equal(mapping.slot_periods, bounds_to_slot_periods(bounds))} ✓")
+
+    print("\nAverage window by period (detected rows):")
+    dynamic = dim_dynamic_period[dim_dynamic_period['is_dynamic'] == 'TRUE']
+    for period_id, group in dynamic.groupby('period_id'):
+        start = (group['start_slot_id'].mean() - 1) * 5
+        print(f"  {period_id} ({PERIOD_NAMES[period_id]}): starts ~{int(start // 60):02d}:{int(start % 60):02d}, "
+              f"{group['slot_count'].mean() * 5 / 60:.1f} h")
+
+    print("\n--- First 8 rows ---")
+    print(dim_dynamic_period.head(8).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print(f"CSV file '{DYNAMIC_PERIOD_PATH}' created successfully!")
+    print("=" * 80)
@@ -0,0 +1,218 @@
+import pandas as pd
+import numpy as np
+from stock_kernel import RESERVE_RATIO, MAX_UTILIZATION_PCT, PERIODS, DEMAND_KEYS, capacity_matrix
+from fact_station_stock import EQUIPMENT_TYPES
+from fact_replenishment import match_replenishment
+from substitution import supply_available, substitute_stock_frame
+
+# Optional polars: the fact-table stages run as lazy query plans when it is installed
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    pl = None
+    POLARS_AVAILABLE = False
+
+STOCK_COLUMNS = ['date_key', 'period_id', 'station_id', 'equipment_id', 'shortage_qty', 'surplus_qty']
+
+
+def require_polars():
+    if not POLARS_AVAILABLE:
+        raise ImportError("the polars backend needs the polars package (pip install polars)")
+
+
+def scan(source, columns):
+    """LazyFrame over a CSV/Parquet path or an in-memory pandas frame, limited to columns"""
+    require_polars()
+    if isinstance(source, str):
+        frame = pl.scan_parquet(source) if source.endswith('.parquet') else pl.scan_csv(source)
+        return frame.select(columns)
+    return pl.LazyFrame({column: source[column].to_numpy() for column in columns})
+
+
+def to_pandas(frame):
+    """pandas frame from a collected polars frame (column by column, no pyarrow needed)"""
+    return pd.DataFrame({column: frame[column].to_numpy() for column in frame.columns})
+
+
+def demand_plan(fact_flight_demand, dim_time_slot):
+    """Lazy aggregate of qty_required by station, date, period (of the pickup slot) and equipment"""
+    slots = pl.LazyFrame({
+        'pickup_slot_id': dim_time_slot['slot_id'].to_numpy(),
+        'period_id': dim_time_slot['period_id'].to_numpy()
+    })
+    demand = scan(fact_flight_demand, ['station_id', 'date_key', 'equipment_id', 'qty_required', 'pickup_slot_id'])
+    return (
+        demand.join(slots, on='pickup_slot_id', how='left')
+        .group_by(DEMAND_KEYS)
+        .agg(pl.col('qty_required').sum().alias('demand_qty'))
+    )
+
+
+def station_stock_plan(demand, dim_station, dim_equipment, dates, scenario_id=1, capacity=None, outbound=None):
+    """Lazy fact_station_stock plan: dense date x period x station x equipment grid joined to demand
+
+    capacity is an optional array broadcastable to [date, period, station, equipment] (e.g. from
+    capacity_calendar); dim_station capacity is used otherwise. outbound, a demand_plan() of
+    departures, is netted off capacity instead of the RESERVE_RATIO share. Same columns and
+    values as stock_kernel.compute_stock/stock_to_frame.
+    """
+    stations = dim_station['station_id'].to_numpy()
+    if capacity is None:
+        capacity = capacity_matrix(dim_station, dim_equipment, EQUIPMENT_TYPES)
+    shape = (len(dates), len(PERIODS), len(stations), len(EQUIPMENT_TYPES))
+    date_idx, period_idx, station_idx, equipment_idx = np.indices(shape).reshape(4, -1)
+    grid = pl.LazyFrame({
+        'station_id': stations[station_idx],
+        'date_key': np.asarray(dates, dtype=np.int64)[date_idx],
+        'period_id': np.asarray(PERIODS, dtype=np.int64)[period_idx],
+        'equipment_id': np.asarray(EQUIPMENT_TYPES, dtype=np.int64)[equipment_idx],
+        'capacity': np.broadcast_to(capacity, shape).reshape(-1).astype(np.int64)
+    })
+
+    if outbound is None:
+        reserved = (pl.col('capacity') * RESERVE_RATIO).floor().cast(pl.Int64)
+    else:
+        grid = grid.join(
+            outbound.rename({'demand_qty': 'outbound_qty'}).with_columns(pl.col(key).cast(pl.Int64) for key in DEMAND_KEYS),
+            on=DEMAND_KEYS, how='left'
+        )
+        reserved = pl.col('outbound_qty').fill_null(0).cast(pl.Int64)
+    available = pl.col('capacity') - pl.col('reserved_outbound')
+    utilization = (
+        pl.when(pl.col('available_inbound') > 0)
+        .then(pl.min_horizontal(pl.lit(MAX_UTILIZATION_PCT), pl.col('demand_qty') / pl.col('available_inbound') * 100))
+        .otherwise(0.0)
+    )
+    return (
+        grid.join(demand.with_columns(pl.col(key).cast(pl.Int64) for key in DEMAND_KEYS), on=DEMAND_KEYS, how='left')
+        .with_columns(pl.col('demand_qty').fill_null(0).cast(pl.Int64),
+                      reserved.alias('reserved_outbound'))
+        .with_columns(available.alias('available_inbound'))
+        .with_columns((pl.col('available_inbound') - pl.col('demand_qty')).alias('gap'), utilization.alias('utilization'))
+        .sort(['date_key', 'period_id', 'station_id', 'equipment_id'])
+        .with_row_index('stock_id', offset=1)
+        .select(
+            pl.col('stock_id').cast(pl.Int64), 'station_id', 'date_key', 'period_id', 'equipment_id',
+            pl.lit(scenario_id, dtype=pl.Int64).alias('scenario_id'),
+            'capacity', 'reserved_outbound', 'available_inbound', 'demand_qty',
+            pl.min_horizontal(pl.col('demand_qty'), pl.max_horizontal(pl.lit(0, dtype=pl.Int64), 'available_inbound')).alias('allocated_qty'),
+            pl.min_horizontal(pl.lit(0, dtype=pl.Int64), 'gap').alias('shortage_qty'),
+            pl.max_horizontal(pl.lit(0, dtype=pl.Int64), 'gap').alias('surplus_qty'),
+            # np.round(x, 1) is rint(x * 10) / 10
+            ((pl.col('utilization') * 10).round(0, mode='half_to_even') / 10).alias('utilization_pct'),
+            pl.when(pl.col('utilization') > 100.0).then(pl.lit('TRUE')).otherwise(pl.lit('FALSE')).alias('bottleneck_flag'),
+            pl.lit('TRUE').alias('is_active')
+        )
+    )
+
+
+def build_station_stock(fact_flight_demand, dim_time_slot, dim_station, dim_equipment, dates, scenario_id=1,
+                        capacity_calendar=None, substitution=None, fact_outbound_demand=None):
+    """fact_station_stock through the polars plan (fact_flight_demand is a path or a pandas frame)
+
+    fact_outbound_demand (path or frame) nets departure demand off capacity. substitution is
+    resolved on the collected arrays, as in fact_station_stock.build_station_stock.
+    """
+    capacity = None
+    if capacity_calendar is not None:
+        capacity = capacity_calendar.period_capacity(
+            dates, list(dim_station['station_id']), EQUIPMENT_TYPES,
+            capacity_matrix(dim_station, dim_equipment, EQUIPMENT_TYPES), dim_time_slot
+        )
+    demand = demand_plan(fact_flight_demand, dim_time_slot)
+    outbound = None if fact_outbound_demand is None else demand_plan(fact_outbound_demand, dim_time_slot)
+    stock = to_pandas(station_stock_plan(demand, dim_station, dim_equipment, dates, scenario_id, capacity, outbound).collect())
+    if substitution is not None:
+        supply = supply_available(dim_station, dim_equipment, substitution.supply_types(EQUIPMENT_TYPES), RESERVE_RATIO)
+        stock = substitute_stock_frame(stock, substitution, EQUIPMENT_TYPES, len(dim_station), supply)
+    return stock
+
+
+def candidate_plans(fact_station_stock):
+    """Lazy (candidates, shortage order, surplus order) plans for generate_replenishment
+
+    Candidates are the stock rows with a shortage or surplus (the filter and column
+    selection are pushed into the scan); the orders match the pandas lexsorts.
+    """
+    candidates = (
+        scan(fact_station_stock, STOCK_COLUMNS)
+        .filter((pl.col('shortage_qty') < 0) | (pl.col('surplus_qty') > 0))
+        .with_row_index('row')
+        .with_columns((pl.struct('date_key', 'period_id', 'equipment_id').rank('dense') - 1).cast(pl.Int64).alias('group'))
+    )
+    shortages = (
+        candidates.filter(pl.col('shortage_qty') < 0)
+        .sort(['group', 'shortage_qty', 'row'])
+        .select('row')
+    )
+    surpluses = (
+        candidates.filter(pl.col('surplus_qty') > 0)
+        .sort(['group', 'surplus_qty', 'row'], descending=[False, True, False])
+        .select('row')
+    )
+    return candidates, shortages, surpluses
+
+
+def generate_replenishment(fact_station_stock, dim_station, apron_paths=None, seed=42):
+    """fact_replenishment with the candidate filter and orderings run as one polars query"""
+    require_polars()
+    candidates, shortages, surpluses = pl.collect_all(candidate_plans(fact_station_stock))
+    return match_replenishment(
+        to_pandas(candidates.drop('row')), candidates['group'].to_numpy(),
+        shortages['row'].to_numpy().astype(np.int64), surpluses['row'].to_numpy().astype(np.int64),
+        dim_station, apron_paths, seed
+    )
+
+
+if __name__ == '__main__':
+    import time
+    from stock_kernel import aggregate_flight_demand_chunked
+    from fact_station_stock import build_station_stock as build_station_stock_pandas
+    from fact_replenishment import generate_replenishment as generate_replenishment_pandas, read_stock_candidates
+
+    require_polars()
+
+    # Load prerequisite files
+    dim_station = pd.read_csv('dim_station.csv')
+    dim_equipment = pd.read_csv('dim_equipment.csv')
+    dim_time_slot = pd.read_csv('dim_time_slot.csv')
+    dates = list(pd.read_csv('dim_date.csv')['date_key'])
+
+    timings = {}
+    start_time = time.perf_counter()
+    stock_pandas = build_station_stock_pandas(
+        dim_station, dim_equipment, dates, aggregate_flight_demand_chunked('fact_flight_demand.csv', dim_time_slot)
+    )
+    timings['stock (pandas)'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    stock_polars = build_station_stock('fact_flight_demand.csv', dim_time_slot, dim_station, dim_equipment, dates)
+    timings['stock (polars)'] = time.perf_counter() - start_time
+
+    # Replenishment from the same stock file
+    stock_pandas.to_csv('fact_station_stock.csv', index=False, float_format='%.1f')
+    start_time = time.perf_counter()
+    replenishment_pandas = generate_replenishment_pandas(read_stock_candidates('fact_station_stock.csv'), dim_station)
+    timings['replenishment (pandas)'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    replenishment_polars = generate_replenishment('fact_station_stock.csv', dim_station)
+    timings['replenishment (polars)'] = time.perf_counter() - start_time
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\npolars {pl.__version__}, {pl.thread_pool_size()} threads")
+    for name, elapsed in timings.items():
+        print(f"  {name}: {elapsed * 1000:.0f} ms")
+
+    stock_same = stock_pandas.to_csv(index=False, float_format='%.1f') == stock_polars.to_csv(index=False, float_format='%.1f')
+    replenishment_same = (replenishment_pandas.to_csv(index=False, float_format='%.1f')
+                          == replenishment_polars.to_csv(index=False, float_format='%.1f'))
+    print(f"\nfact_station_stock identical: {stock_same} ({len(stock_polars):,} rows) ✓")
+    print(f"fact_replenishment identical: {replenishment_same} ({len(replenishment_polars):,} rows) ✓")
+
+    print("\n" + "=" * 80)
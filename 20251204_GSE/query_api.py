@@ -0,0 +1,268 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Served tables and the columns they can be filtered on
+TABLES = {
+    'stock': ('fact_station_stock.csv', ['date_key', 'period_id', 'station_id', 'equipment_id']),
+    'replenishment': ('fact_replenishment.csv', ['date_key', 'before_period_id', 'from_station_id', 'to_station_id',
+                                                 'equipment_id', 'status', 'priority']),
+    'demand': ('fact_flight_demand.csv', ['date_key', 'flight_id', 'station_id', 'equipment_id'])
+}
+
+# Query parameter aliases (period_id also filters replenishment by before_period_id)
+ALIASES = {'replenishment': {'period_id': 'before_period_id', 'station_id': 'to_station_id'}}
+
+# Statuses still waiting to be carried out
+OPEN_STATUSES = ['Recommended', 'Approved']
+
+CACHE_SIZE = 1024
+MAX_ROWS = 10_000
+
+
+def file_version(path):
+    """Version tag of a file from its size and modification time"""
+    stat = os.stat(path)
+    return f'{stat.st_size:x}-{stat.st_mtime_ns:x}'
+
+
+class IndexedTable:
+    """A fact table held once in memory with row positions per value of each key column"""
+
+    def __init__(self, path, key_columns):
+        self.path = path
+        self.version = file_version(path)
+        self.frame = pd.read_csv(path)
+        self.index = {}
+        for column in key_columns:
+            codes, values = pd.factorize(self.frame[column], sort=True)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+            self.index[column] = {
+                str(value): order[bounds[i]:bounds[i + 1]] for i, value in enumerate(values.tolist())
+            }
+
+    def rows(self, filters):
+        """Row positions matching every {column: [values]} filter (values as strings)"""
+        positions = None
+        for column, values in sorted(filters.items(), key=lambda f: self._size(*f)):
+            matched = [self.index[column].get(value) for value in set(values)]
+            matched = np.unique(np.concatenate([m for m in matched if m is not None] or [np.empty(0, dtype=np.int64)]))
+            positions = matched if positions is None else np.intersect1d(positions, matched, assume_unique=True)
+            if len(positions) == 0:
+                break
+        return np.arange(len(self.frame)) if positions is None else positions
+
+    def _size(self, column, values):
+        return sum(len(self.index[column].get(value, ())) for value in set(values))
+
+
+class QueryStore:
+    """Indexed tables plus an LRU cache of encoded responses keyed by query and table version"""
+
+    def __init__(self, directory='.', cache_size=CACHE_SIZE):
+        self.directory = directory
+        self.cache_size = cache_size
+        self.tables = {}
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.dim_station = pd.read_csv(os.path.join(directory, 'dim_station.csv'))
+        self.stand_to_station = dict(zip(self.dim_station['stand_number'].astype(str), self.dim_station['station_id'].astype(str)))
+
+    def table(self, name):
+        """Loaded table, reloaded when its file changed on disk (FileNotFoundError if not generated)"""
+        filename, key_columns = TABLES[name]
+        path = os.path.join(self.directory, filename)
+        table = self.tables.get(name)
+        if table is None or table.version != file_version(path):
+            with self.lock:
+                table = self.tables.get(name)
+                if table is None or table.version != file_version(path):
+                    table = IndexedTable(path, key_columns)
+                    self.tables[name] = table
+        return table
+
+    def parse_filters(self, name, params):
+        """Query parameters -> {column: [values]}; stand_number is translated to station_id"""
+        params = {key: list(values) for key, values in params.items()}
+        if 'stand_number' in params:
+            params.setdefault('station_id', []).extend(
+                self.stand_to_station.get(stand, '-1') for stand in params.pop('stand_number')
+            )
+        if name == 'replenishment' and params.pop('open', ['false'])[0].lower() in ('1', 'true'):
+            params['status'] = OPEN_STATUSES
+        if name == 'stock' and params.pop('shortage', ['false'])[0].lower() in ('1', 'true'):
+            params['_shortage'] = ['1']
+
+        filters = {}
+        for key, values in params.items():
+            column = ALIASES.get(name, {}).get(key, key)
+            if key == '_shortage':
+                filters[key] = values
+            elif column in TABLES[name][1]:
+                filters[column] = sorted({v for value in values for v in value.split(',')})
+            else:
+                raise KeyError(key)
+        return filters
+
+    def query(self, name, params):
+        """(etag, JSON bytes) for a table query, served from the LRU cache when possible"""
+        if name not in TABLES:
+            raise LookupError(name)
+        table = self.table(name)
+        filters = self.parse_filters(name, params)
+        etag = '"' + hashlib.sha1(
+            f'{name}|{table.version}|{sorted(filters.items())}'.encode()
+        ).hexdigest()[:20] + '"'
+
+        with self.lock:
+            if etag in self.cache:
+                self.cache.move_to_end(etag)
+                return etag, self.cache[etag]
+
+        shortage_only = filters.pop('_shortage', None) is not None
+        rows = table.frame.iloc[table.rows(filters)]
+        if shortage_only:
+            rows = rows[rows['shortage_qty'] < 0]
+        body = ('{"table": "%s", "count": %d, "truncated": %s, "rows": %s}' % (
+            name, len(rows), 'true' if len(rows) > MAX_ROWS else 'false', rows.head(MAX_ROWS).to_json(orient='records')
+        )).encode()
+
+        with self.lock:
+            self.cache[etag] = body
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return etag, body
+
+
+def make_handler(store):
+    """Request handler class bound to a QueryStore"""
+
+    class QueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            name = url.path.strip('/')
+            if name == 'health':
+                return self.send_body(200, json.dumps({'tables': list(TABLES)}).encode())
+            try:
+                etag, body = store.query(name, parse_qs(url.query))
+            except FileNotFoundError as error:
+                return self.send_body(404, json.dumps({'error': f'{error.filename} not generated'}).encode())
+            except LookupError as error:
+                message = f'unknown table {error}' if name not in TABLES else f'unknown filter {error}'
+                return self.send_body(404 if name not in TABLES else 400, json.dumps({'error': message}).encode())
+
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_body(200, body, etag)
+
+        def send_body(self, status, body, etag=None):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if etag is not None:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return QueryHandler
+
+
+def serve(host='127.0.0.1', port=8765, directory='.'):
+    """Serve the pipeline outputs until interrupted"""
+    store = QueryStore(directory)
+    for name in TABLES:
+        try:
+            store.table(name)
+        except FileNotFoundError as error:
+            print(f"Skipping /{name}: {error.filename} not generated yet")
+    server = ThreadingHTTPServer((host, port), make_handler(store))
+    print(f"Serving {', '.join(f'/{name}' for name in TABLES)} on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return server
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    from urllib.request import Request, urlopen
+    from urllib.error import HTTPError
+
+    parser = argparse.ArgumentParser(description='Local query API over the GSE pipeline outputs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--check', action='store_true', help='run sample queries against a temporary server and exit')
+    args = parser.parse_args()
+
+    if not args.check:
+        serve(args.host, args.port)
+    else:
+        store = QueryStore()
+        start_time = time.perf_counter()
+        for name in TABLES:
+            store.table(name)
+        load_time = time.perf_counter() - start_time
+
+        server = ThreadingHTTPServer((args.host, 0), make_handler(store))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://{args.host}:{server.server_address[1]}'
+
+        def get(path, etag=None):
+            request = Request(base + path, headers={'If-None-Match': etag} if etag else {})
+            start = time.perf_counter()
+            try:
+                with urlopen(request) as response:
+                    return response.status, response.headers.get('ETag'), json.loads(response.read()), time.perf_counter() - start
+            except HTTPError as error:
+                return error.code, error.headers.get('ETag'), None, time.perf_counter() - start
+
+        date_key = int(store.table('stock').frame['date_key'].iloc[len(store.table('stock').frame) // 2])
+        queries = [
+            f'/stock?stand_number=641&date_key={date_key}',
+            f'/stock?date_key={date_key}&shortage=true',
+            '/replenishment?period_id=3&open=true',
+            f'/demand?date_key={date_key}&equipment_id=4'
+        ]
+
+        # Validation
+        print("=" * 80)
+        print("VALIDATION REPORT")
+        print("=" * 80)
+
+        print(f"\nTables indexed in {load_time:.2f}s: " + ', '.join(
+            f"{name} ({len(store.table(name).frame):,} rows)" for name in TABLES))
+        for path in queries:
+            status, etag, payload, first = get(path)
+            _, _, _, cached = get(path)
+            revalidated, _, _, _ = get(path, etag)
+            print(f"\nGET {path}")
+            print(f"  {status}: {payload['count']:,} rows, first {first * 1000:.1f} ms, cached {cached * 1000:.1f} ms, "
+                  f"If-None-Match -> {revalidated}")
+
+        stock = store.table('stock').frame
+        station_id = int(store.stand_to_station['641'])
+        _, _, payload, _ = get(f'/stock?stand_number=641&date_key={date_key}')
+        expected = ((stock['station_id'] == station_id) & (stock['date_key'] == date_key)).sum()
+        print(f"\nIndexed filter matches pandas: {payload['count'] == expected} ✓")
+        print(f"Unknown filter rejected: {get('/stock?colour=red')[0] == 400} ✓")
+
+        server.shutdown()
+        print("\n" + "=" * 80)
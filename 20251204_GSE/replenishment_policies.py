@@ -0,0 +1,240 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from apron_network import ApronPaths
+from fact_replenishment import SAMPLING_GATE, read_stock_candidates
+
+# Distance cap for the distance-capped policy
+MAX_MOVE_KM = 1.0
+
+
+class StockGroup:
+    """Shortages and surpluses of one (date, period, equipment) cell, ready for a policy
+
+    need/available are positive unit counts; next_need[station_id] is the shortage the
+    same station faces in the following period (used by look-ahead policies).
+    """
+
+    def __init__(self, key, shortage_station, need, surplus_station, available, next_need, rng):
+        self.key = key
+        self.shortage_station = shortage_station
+        self.need = need
+        self.surplus_station = surplus_station
+        self.available = available
+        self.next_need = next_need
+        self.rng = rng
+
+
+def prepare_groups(fact_station_stock, seed=42):
+    """StockGroup per (date, period, equipment) with at least one shortage and one surplus
+
+    Shortages are ordered most severe first and surpluses largest first, as in
+    fact_replenishment. Each group gets its own rng so results do not depend on how
+    the year is split across workers.
+    """
+    keys = fact_station_stock[['date_key', 'period_id', 'equipment_id']]
+    group = fact_station_stock.groupby(list(keys.columns), sort=True).ngroup().to_numpy()
+    group_keys = keys.groupby(list(keys.columns), sort=True).size().index.tolist()
+    station = fact_station_stock['station_id'].to_numpy()
+    shortage_qty = fact_station_stock['shortage_qty'].to_numpy().astype(np.int64)
+    surplus_qty = fact_station_stock['surplus_qty'].to_numpy().astype(np.int64)
+    num_stations = int(station.max()) + 1
+    num_groups = len(group_keys)
+
+    shortage_rows = np.flatnonzero(shortage_qty < 0)
+    shortage_rows = shortage_rows[np.lexsort((shortage_rows, shortage_qty[shortage_rows], group[shortage_rows]))]
+    surplus_rows = np.flatnonzero(surplus_qty > 0)
+    surplus_rows = surplus_rows[np.lexsort((surplus_rows, -surplus_qty[surplus_rows], group[surplus_rows]))]
+    shortage_offsets = np.searchsorted(group[shortage_rows], np.arange(num_groups + 1))
+    surplus_offsets = np.searchsorted(group[surplus_rows], np.arange(num_groups + 1))
+
+    # Shortage per station and group, looked up for the following period
+    # (period 4 rolls over to period 1 of the next day)
+    need_by_group = np.zeros((num_groups, num_stations), dtype=np.int64)
+    need_by_group[group[shortage_rows], station[shortage_rows]] = -shortage_qty[shortage_rows]
+    group_index = {key: index for index, key in enumerate(group_keys)}
+    dates = sorted({key[0] for key in group_keys})
+    next_date = dict(zip(dates[:-1], dates[1:]))
+    no_need = np.zeros(num_stations, dtype=np.int64)
+
+    groups = []
+    for index, (date_key, period_id, equipment_id) in enumerate(group_keys):
+        shortages = shortage_rows[shortage_offsets[index]:shortage_offsets[index + 1]]
+        surpluses = surplus_rows[surplus_offsets[index]:surplus_offsets[index + 1]]
+        if len(shortages) == 0 or len(surpluses) == 0:
+            continue
+
+        if period_id < 4:
+            following = (date_key, period_id + 1, equipment_id)
+        else:
+            following = (next_date.get(date_key), 1, equipment_id)
+        following_index = group_index.get(following)
+        groups.append(StockGroup(
+            (date_key, period_id, equipment_id),
+            station[shortages], -shortage_qty[shortages],
+            station[surpluses], surplus_qty[surpluses],
+            no_need if following_index is None else need_by_group[following_index],
+            np.random.default_rng([seed, index])
+        ))
+    return groups
+
+
+def _greedy(group, distance_km, source_order, allowed=None, available=None):
+    """Serve shortages in order, each from the first usable source under source_order(to, available)"""
+    available = group.available.copy() if available is None else available
+    moves = []
+    for to_station, need in zip(group.shortage_station, group.need):
+        usable = (available > 0) & (group.surplus_station != to_station)
+        if allowed is not None:
+            usable &= allowed(to_station)
+        if not usable.any():
+            continue
+        candidates = np.flatnonzero(usable)
+        best = candidates[source_order(to_station, candidates, available)]
+        qty = int(min(need, available[best]))
+        available[best] -= qty
+        moves.append((int(group.surplus_station[best]), int(to_station), qty))
+    return moves
+
+
+def nearest_sampled(group, distance_km):
+    """Current fact_replenishment rule: nearest surplus, for a 30% sample of shortages"""
+    sampled = group.rng.random(len(group.need)) <= SAMPLING_GATE
+    kept = StockGroup(group.key, group.shortage_station[sampled], group.need[sampled],
+                      group.surplus_station, group.available, group.next_need, group.rng)
+    return nearest_first(kept, distance_km)
+
+
+def nearest_first(group, distance_km):
+    """Every shortage from the closest station with surplus left"""
+    return _greedy(group, distance_km,
+                   lambda to, candidates, available: np.argmin(distance_km[group.surplus_station[candidates], to]))
+
+
+def largest_surplus_first(group, distance_km):
+    """Every shortage from the station with the most surplus left"""
+    return _greedy(group, distance_km,
+                   lambda to, candidates, available: np.argmax(available[candidates]))
+
+
+def distance_capped(group, distance_km, max_km=MAX_MOVE_KM):
+    """Nearest surplus, but never move equipment further than max_km"""
+    return _greedy(group, distance_km,
+                   lambda to, candidates, available: np.argmin(distance_km[group.surplus_station[candidates], to]),
+                   allowed=lambda to: distance_km[group.surplus_station, to] <= max_km)
+
+
+def priority_weighted(group, distance_km):
+    """Source with the lowest km per unit it can cover, so big shortages pull from big surpluses"""
+    def km_per_unit(to, candidates, available):
+        need = group.need[np.flatnonzero(group.shortage_station == to)[0]]
+        return np.argmin(distance_km[group.surplus_station[candidates], to] / np.minimum(available[candidates], need))
+    return _greedy(group, distance_km, km_per_unit)
+
+
+def look_ahead(group, distance_km):
+    """Nearest surplus, keeping back what each source needs for its own next-period shortage"""
+    available = np.maximum(group.available - group.next_need[group.surplus_station], 0)
+    return _greedy(group, distance_km,
+                   lambda to, candidates, available: np.argmin(distance_km[group.surplus_station[candidates], to]),
+                   available=available)
+
+
+POLICIES = {
+    'nearest_sampled': nearest_sampled,
+    'nearest_first': nearest_first,
+    'largest_surplus_first': largest_surplus_first,
+    'distance_capped': distance_capped,
+    'priority_weighted': priority_weighted,
+    'look_ahead': look_ahead
+}
+
+# Worker state, loaded once per process by _init_worker
+_groups = None
+_distance_km = None
+
+
+def _init_worker(stock_path, seed):
+    global _groups, _distance_km
+    dim_station = pd.read_csv('dim_station.csv')
+    _distance_km = ApronPaths.load().station_distance_km(dim_station['station_id'])
+    _groups = prepare_groups(read_stock_candidates(stock_path), seed)
+
+
+def evaluate_policy(name, policy=None):
+    """Apply one policy to every group of the year; metrics for the comparison table"""
+    policy = POLICIES[name] if policy is None else policy
+    start_time = time.perf_counter()
+
+    total_need = 0
+    residual = 0
+    induced = 0
+    moves = 0
+    units = 0
+    km = 0.0
+    for group in _groups:
+        received = np.zeros(len(_distance_km), dtype=np.int64)
+        taken = np.zeros(len(_distance_km), dtype=np.int64)
+        for from_station, to_station, qty in policy(group, _distance_km):
+            received[to_station] += qty
+            taken[from_station] += qty
+            km += _distance_km[from_station, to_station]
+            units += qty
+            moves += 1
+        total_need += group.need.sum()
+        residual += np.maximum(group.need - received[group.shortage_station], 0).sum()
+
+        # Units taken from a source that it then lacks for its own next-period shortage
+        next_need = group.next_need[group.surplus_station]
+        spare = np.maximum(group.available - next_need, 0)
+        induced += np.minimum(np.maximum(taken[group.surplus_station] - spare, 0), next_need).sum()
+
+    return {
+        'policy': name,
+        'moves': moves,
+        'units_moved': units,
+        'total_km': round(km, 1),
+        'shortage_units': int(total_need),
+        'residual_shortage': int(residual),
+        'induced_next_shortage': int(induced),
+        'covered_pct': round((1 - residual / total_need) * 100, 1) if total_need else 100.0,
+        'runtime_s': round(time.perf_counter() - start_time, 2)
+    }
+
+
+def compare_policies(stock_path='fact_station_stock.csv', policies=None, seed=42, max_workers=None):
+    """Evaluate policies in parallel (one process each) over the same stock data
+
+    policies maps name -> function(group, distance_km) returning (from, to, qty) moves;
+    functions must be importable module-level callables so they can be pickled.
+    """
+    policies = POLICIES if policies is None else policies
+    max_workers = max_workers or min(len(policies), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(stock_path, seed)) as pool:
+        futures = [pool.submit(evaluate_policy, name, policy) for name, policy in policies.items()]
+        return pd.DataFrame([future.result() for future in futures])
+
+
+if __name__ == '__main__':
+    start_time = time.perf_counter()
+    comparison = compare_policies()
+    elapsed = time.perf_counter() - start_time
+
+    # Save to CSV
+    comparison.to_csv('replenishment_policy_comparison.csv', index=False)
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nPolicies evaluated: {len(comparison)} in {elapsed:.1f}s (process pool)")
+    print(f"Same shortage base for every policy: {comparison['shortage_units'].nunique() == 1} ✓")
+
+    print("\n" + comparison.to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("CSV file 'replenishment_policy_comparison.csv' created successfully!")
+    print("=" * 80)
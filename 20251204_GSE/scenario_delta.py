@@ -0,0 +1,256 @@
+import pandas as pd
+import numpy as np
+import re
+from stock_kernel import RESERVE_RATIO, compute_stock
+from substitution import substitute_stock
+
+DELTA_PATH = 'fact_station_stock_delta.csv'
+
+# fact_station_stock columns a scenario can change (stock_id is the key)
+VALUE_COLUMNS = ['capacity', 'reserved_outbound', 'available_inbound', 'demand_qty', 'allocated_qty',
+                 'shortage_qty', 'surplus_qty', 'utilization_pct', 'bottleneck_flag']
+
+# Extra columns of a baseline built with equipment substitution (after surplus_qty)
+SUBSTITUTION_COLUMNS = ['substituted_qty', 'lent_qty']
+
+# Equipment a dim_scenario parameter refers to (redistribution moves pallet dollies)
+PARAMETER_EQUIPMENT = {
+    'capacity_pallet_dolly': 2,      # 14P
+    'capacity_baggage_trolley': 4,   # 26-O
+    'redistribution_rule': 2
+}
+
+
+def scenario_changes(scenario, dim_station, dim_peak_period):
+    """({(station_id, equipment_id): capacity delta}, {period_id: demand multiplier}, warnings) of a dim_scenario row
+
+    parameter_value formats: 'Station 621: +10 units', '647 to 621: 5, 647 to 632: 5',
+    'Peak periods: 1.2x'. Stations are given by stand number.
+    """
+    stand_to_station = dict(zip(dim_station['stand_number'], dim_station['station_id']))
+    parameter = scenario['parameter_changed']
+    value = str(scenario['parameter_value'])
+    capacity_delta = {}
+    multipliers = {}
+    warnings = []
+
+    def add(stand, equipment_id, qty):
+        station_id = stand_to_station.get(int(stand))
+        if station_id is None:
+            warnings.append(f"stand {stand} has no equipment station")
+            return
+        key = (station_id, equipment_id)
+        capacity_delta[key] = capacity_delta.get(key, 0) + qty
+
+    if parameter in ('capacity_pallet_dolly', 'capacity_baggage_trolley'):
+        stand, qty = re.match(r'Station (\d+): ([+-]?\d+)', value).groups()
+        add(stand, PARAMETER_EQUIPMENT[parameter], int(qty))
+    elif parameter == 'redistribution_rule':
+        for source, target, qty in re.findall(r'(\d+) to (\d+): (\d+)', value):
+            add(source, PARAMETER_EQUIPMENT[parameter], -int(qty))
+            add(target, PARAMETER_EQUIPMENT[parameter], int(qty))
+    elif parameter == 'demand_multiplier':
+        factor = float(re.search(r'([\d.]+)x', value).group(1))
+        peak = dim_peak_period[dim_peak_period['period_name'].str.contains('Peak')]['period_id']
+        multipliers = {int(period_id): factor for period_id in peak}
+    return capacity_delta, multipliers, warnings
+
+
+def value_columns(frame):
+    """VALUE_COLUMNS plus the substitution columns when frame has them"""
+    extra = [column for column in SUBSTITUTION_COLUMNS if column in frame]
+    position = VALUE_COLUMNS.index('surplus_qty') + 1
+    return VALUE_COLUMNS[:position] + extra + VALUE_COLUMNS[position:]
+
+
+def build_scenario_delta(baseline, scenario_id, capacity_delta, multipliers, substitution=None):
+    """Changed fact_station_stock rows of one scenario (stock_id plus new values)
+
+    Only rows of the stations/equipment and periods the scenario touches are recomputed,
+    so the cost follows the size of the change rather than the table. A baseline whose
+    reserved_outbound is not the RESERVE_RATIO share (built from departures) keeps its
+    outbound units. substitution, (SubstitutionMatrix, equipment types, [station_id, supply
+    type] spare units), is needed for a baseline with substituted_qty/lent_qty; touched
+    stations are then recomputed across all their equipment, since types lend to each other.
+    """
+    station = baseline['station_id'].to_numpy()
+    equipment = baseline['equipment_id'].to_numpy()
+    period = baseline['period_id'].to_numpy()
+    demand = baseline['demand_qty'].to_numpy()
+    columns = value_columns(baseline)
+    if 'substituted_qty' in baseline and substitution is None:
+        raise ValueError('baseline was built with equipment substitution; pass substitution rules')
+
+    affected = np.zeros(len(baseline), dtype=bool)
+    for station_id, equipment_id in capacity_delta:
+        affected |= (station == station_id) & (equipment == equipment_id)
+    if multipliers:
+        affected |= np.isin(period, list(multipliers)) & (demand > 0)
+    rows = np.flatnonzero(affected)
+    if 'substituted_qty' in baseline:
+        # Rows are sorted by date, period, station, equipment: widen to whole station groups
+        num_types = len(substitution[1])
+        groups = np.unique(rows // num_types)
+        rows = (groups[:, None] * num_types + np.arange(num_types)).reshape(-1)
+
+    capacity = baseline['capacity'].to_numpy()[rows].astype(np.int64)
+    for (station_id, equipment_id), qty in capacity_delta.items():
+        capacity[(station[rows] == station_id) & (equipment[rows] == equipment_id)] += qty
+    capacity = np.maximum(capacity, 0)
+    factor = np.array([multipliers.get(p, 1.0) for p in period[rows]]) if multipliers else 1.0
+    new_demand = np.ceil(demand[rows] * factor - 1e-9).astype(np.int64)
+
+    # Departure baselines net fixed outbound units rather than a share of capacity
+    reserved = baseline['reserved_outbound'].to_numpy()
+    ratio_based = (reserved == np.floor(baseline['capacity'].to_numpy() * RESERVE_RATIO)).all()
+    stock = compute_stock(new_demand, capacity, outbound=None if ratio_based else reserved[rows])
+    if 'substituted_qty' in baseline:
+        matrix, equipment_types, supply = substitution
+        shape = (-1, len(equipment_types))
+        stock = {column: np.asarray(value).reshape(shape) for column, value in stock.items()}
+        stock = substitute_stock(stock, matrix, equipment_types, supply.reindex(station[rows][::len(equipment_types)]).to_numpy())
+        stock = {column: value.reshape(-1) for column, value in stock.items()}
+    values = pd.DataFrame({column: stock[column] for column in columns[:-2]})
+    values['utilization_pct'] = np.round(stock['utilization_pct'], 1)
+    values['bottleneck_flag'] = np.where(stock['bottleneck'], 'TRUE', 'FALSE')
+
+    # Keep only rows where some value actually differs from the baseline
+    before = baseline.iloc[rows][columns].reset_index(drop=True)
+    before['bottleneck_flag'] = np.where(before['bottleneck_flag'].astype(str).str.upper() == 'TRUE', 'TRUE', 'FALSE')
+    changed = (values != before).any(axis=1).to_numpy()
+    delta = values[changed].reset_index(drop=True)
+    delta.insert(0, 'stock_id', baseline['stock_id'].to_numpy()[rows][changed])
+    delta.insert(0, 'scenario_id', scenario_id)
+    return delta
+
+
+def build_scenario_deltas(baseline, dim_scenario, dim_station, dim_peak_period, substitution=None):
+    """Deltas of every non-baseline dim_scenario row; returns (deltas, warnings by scenario_id)"""
+    deltas = []
+    warnings = {}
+    for _, scenario in dim_scenario.iterrows():
+        if str(scenario['is_baseline']).upper() == 'TRUE':
+            continue
+        capacity_delta, multipliers, scenario_warnings = scenario_changes(scenario, dim_station, dim_peak_period)
+        deltas.append(build_scenario_delta(baseline, scenario['scenario_id'], capacity_delta, multipliers, substitution))
+        if scenario_warnings:
+            warnings[scenario['scenario_id']] = scenario_warnings
+    return pd.concat(deltas, ignore_index=True), warnings
+
+
+class ScenarioStockReader:
+    """Baseline fact_station_stock with scenario deltas overlaid on read
+
+    The baseline is loaded on first use; comparisons only touch the changed stock_ids.
+    """
+
+    def __init__(self, baseline_path='fact_station_stock.csv', delta_path=DELTA_PATH):
+        self.baseline_path = baseline_path
+        self.deltas = pd.read_csv(delta_path)
+        self._baseline = None
+        self._positions = None
+
+    @property
+    def baseline(self):
+        if self._baseline is None:
+            from join_index import position_index
+            self._baseline = pd.read_csv(self.baseline_path)
+            self._positions, self._offset = position_index(self._baseline['stock_id'])
+        return self._baseline
+
+    def delta(self, scenario_id):
+        """Changed rows of one scenario"""
+        return self.deltas[self.deltas['scenario_id'] == scenario_id]
+
+    def baseline_rows(self, stock_ids):
+        """Baseline rows for stock_ids, by position"""
+        baseline = self.baseline
+        return baseline.iloc[self._positions[np.asarray(stock_ids) - self._offset]]
+
+    def compare(self, scenario_id, columns=('capacity', 'shortage_qty', 'surplus_qty')):
+        """Changed cells with their baseline and scenario values side by side"""
+        delta = self.delta(scenario_id)
+        before = self.baseline_rows(delta['stock_id']).reset_index(drop=True)
+        result = before[['stock_id', 'date_key', 'period_id', 'station_id', 'equipment_id']].copy()
+        for column in columns:
+            result[f'{column}_baseline'] = before[column].to_numpy()
+            result[f'{column}_scenario'] = delta[column].to_numpy()
+        return result
+
+    def iter_scenario(self, scenario_id, chunk_rows=100_000):
+        """Full scenario table in chunks, each a baseline slice with its delta rows overlaid"""
+        delta = self.delta(scenario_id).set_index('stock_id')
+        for chunk in pd.read_csv(self.baseline_path, chunksize=chunk_rows):
+            chunk = chunk.assign(scenario_id=scenario_id)
+            hit = chunk['stock_id'].isin(delta.index).to_numpy()
+            if hit.any():
+                columns = value_columns(delta)
+                chunk.loc[hit, columns] = delta.loc[chunk.loc[hit, 'stock_id'], columns].to_numpy()
+            yield chunk
+
+    def scenario(self, scenario_id):
+        """Materialized scenario table (the baseline when it has no delta rows)"""
+        return pd.concat(self.iter_scenario(scenario_id), ignore_index=True)
+
+
+if __name__ == '__main__':
+    import os
+    import time
+
+    # Load prerequisite files
+    baseline = pd.read_csv('fact_station_stock.csv')
+    dim_scenario = pd.read_csv('dim_scenario.csv')
+    dim_station = pd.read_csv('dim_station.csv')
+    dim_peak_period = pd.read_csv('dim_peak_period.csv')
+
+    # Substitution baselines need the rules and the supply-only spare units they were built with
+    substitution = None
+    if 'substituted_qty' in baseline:
+        from fact_station_stock import EQUIPMENT_TYPES
+        from substitution import SubstitutionMatrix, supply_available
+        matrix = SubstitutionMatrix.load()
+        supply = supply_available(dim_station, pd.read_csv('dim_equipment.csv'), matrix.supply_types(EQUIPMENT_TYPES), RESERVE_RATIO)
+        substitution = (matrix, EQUIPMENT_TYPES, pd.DataFrame(supply, index=dim_station['station_id']))
+
+    start_time = time.perf_counter()
+    deltas, warnings = build_scenario_deltas(baseline, dim_scenario, dim_station, dim_peak_period, substitution)
+    deltas.to_csv(DELTA_PATH, index=False, float_format='%.1f')
+    delta_time = time.perf_counter() - start_time
+
+    reader = ScenarioStockReader('fact_station_stock.csv', DELTA_PATH)
+    start_time = time.perf_counter()
+    comparisons = {scenario_id: reader.compare(scenario_id) for scenario_id in deltas['scenario_id'].unique()}
+    compare_time = time.perf_counter() - start_time
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    scenarios = len(dim_scenario) - 1
+    print(f"\nBaseline rows: {len(baseline):,}; full materialization of {scenarios} scenarios: {len(baseline) * scenarios:,} rows")
+    print(f"Delta rows: {len(deltas):,} ({os.path.getsize(DELTA_PATH) / 1024:.0f} KB) written in {delta_time * 1000:.0f} ms")
+    print(f"Comparisons over changed cells only: {compare_time * 1000:.0f} ms")
+
+    print("\nPer scenario:")
+    for _, scenario in dim_scenario[dim_scenario['is_baseline'].astype(str).str.upper() != 'TRUE'].iterrows():
+        scenario_id = scenario['scenario_id']
+        comparison = comparisons.get(scenario_id)
+        changed = 0 if comparison is None else len(comparison)
+        print(f"  {scenario_id} {scenario['scenario_name']}: {changed:,} changed rows", end='')
+        if changed:
+            shortage = comparison['shortage_qty_scenario'].sum() - comparison['shortage_qty_baseline'].sum()
+            print(f", shortage change {shortage:+,} units", end='')
+        print(''.join(f" (skipped: {w})" for w in warnings.get(scenario_id, [])))
+
+    # Overlay matches a full recomputation for one scenario
+    scenario_id = int(deltas['scenario_id'].iloc[0])
+    overlaid = reader.scenario(scenario_id)
+    delta = reader.delta(scenario_id)
+    untouched = ~overlaid['stock_id'].isin(delta['stock_id'])
+    print(f"\nScenario {scenario_id} overlay: {len(overlaid):,} rows, untouched rows equal baseline: "
+          f"{overlaid.loc[untouched, value_columns(baseline)].equals(baseline.loc[untouched, value_columns(baseline)])} ✓")
+
+    print("\n" + "=" * 80)
+    print(f"CSV file '{DELTA_PATH}' created successfully!")
+    print("=" * 80)
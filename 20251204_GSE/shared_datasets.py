@@ -0,0 +1,206 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Numeric columns scenario/what-if workers need, published once per table
+CORE_COLUMNS = {
+    'dim_flight': ['flight_id', 'date_key', 'arrival_slot_id', 'aircraft_id', 'estimated_pax', 'estimated_bags', 'cargo_kg'],
+    'fact_flight_demand': ['demand_id', 'flight_id', 'date_key', 'arrival_slot_id', 'station_id', 'equipment_id',
+                           'qty_required', 'qty_allocated', 'shortage_qty', 'pickup_slot_id', 'return_slot_id']
+}
+
+CATALOG_NAME = 'catalog.json'
+
+
+def column_arrays(frames, columns=CORE_COLUMNS):
+    """{table: {column: contiguous array}} with the smallest integer dtype that holds each column"""
+    arrays = {}
+    for table, names in columns.items():
+        arrays[table] = {}
+        for name in names:
+            values = frames[table][name].to_numpy()
+            if np.issubdtype(values.dtype, np.integer):
+                values = values.astype(np.result_type(np.min_scalar_type(values.min()), np.min_scalar_type(values.max())))
+            arrays[table][name] = np.ascontiguousarray(values)
+    return arrays
+
+
+def publish_npy(frames, directory, columns=CORE_COLUMNS):
+    """Write each column as a .npy file plus a catalog; workers memory-map them read-only"""
+    os.makedirs(directory, exist_ok=True)
+    catalog = {'kind': 'npy', 'tables': {}}
+    for table, arrays in column_arrays(frames, columns).items():
+        catalog['tables'][table] = {}
+        for name, values in arrays.items():
+            filename = f'{table}.{name}.npy'
+            np.save(os.path.join(directory, filename), values)
+            catalog['tables'][table][name] = {'file': filename, 'dtype': values.dtype.str, 'shape': list(values.shape)}
+
+    catalog_path = os.path.join(directory, CATALOG_NAME)
+    with open(catalog_path, 'w') as f:
+        json.dump(catalog, f, indent=2)
+    return catalog_path
+
+
+def publish_shared_memory(frames, columns=CORE_COLUMNS, catalog_path=None):
+    """Copy each column into a shared-memory block once
+
+    Returns the catalog and the blocks. The publisher must keep the blocks open while
+    workers run and call unlink_blocks() when done.
+    """
+    catalog = {'kind': 'shared_memory', 'publisher_pid': os.getpid(), 'tables': {}}
+    blocks = []
+    for table, arrays in column_arrays(frames, columns).items():
+        catalog['tables'][table] = {}
+        for name, values in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            blocks.append(block)
+            catalog['tables'][table][name] = {'name': block.name, 'dtype': values.dtype.str, 'shape': list(values.shape)}
+
+    if catalog_path is not None:
+        with open(catalog_path, 'w') as f:
+            json.dump(catalog, f, indent=2)
+    return catalog, blocks
+
+
+def unlink_blocks(blocks):
+    """Release shared-memory blocks created by publish_shared_memory()"""
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def _attach_block(name, publisher_pid=None):
+    """Open an existing block without letting another process's resource tracker unlink it on exit
+
+    Workers started by the publisher (fork, spawn or forkserver) share its resource tracker,
+    which already holds the block; unregistering there would drop the publisher's entry.
+    Any other process has its own tracker, so the block is unregistered from it.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    block = shared_memory.SharedMemory(name=name)
+    parent = multiprocessing.parent_process()
+    if publisher_pid not in (os.getpid(), parent.pid if parent is not None else None):
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+class SharedDataset:
+    """Zero-copy, read-only view of published columns in a worker process"""
+
+    def __init__(self, catalog, directory=None):
+        self.catalog = catalog
+        self.directory = directory
+        self._blocks = []
+        self._columns = {}
+
+    @classmethod
+    def attach(cls, catalog):
+        """Attach to a catalog dict (shared memory) or a catalog.json path (either kind)"""
+        directory = None
+        if isinstance(catalog, str):
+            directory = os.path.dirname(os.path.abspath(catalog))
+            with open(catalog) as f:
+                catalog = json.load(f)
+        return cls(catalog, directory)
+
+    def tables(self):
+        """Published table names"""
+        return list(self.catalog['tables'])
+
+    def column(self, table, name):
+        """Column array backed by the shared block or memory-mapped file"""
+        key = (table, name)
+        if key not in self._columns:
+            entry = self.catalog['tables'][table][name]
+            if self.catalog['kind'] == 'npy':
+                values = np.load(os.path.join(self.directory, entry['file']), mmap_mode='r')
+            else:
+                block = _attach_block(entry['name'], self.catalog.get('publisher_pid'))
+                self._blocks.append(block)
+                values = np.ndarray(tuple(entry['shape']), dtype=np.dtype(entry['dtype']), buffer=block.buf)
+                values.flags.writeable = False
+            self._columns[key] = values
+        return self._columns[key]
+
+    def columns(self, table, names=None):
+        """{column: array} for a table (all published columns by default)"""
+        names = list(self.catalog['tables'][table]) if names is None else names
+        return {name: self.column(table, name) for name in names}
+
+    def close(self):
+        """Drop the views and detach from shared memory (does not unlink)"""
+        self._columns.clear()
+        for block in self._blocks:
+            block.close()
+        self._blocks = []
+
+
+def _station_demand_worker(catalog, date_keys):
+    """Example worker: required units per station over a set of dates, read zero-copy"""
+    dataset = SharedDataset.attach(catalog)
+    demand = dataset.columns('fact_flight_demand', ['date_key', 'station_id', 'qty_required'])
+    mask = np.isin(demand['date_key'], date_keys)
+    totals = np.bincount(demand['station_id'][mask], weights=demand['qty_required'][mask]).astype(np.int64)
+    dataset.close()
+    return totals
+
+
+if __name__ == '__main__':
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+
+    WORKERS = 16
+
+    # Load prerequisite files
+    frames = {
+        'dim_flight': pd.read_csv('dim_flight.csv'),
+        'fact_flight_demand': pd.read_csv('fact_flight_demand.csv')
+    }
+
+    start_time = time.perf_counter()
+    catalog, blocks = publish_shared_memory(frames)
+    publish_time = time.perf_counter() - start_time
+    published_bytes = sum(block.size for block in blocks)
+
+    npy_catalog = publish_npy(frames, 'shared_datasets')
+
+    # Each worker sums one slice of dates straight from shared memory
+    date_keys = np.sort(frames['fact_flight_demand']['date_key'].unique())
+    chunks = np.array_split(date_keys, WORKERS)
+    start_time = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=WORKERS) as pool:
+            results = list(pool.map(_station_demand_worker, [catalog] * WORKERS, chunks))
+        mmap_totals = _station_demand_worker(npy_catalog, date_keys)
+    finally:
+        unlink_blocks(blocks)
+    worker_time = time.perf_counter() - start_time
+
+    shared_totals = np.sum([np.pad(r, (0, max(map(len, results)) - len(r))) for r in results], axis=0)
+    expected = frames['fact_flight_demand'].groupby('station_id')['qty_required'].sum()
+    pandas_bytes = sum(frame.memory_usage(deep=True).sum() for frame in frames.values())
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    for table, entries in catalog['tables'].items():
+        print(f"\n{table}: {len(entries)} columns, {entries[next(iter(entries))]['shape'][0]:,} rows")
+    print(f"\nShared memory published: {published_bytes / 1e6:.1f} MB in {publish_time * 1000:.0f} ms "
+          f"(pandas copy per worker: {pandas_bytes / 1e6:.1f} MB)")
+    print(f"{WORKERS} workers attached and aggregated in {worker_time:.2f}s")
+    print(f"Shared-memory totals match pandas: {np.array_equal(shared_totals[expected.index], expected.to_numpy())} ✓")
+    print(f"Memory-mapped totals match pandas: {np.array_equal(mmap_totals[expected.index], expected.to_numpy())} ✓")
+
+    print("\n" + "=" * 80)
+    print(f"Catalog '{npy_catalog}' created successfully!")
+    print("=" * 80)
@@ -0,0 +1,143 @@
+import pandas as pd
+import numpy as np
+import heapq
+from interval_allocation import absolute_demand_times, station_capacity_array
+from join_index import DimensionIndex
+
+# Parking stand occupancy per arrival (slots of 5 min)
+TURNAROUND_SLOTS = {'Widebody': 24, 'Narrowbody': 12}
+
+# Distance-equivalent cost of each unit a station cannot supply (km per missing unit)
+SHORTFALL_PENALTY_KM = 1.0
+
+
+def euclidean_distance_table(dim_parking_stand, dim_station):
+    """[parking_stand, station] straight-line distance in km"""
+    dx = dim_parking_stand['location_x'].to_numpy()[:, None] - dim_station['location_x'].to_numpy()[None, :]
+    dy = dim_parking_stand['location_y'].to_numpy()[:, None] - dim_station['location_y'].to_numpy()[None, :]
+    return np.sqrt(dx ** 2 + dy ** 2) / 1000
+
+
+def assign_parking_stands(aircraft_categories, arrival_times, dim_parking_stand):
+    """Earliest-free compatible parking stand per flight (flights in arrival order)
+
+    Widebodies need widebody stands; narrowbodies prefer narrowbody stands and
+    use a free widebody stand when none is available.
+    """
+    categories = dim_parking_stand['aircraft_category'].to_numpy()
+    free_at = {
+        category: [(0, i) for i in np.flatnonzero(categories == category).tolist()]
+        for category in TURNAROUND_SLOTS
+    }
+
+    stands = np.zeros(len(arrival_times), dtype=np.int64)
+    for row, (category, arrival) in enumerate(zip(aircraft_categories, arrival_times)):
+        options = [category] if category == 'Widebody' else [category, 'Widebody']
+        chosen = next((c for c in options if free_at[c][0][0] <= arrival), None)
+        if chosen is None:
+            chosen = min(options, key=lambda c: free_at[c][0][0])
+
+        stand_free_at, stand = heapq.heappop(free_at[chosen])
+        heapq.heappush(free_at[chosen], (max(arrival, stand_free_at) + TURNAROUND_SLOTS[category], stand))
+        stands[row] = stand
+
+    return stands
+
+
+def assign_stations(flight_needs, capacity, distance_km, candidate_stations, penalty_km=SHORTFALL_PENALTY_KM):
+    """Pick each flight's station by free capacity at pickup and distance from its stand
+
+    flight_needs: per-flight DataFrame in pickup order with parking_stand_index,
+    pickup_time, return_time and one qty column per equipment index (need_<e>).
+    capacity: [station_index, equipment_index] array. Units booked for a flight are
+    released at its return time, so availability reflects overlapping flights.
+    """
+    need_columns = [c for c in flight_needs.columns if c.startswith('need_')]
+    equipment_index = np.array([int(c[5:]) for c in need_columns])
+    needs = flight_needs[need_columns].to_numpy()
+    stands = flight_needs['parking_stand_index'].to_numpy()
+    pickup_time = flight_needs['pickup_time'].to_numpy()
+    return_time = flight_needs['return_time'].to_numpy()
+
+    station_capacity = capacity[:, equipment_index].astype(np.int64)
+    in_use = np.zeros_like(station_capacity)
+    not_candidate = ~np.isin(np.arange(len(capacity)), candidate_stations)
+    releases = []
+
+    stations = np.zeros(len(flight_needs), dtype=np.int64)
+    for row in range(len(flight_needs)):
+        # Release units returned by this pickup
+        now = pickup_time[row]
+        while releases and releases[0][0] <= now:
+            _, _, station, booked = heapq.heappop(releases)
+            in_use[station] -= booked
+
+        # Score every station at once: missing units plus travel distance
+        free = np.maximum(station_capacity - in_use, 0)
+        shortfall = np.maximum(needs[row] - free, 0).sum(axis=1)
+        score = shortfall * penalty_km + distance_km[stands[row]]
+        score[not_candidate] = np.inf
+        station = int(np.argmin(score))
+
+        booked = np.minimum(needs[row], free[station])
+        if booked.any():
+            in_use[station] += booked
+            heapq.heappush(releases, (return_time[row], row, station, booked))
+        stations[row] = station
+
+    return stations
+
+
+def assign_demand_stations(dim_flight, fact_flight_demand, dim_station, dim_equipment, dim_parking_stand,
+                           distance_km=None):
+    """station_id and allocation_distance_km for every demand row
+
+    distance_km is a [parking_stand, station] table; straight-line distances are
+    used when it is not given.
+    """
+    if distance_km is None:
+        distance_km = euclidean_distance_table(dim_parking_stand, dim_station)
+
+    # Station index == station_id; column 0 is never a candidate
+    distance_by_id = np.full((len(dim_parking_stand), dim_station['station_id'].max() + 1), np.inf)
+    distance_by_id[:, dim_station['station_id'].to_numpy()] = distance_km
+    candidates = dim_station.loc[dim_station['is_storage_location'].astype(str).str.upper() == 'TRUE', 'station_id'].to_numpy()
+
+    # One row per flight with its pickup/return window and equipment needs
+    flights = fact_flight_demand.groupby('flight_id', sort=True).agg(
+        date_key=('date_key', 'first'),
+        arrival_slot_id=('arrival_slot_id', 'first'),
+        pickup_slot_id=('pickup_slot_id', 'first'),
+        return_slot_id=('return_slot_id', 'first')
+    )
+    needs = fact_flight_demand.pivot_table(
+        index='flight_id', columns='equipment_id', values='qty_required', aggfunc='sum', fill_value=0
+    )
+    flights = flights.join(needs.rename(columns=lambda e: f'need_{e}'))
+    flights['aircraft_category'] = DimensionIndex(dim_flight, 'flight_id').attribute(flights.index, 'aircraft_category')
+
+    flights['pickup_time'], flights['return_time'] = absolute_demand_times(
+        flights['date_key'], flights['arrival_slot_id'], flights['pickup_slot_id'], flights['return_slot_id']
+    )
+    arrival_time, _ = absolute_demand_times(
+        flights['date_key'], flights['arrival_slot_id'], flights['arrival_slot_id'], flights['return_slot_id']
+    )
+
+    # Parking stands in arrival order, stations in pickup order
+    arrival_order = np.argsort(arrival_time, kind='stable')
+    stand_index = np.zeros(len(flights), dtype=np.int64)
+    stand_index[arrival_order] = assign_parking_stands(
+        flights['aircraft_category'].to_numpy()[arrival_order], arrival_time[arrival_order], dim_parking_stand
+    )
+    flights['parking_stand_index'] = stand_index
+
+    flights = flights.sort_values('pickup_time', kind='stable')
+    flights['station_id'] = assign_stations(
+        flights, station_capacity_array(dim_station, dim_equipment), distance_by_id, candidates
+    )
+    flights['distance_km'] = distance_by_id[flights['parking_stand_index'], flights['station_id']]
+
+    by_flight = DimensionIndex(flights.reset_index(), 'flight_id')
+    station_id = by_flight.attribute(fact_flight_demand['flight_id'], 'station_id')
+    allocation_distance_km = np.round(by_flight.attribute(fact_flight_demand['flight_id'], 'distance_km'), 1)
+    return station_id, allocation_distance_km
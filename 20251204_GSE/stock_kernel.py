@@ -0,0 +1,139 @@
+import pandas as pd
+import numpy as np
+from join_index import DimensionIndex
+
+# Share of capacity reserved for outbound flights
+RESERVE_RATIO = 0.5
+
+# Utilization is capped for reporting
+MAX_UTILIZATION_PCT = 150.0
+
+PERIODS = [1, 2, 3, 4]
+
+# Rows per chunk when aggregating fact_flight_demand from disk
+CHUNK_ROWS = 250_000
+
+DEMAND_KEYS = ['station_id', 'date_key', 'period_id', 'equipment_id']
+
+
+def capacity_matrix(dim_station, dim_equipment, equipment_types):
+    """Station x equipment capacity array from the capacity_<asset_code> columns"""
+    codes = dim_equipment.set_index('equipment_id')['asset_code']
+    columns = ['capacity_' + codes[e].lower().replace('-', '') for e in equipment_types]
+    return dim_station[columns].to_numpy(dtype=np.int64)
+
+
+def aggregate_flight_demand(fact_flight_demand, dim_time_slot, period_mapping=None):
+    """Sum qty_required by station, date, period (of the pickup slot) and equipment
+
+    period_mapping (a peak_detection.PeriodMapping) replaces the static dim_time_slot periods.
+    """
+    if period_mapping is not None:
+        periods = period_mapping.period_of(fact_flight_demand['date_key'], fact_flight_demand['pickup_slot_id'])
+    else:
+        periods = DimensionIndex(dim_time_slot, 'slot_id').attribute(fact_flight_demand['pickup_slot_id'], 'period_id')
+    demand_agg = fact_flight_demand.assign(period_id=periods).groupby(DEMAND_KEYS)['qty_required'].sum().reset_index()
+    return demand_agg.rename(columns={'qty_required': 'demand_qty'})
+
+
+def combine_demand(partials):
+    """Merge partial demand sums over the same keys into one sorted aggregate"""
+    return pd.concat(partials, ignore_index=True).groupby(DEMAND_KEYS)['demand_qty'].sum().reset_index()
+
+
+def aggregate_flight_demand_chunked(path, dim_time_slot, period_mapping=None, chunk_rows=CHUNK_ROWS):
+    """aggregate_flight_demand() over a CSV read in chunks
+
+    Only the needed columns are parsed and partial sums are folded together as they grow,
+    so peak memory follows the number of output groups rather than input rows.
+    """
+    columns = ['station_id', 'date_key', 'equipment_id', 'qty_required', 'pickup_slot_id']
+    partials = []
+    partial_rows = 0
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+        partial = aggregate_flight_demand(chunk, dim_time_slot, period_mapping)
+        partials.append(partial)
+        partial_rows += len(partial)
+
+        # Fold once the pending partials outgrow one chunk
+        if partial_rows > chunk_rows and len(partials) > 1:
+            partials = [combine_demand(partials)]
+            partial_rows = len(partials[0])
+
+    if not partials:
+        return pd.DataFrame(columns=DEMAND_KEYS + ['demand_qty'])
+    return combine_demand(partials)
+
+
+def build_demand_cube(demand_agg, date_keys, station_ids, equipment_types):
+    """Dense [date, period, station, equipment] demand array from aggregated demand rows"""
+    date_index = pd.Index(date_keys).get_indexer(demand_agg['date_key'])
+    period_index = pd.Index(PERIODS).get_indexer(demand_agg['period_id'])
+    station_index = pd.Index(station_ids).get_indexer(demand_agg['station_id'])
+    equipment_index = pd.Index(equipment_types).get_indexer(demand_agg['equipment_id'])
+
+    # Rows outside the requested dates/stations/equipment are dropped
+    keep = (date_index >= 0) & (period_index >= 0) & (station_index >= 0) & (equipment_index >= 0)
+    cube = np.zeros((len(date_keys), len(PERIODS), len(station_ids), len(equipment_types)), dtype=np.int64)
+    np.add.at(cube, (
+        date_index[keep], period_index[keep], station_index[keep], equipment_index[keep]
+    ), demand_agg['demand_qty'].to_numpy()[keep].astype(np.int64))
+    return cube
+
+
+def compute_stock(demand, capacity, reserve_ratio=RESERVE_RATIO, outbound=None):
+    """Vectorized stock position for a demand cube; capacity broadcasts against demand
+
+    outbound, a departure demand cube like demand, is netted off capacity in place of the
+    reserve_ratio share; available_inbound goes negative when departures alone exceed capacity.
+    """
+    capacity = np.broadcast_to(capacity, demand.shape)
+    if outbound is None:
+        reserved_outbound = np.floor(capacity * reserve_ratio).astype(np.int64)
+    else:
+        reserved_outbound = outbound
+    available_inbound = capacity - reserved_outbound
+
+    gap = available_inbound - demand
+    with np.errstate(divide='ignore', invalid='ignore'):
+        utilization_pct = np.where(
+            available_inbound > 0,
+            np.minimum(MAX_UTILIZATION_PCT, demand / available_inbound * 100),
+            0.0
+        )
+
+    return {
+        'capacity': capacity,
+        'reserved_outbound': reserved_outbound,
+        'available_inbound': available_inbound,
+        'demand_qty': demand,
+        'allocated_qty': np.minimum(demand, np.maximum(available_inbound, 0)),
+        'shortage_qty': np.minimum(0, gap),
+        'surplus_qty': np.maximum(0, gap),
+        'utilization_pct': utilization_pct,
+        'bottleneck': utilization_pct > 100.0
+    }
+
+
+def stock_to_frame(stock, date_keys, station_ids, equipment_types, scenario_id=1):
+    """Flatten kernel output into fact_station_stock rows sorted by date, period, station, equipment"""
+    shape = stock['demand_qty'].shape
+    date_idx, period_idx, station_idx, equipment_idx = np.indices(shape).reshape(4, -1)
+
+    frame = pd.DataFrame({
+        'stock_id': np.arange(1, date_idx.size + 1),
+        'station_id': np.asarray(station_ids)[station_idx],
+        'date_key': np.asarray(date_keys)[date_idx],
+        'period_id': np.asarray(PERIODS)[period_idx],
+        'equipment_id': np.asarray(equipment_types)[equipment_idx],
+        'scenario_id': scenario_id
+    })
+    # substituted_qty/lent_qty only when substitution.substitute_stock ran
+    for column in ['capacity', 'reserved_outbound', 'available_inbound', 'demand_qty',
+                   'allocated_qty', 'shortage_qty', 'surplus_qty', 'substituted_qty', 'lent_qty']:
+        if column in stock:
+            frame[column] = stock[column].reshape(-1)
+    frame['utilization_pct'] = np.round(stock['utilization_pct'].reshape(-1), 1)
+    frame['bottleneck_flag'] = np.where(stock['bottleneck'].reshape(-1), 'TRUE', 'FALSE')
+    frame['is_active'] = 'TRUE'
+    return frame
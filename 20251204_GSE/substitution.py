@@ -0,0 +1,160 @@
+import pandas as pd
+import numpy as np
+
+SUBSTITUTION_PATH = 'dim_equipment_substitution.csv'
+
+
+class SubstitutionMatrix:
+    """dim_equipment_substitution rules: which equipment covers which, cheapest first
+
+    A rule (required, substitute, units_per_unit) lets units_per_unit spare substitute
+    units cover one unit of required demand at the same station. Rules are applied in
+    preference_cost order, each as one vectorized step over every cell, so resolving
+    substitutions costs a few array passes rather than a solve per station/period.
+    """
+
+    def __init__(self, frame):
+        frame = frame[frame['is_active'].astype(str).str.upper() == 'TRUE']
+        self.frame = frame.sort_values(['preference_cost', 'substitution_id'], kind='stable').reset_index(drop=True)
+        self.rules = list(zip(
+            self.frame['required_equipment_id'].astype(int),
+            self.frame['substitute_equipment_id'].astype(int),
+            self.frame['units_per_unit'].astype(int)
+        ))
+
+    @classmethod
+    def load(cls, path=SUBSTITUTION_PATH):
+        return cls(pd.read_csv(path))
+
+    def supply_types(self, equipment_types):
+        """Substitute types that have no demand rows of their own (e.g. 20FT in the stock)"""
+        return sorted({s for _, s, _ in self.rules} - set(equipment_types))
+
+    def resolve(self, available, demand, equipment_types, supply=None):
+        """(covered, lent) for [..., equipment] available and demand arrays
+
+        Only a type's surplus (available beyond its own demand) is lent, so substitution
+        never creates a shortage. supply is [..., supply type] spare units of
+        supply_types(equipment_types). covered is the required units covered by other
+        types and lent the units each type gave, both over equipment_types + supply types.
+        """
+        supply_types = self.supply_types(equipment_types)
+        types = list(equipment_types) + supply_types
+        if supply is None:
+            supply = np.zeros(available.shape[:-1] + (len(supply_types),), dtype=np.int64)
+        surplus = np.concatenate([np.maximum(available - demand, 0), supply], axis=-1)
+        shortage = np.concatenate([np.maximum(demand - available, 0), np.zeros_like(supply)], axis=-1)
+        covered = np.zeros_like(shortage)
+        lent = np.zeros_like(shortage)
+
+        index = {e: i for i, e in enumerate(types)}
+        for required, substitute, units_per_unit in self.rules:
+            if required not in index or substitute not in index:
+                continue
+            r, s = index[required], index[substitute]
+            give = np.minimum(shortage[..., r], surplus[..., s] // units_per_unit)
+            shortage[..., r] -= give
+            surplus[..., s] -= give * units_per_unit
+            covered[..., r] += give
+            lent[..., s] += give * units_per_unit
+        return covered, lent
+
+    def allocation_rules(self, equipment_ids):
+        """Rules whose required type appears in equipment_ids (for interval allocation)"""
+        present = set(np.unique(np.asarray(equipment_ids)).tolist())
+        return [rule for rule in self.rules if rule[0] in present]
+
+
+def supply_available(dim_station, dim_equipment, supply_types, reserve_ratio):
+    """[station, supply type] units of supply-only types available to inbound flights"""
+    from stock_kernel import capacity_matrix
+    capacity = capacity_matrix(dim_station, dim_equipment, supply_types)
+    return capacity - np.floor(capacity * reserve_ratio).astype(np.int64)
+
+
+def substitute_stock(stock, matrix, equipment_types, supply=None):
+    """Stock position after substitution (stock_kernel.compute_stock output, updated in place)
+
+    allocated_qty includes units covered by substitutes; shortage_qty and surplus_qty
+    net out what was covered and lent. Adds substituted_qty and lent_qty.
+    """
+    num_types = len(equipment_types)
+    available = stock['available_inbound']
+    demand = stock['demand_qty']
+    if supply is not None:
+        supply = np.broadcast_to(supply, demand.shape[:-1] + supply.shape[-1:])
+    covered, lent = matrix.resolve(available, demand, equipment_types, supply)
+    covered, lent = covered[..., :num_types], lent[..., :num_types]
+
+    gap = available - demand + covered - lent
+    stock['allocated_qty'] = np.minimum(demand, np.maximum(available, 0) + covered)
+    stock['shortage_qty'] = np.minimum(0, gap)
+    stock['surplus_qty'] = np.maximum(0, gap)
+    stock['substituted_qty'] = covered
+    stock['lent_qty'] = lent
+    return stock
+
+
+def substitute_stock_frame(frame, matrix, equipment_types, num_stations, supply=None):
+    """substitute_stock() over fact_station_stock rows sorted by date, period, station, equipment"""
+    shape = (-1, num_stations, len(equipment_types))
+    stock = {column: frame[column].to_numpy().reshape(shape)
+             for column in ['available_inbound', 'demand_qty', 'allocated_qty', 'shortage_qty', 'surplus_qty']}
+    stock = substitute_stock(stock, matrix, equipment_types, None if supply is None else supply[None])
+    frame = frame.copy()
+    for column in ['allocated_qty', 'shortage_qty', 'surplus_qty']:
+        frame[column] = stock[column].reshape(-1)
+    position = frame.columns.get_loc('surplus_qty') + 1
+    frame.insert(position, 'substituted_qty', stock['substituted_qty'].reshape(-1))
+    frame.insert(position + 1, 'lent_qty', stock['lent_qty'].reshape(-1))
+    return frame
+
+
+if __name__ == '__main__':
+    import time
+    from stock_kernel import RESERVE_RATIO, capacity_matrix, aggregate_flight_demand_chunked, build_demand_cube, compute_stock
+    from fact_station_stock import EQUIPMENT_TYPES
+
+    # Load prerequisite files
+    matrix = SubstitutionMatrix.load()
+    dim_station = pd.read_csv('dim_station.csv')
+    dim_equipment = pd.read_csv('dim_equipment.csv')
+    dim_time_slot = pd.read_csv('dim_time_slot.csv')
+    dates = list(pd.read_csv('dim_date.csv')['date_key'])
+    stations = list(dim_station['station_id'])
+
+    demand_agg = aggregate_flight_demand_chunked('fact_flight_demand.csv', dim_time_slot)
+    demand = build_demand_cube(demand_agg, dates, stations, EQUIPMENT_TYPES)
+    capacity = capacity_matrix(dim_station, dim_equipment, EQUIPMENT_TYPES)
+    supply = supply_available(dim_station, dim_equipment, matrix.supply_types(EQUIPMENT_TYPES), RESERVE_RATIO)
+
+    start_time = time.perf_counter()
+    before = compute_stock(demand, capacity)
+    base_time = time.perf_counter() - start_time
+    shortage_before = before['shortage_qty'].copy()
+    surplus_before = before['surplus_qty'].copy()
+
+    after = compute_stock(demand, capacity)
+    start_time = time.perf_counter()
+    substitute_stock(after, matrix, EQUIPMENT_TYPES, supply)
+    substitution_time = time.perf_counter() - start_time
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nRules in preference order: {len(matrix.rules)}; supply-only types: {matrix.supply_types(EQUIPMENT_TYPES)}")
+    print(f"{demand.size:,} cells: stock kernel {base_time * 1000:.0f} ms, substitution {substitution_time * 1000:.0f} ms")
+
+    codes = dim_equipment.set_index('equipment_id')['asset_code']
+    print("\nShortage units by equipment (before -> after substitution):")
+    for e, equipment_id in enumerate(EQUIPMENT_TYPES):
+        print(f"  {codes[equipment_id]:>5}: {-shortage_before[..., e].sum():>7,} -> {-after['shortage_qty'][..., e].sum():>7,}"
+              f"  (covered {after['substituted_qty'][..., e].sum():,}, lent {after['lent_qty'][..., e].sum():,})")
+
+    print(f"\nNo new shortages: {(after['shortage_qty'] >= shortage_before).all()} ✓")
+    print(f"Lent only from surplus: {(after['lent_qty'] <= surplus_before).all()} ✓")
+    print(f"Covered only up to the shortage: {(after['substituted_qty'] <= -shortage_before).all()} ✓")
+
+    print("\n" + "=" * 80)
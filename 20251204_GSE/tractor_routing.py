@@ -0,0 +1,210 @@
+import pandas as pd
+import numpy as np
+from apron_network import ApronPaths
+
+# Tow-tractor limits per (date, before_period_id) batch
+TRACTORS_PER_PERIOD = 4
+MAX_TRAIN_LENGTH = 6     # units towed in one train
+MAX_TOUR_MIN = 60        # time window before the period starts
+HITCH_MIN = 2            # coupling/uncoupling per train, same minimum as single moves
+
+
+def build_trains(from_ids, to_ids, qty, max_train_length=MAX_TRAIN_LENGTH):
+    """Pack moves into trains of at most max_train_length units per (from, to) pair
+
+    Moves are taken in the given order and split across trains when they do not fit.
+    Returns per-train (from, to) arrays and, per part, (train index, move index, qty).
+    """
+    train_from, train_to = [], []
+    part_train, part_move, part_qty = [], [], []
+    open_train = {}
+    for move, (from_id, to_id, remaining) in enumerate(zip(from_ids, to_ids, qty)):
+        while remaining > 0:
+            train, load = open_train.get((from_id, to_id), (None, max_train_length))
+            if load == max_train_length:
+                train, load = len(train_from), 0
+                train_from.append(from_id)
+                train_to.append(to_id)
+            take = min(remaining, max_train_length - load)
+            part_train.append(train)
+            part_move.append(move)
+            part_qty.append(take)
+            open_train[(from_id, to_id)] = (train, load + take)
+            remaining -= take
+    return (np.array(train_from, dtype=np.int64), np.array(train_to, dtype=np.int64),
+            np.array(part_train, dtype=np.int64), np.array(part_move, dtype=np.int64), np.array(part_qty, dtype=np.int64))
+
+
+def tour_minutes(sequence, train_from, train_to, time_min):
+    """Loaded legs plus deadhead legs of a closed tour starting at its first pickup"""
+    sequence = np.asarray(sequence)
+    start, end = train_from[sequence], train_to[sequence]
+    loaded = time_min[start, end].sum() + HITCH_MIN * len(sequence)
+    deadhead = time_min[end, np.roll(start, -1)].sum()
+    return loaded + deadhead
+
+
+def nearest_neighbour_tours(train_from, train_to, time_min, tractors=TRACTORS_PER_PERIOD, max_tour_min=MAX_TOUR_MIN):
+    """Greedy tours: each tractor takes the closest next pickup while the tour fits the window
+
+    Trains left over once every tractor is in use go to the shortest tour, even if it
+    runs past the window. Returns the tours and the number of such overflow trains.
+    """
+    remaining = list(range(len(train_from)))
+    tours = []
+    while remaining and len(tours) < tractors:
+        tour = [remaining.pop(0)]
+        duration = tour_minutes(tour, train_from, train_to, time_min)
+        while remaining:
+            position = train_to[tour[-1]]
+            nearest = min(remaining, key=lambda t: time_min[position, train_from[t]])
+            extended = tour_minutes(tour + [nearest], train_from, train_to, time_min)
+            if extended > max_tour_min:
+                break
+            tour.append(nearest)
+            remaining.remove(nearest)
+            duration = extended
+        tours.append([tour, duration])
+
+    overflow = len(remaining)
+    for train in remaining:
+        shortest = min(tours, key=lambda t: t[1])
+        shortest[0].append(train)
+        shortest[1] = tour_minutes(shortest[0], train_from, train_to, time_min)
+
+    return [tour for tour, _ in tours], overflow
+
+
+def two_opt(tour, train_from, train_to, time_min):
+    """Improve a tour by segment reversal until no reversal shortens it
+
+    The network is directed (one-way roads), so each candidate is re-costed in full.
+    """
+    best = list(tour)
+    best_minutes = tour_minutes(best, train_from, train_to, time_min)
+    improved = len(best) > 2
+    while improved:
+        improved = False
+        for i in range(len(best) - 1):
+            for j in range(i + 2, len(best) + 1):
+                candidate = best[:i] + best[i:j][::-1] + best[j:]
+                minutes = tour_minutes(candidate, train_from, train_to, time_min)
+                if minutes < best_minutes - 1e-9:
+                    best, best_minutes = candidate, minutes
+                    improved = True
+    return best, best_minutes
+
+
+def single_move_minutes(from_ids, to_ids, qty, time_min, max_train_length=MAX_TRAIN_LENGTH):
+    """Tractor minutes when every move is its own round trip (one per train of units)"""
+    trips = np.ceil(np.asarray(qty) / max_train_length)
+    round_trip = time_min[from_ids, to_ids] + time_min[to_ids, from_ids] + HITCH_MIN
+    return float((trips * round_trip).sum())
+
+
+def route_replenishment(fact_replenishment, time_min, tractors=TRACTORS_PER_PERIOD,
+                        max_train_length=MAX_TRAIN_LENGTH, max_tour_min=MAX_TOUR_MIN):
+    """Tractor tours for every (date, before_period_id) batch of replenishment moves
+
+    time_min is a [from_station_id, to_station_id] travel time table. Returns one row
+    per towed part of a move and a per-batch summary with tour vs single-move minutes.
+    """
+    moves = fact_replenishment.sort_values('replenishment_id')
+    rows = []
+    batches = []
+    tour_id = 0
+    for (date_key, period_id), batch in moves.groupby(['date_key', 'before_period_id'], sort=True):
+        from_ids = batch['from_station_id'].to_numpy()
+        to_ids = batch['to_station_id'].to_numpy()
+        qty = batch['qty_to_move'].to_numpy()
+
+        train_from, train_to, part_train, part_move, part_qty = build_trains(from_ids, to_ids, qty, max_train_length)
+        tours, overflow = nearest_neighbour_tours(train_from, train_to, time_min, tractors, max_tour_min)
+
+        batch_minutes = 0.0
+        for tractor_no, tour in enumerate(tours, start=1):
+            tour, minutes = two_opt(tour, train_from, train_to, time_min)
+            batch_minutes += minutes
+            tour_id += 1
+
+            # Parts of each train in tour order
+            for stop_sequence, train in enumerate(tour, start=1):
+                previous_to = train_to[tour[stop_sequence - 2]] if stop_sequence > 1 else train_to[tour[-1]]
+                deadhead_min = time_min[previous_to, train_from[train]]
+                loaded_min = time_min[train_from[train], train_to[train]]
+                for part in np.flatnonzero(part_train == train):
+                    move = batch.iloc[part_move[part]]
+                    rows.append({
+                        'tour_id': tour_id,
+                        'date_key': date_key,
+                        'before_period_id': period_id,
+                        'tractor_no': tractor_no,
+                        'stop_sequence': stop_sequence,
+                        'replenishment_id': move['replenishment_id'],
+                        'from_station_id': train_from[train],
+                        'to_station_id': train_to[train],
+                        'equipment_id': move['equipment_id'],
+                        'qty_towed': part_qty[part],
+                        'deadhead_min': round(deadhead_min, 1),
+                        'loaded_min': round(loaded_min, 1),
+                        'tour_minutes': round(minutes, 1)
+                    })
+
+        batches.append({
+            'date_key': date_key,
+            'before_period_id': period_id,
+            'moves': len(batch),
+            'trains': len(train_from),
+            'tours': len(tours),
+            'overflow_trains': overflow,
+            'tour_minutes': batch_minutes,
+            'single_move_minutes': single_move_minutes(from_ids, to_ids, qty, time_min, max_train_length)
+        })
+
+    return pd.DataFrame(rows), pd.DataFrame(batches)
+
+
+if __name__ == '__main__':
+    import time
+
+    # Load prerequisite files
+    dim_station = pd.read_csv('dim_station.csv')
+    fact_replenishment = pd.read_csv('fact_replenishment.csv')
+
+    station_time_min = ApronPaths.load().station_time_min(dim_station['station_id'])
+
+    start_time = time.perf_counter()
+    fact_tractor_tour, batches = route_replenishment(fact_replenishment, station_time_min)
+    elapsed = time.perf_counter() - start_time
+
+    # Save to CSV
+    fact_tractor_tour.to_csv('fact_tractor_tour.csv', index=False)
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    print(f"\nReplenishment moves: {len(fact_replenishment):,} in {len(batches):,} date/period batches")
+    print(f"Tours: {fact_tractor_tour['tour_id'].nunique():,}, rows: {len(fact_tractor_tour):,}")
+    print(f"Routing time: {elapsed:.2f}s")
+
+    moved = fact_tractor_tour['qty_towed'].sum()
+    print(f"Units towed: {moved:,} (expected: {fact_replenishment['qty_to_move'].sum():,})")
+    print(f"Max tractors in a batch: {batches['tours'].max()} (limit: {TRACTORS_PER_PERIOD})")
+    train_load = fact_tractor_tour.groupby(['tour_id', 'stop_sequence'])['qty_towed'].sum()
+    print(f"Max train length: {train_load.max()} (limit: {MAX_TRAIN_LENGTH})")
+    print(f"Batches with trains past the {MAX_TOUR_MIN} min window: {(batches['overflow_trains'] > 0).sum()}")
+
+    single = batches['single_move_minutes'].sum()
+    toured = batches['tour_minutes'].sum()
+    print(f"\nTractor-minutes as single moves: {single:,.0f}")
+    print(f"Tractor-minutes as tours: {toured:,.0f}")
+    print(f"Tractor-minutes saved: {single - toured:,.0f} ({(single - toured) / single * 100:.1f}%)")
+
+    print("\n--- First 5 rows ---")
+    print(fact_tractor_tour.head(5).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("CSV file 'fact_tractor_tour.csv' created successfully!")
+    print("=" * 80)
@@ -0,0 +1,169 @@
+import pandas as pd
+import numpy as np
+
+# Average checked bag weight and bags per LD3 container (volume-limited before weight)
+BAG_KG = 20
+BAGS_PER_CONTAINER = 40
+
+# Cargo is split into consignments averaging this share of one ULD's weight limit
+PIECE_FILL = 0.35
+MAX_PIECES = 32
+
+# Lower-deck positions (in LD3 equivalents) taken by one PMC pallet
+PALLET_POSITIONS = 3
+
+# LD3 containers carried on one 14P pallet dolly
+CONTAINERS_PER_PALLET_DOLLY = 2
+
+# dim_equipment rows whose capacity_ton is the weight limit of each ULD type
+CONTAINER_EQUIPMENT_ID = 1   # 13C dolly carries one LD3
+PALLET_EQUIPMENT_ID = 2      # 14P dolly carries one PMC
+
+
+def uld_limits_kg(dim_equipment):
+    """(LD3 container, PMC pallet) weight limits in kg from dim_equipment capacity_ton"""
+    capacity_ton = dim_equipment.set_index('equipment_id')['capacity_ton']
+    return capacity_ton[CONTAINER_EQUIPMENT_ID] * 1000, capacity_ton[PALLET_EQUIPMENT_ID] * 1000
+
+
+def cargo_pieces(cargo_kg, limit_kg, rng):
+    """[flights, MAX_PIECES] consignment weights summing to each flight's cargo (0 = no piece)
+
+    Consignments are gamma-distributed around PIECE_FILL of the ULD limit; a piece heavier
+    than one ULD is capped at the limit (it would be split at build-up).
+    """
+    cargo_kg = np.asarray(cargo_kg, dtype=np.float64)
+    limit_kg = np.broadcast_to(np.asarray(limit_kg, dtype=np.float64), cargo_kg.shape)
+    count = np.clip(np.ceil(cargo_kg / (limit_kg * PIECE_FILL)), 0, MAX_PIECES).astype(np.int64)
+    shares = rng.gamma(4.0, size=(len(cargo_kg), MAX_PIECES)) * (np.arange(MAX_PIECES) < count[:, None])
+    totals = shares.sum(axis=1, keepdims=True)
+    pieces = np.divide(shares, totals, out=np.zeros_like(shares), where=totals > 0) * cargo_kg[:, None]
+    return np.minimum(pieces, limit_kg[:, None])
+
+
+def first_fit_decreasing(weights, capacity):
+    """Bins used per row when packing each row's items first-fit-decreasing
+
+    weights is [rows, items] (0 = no item), capacity a scalar or per-row limit. Items are
+    placed in rank order for all rows at once, so the loop runs once per item rank.
+    """
+    weights = -np.sort(-np.asarray(weights, dtype=np.float64), axis=1)
+    rows, items = weights.shape
+    capacity = np.broadcast_to(np.asarray(capacity, dtype=np.float64), (rows,))
+    remaining = np.repeat(capacity[:, None], items, axis=1)
+    row_index = np.arange(rows)
+
+    for rank in range(items):
+        item = weights[:, rank]
+        active = item > 0
+        if not active.any():
+            break
+        # An empty bin always fits, so argmax finds the first usable one
+        first = np.argmax(remaining >= item[:, None] - 1e-9, axis=1)
+        remaining[row_index[active], first[active]] -= item[active]
+
+    return (remaining < capacity[:, None]).sum(axis=1)
+
+
+def pack_day(flights, container_kg, pallet_kg, rng):
+    """ULDs and dollies for the flights of one day
+
+    Widebodies: cargo on PMC pallets, bags in LD3s, dollies are 14P (one pallet or two
+    containers each). Narrowbodies: cargo and bags in LD3s on 13C dollies. Whatever does
+    not fit the aircraft's uld_positions travels bulk.
+    """
+    widebody = (flights['aircraft_category'] == 'Widebody').to_numpy()
+    positions = flights['uld_positions'].to_numpy().astype(np.int64)
+    bags = flights['estimated_bags'].to_numpy().astype(np.int64)
+    cargo_kg = flights['cargo_kg'].to_numpy().astype(np.float64)
+
+    limit_kg = np.where(widebody, pallet_kg, container_kg)
+    pallets = np.where(widebody, first_fit_decreasing(cargo_pieces(np.where(widebody, cargo_kg, 0), limit_kg, rng), limit_kg), 0)
+    cargo_containers = np.where(widebody, 0, first_fit_decreasing(cargo_pieces(np.where(widebody, 0, cargo_kg), limit_kg, rng), limit_kg))
+
+    # Pallets first, then cargo containers, then bag containers, within the positions
+    pallets = np.minimum(pallets, positions // PALLET_POSITIONS)
+    free = positions - pallets * PALLET_POSITIONS
+    cargo_containers = np.minimum(cargo_containers, free)
+    free -= cargo_containers
+    bags_per_container = min(BAGS_PER_CONTAINER, int(container_kg // BAG_KG))
+    bag_containers = np.minimum(-(-bags // bags_per_container), free)
+    containers = cargo_containers + bag_containers
+
+    return pd.DataFrame({
+        'flight_id': flights['flight_id'].to_numpy(),
+        'pallets': pallets,
+        'containers': containers,
+        'bulk_bags': np.maximum(bags - bag_containers * bags_per_container, 0),
+        'qty_14p': np.where(widebody, pallets + -(-containers // CONTAINERS_PER_PALLET_DOLLY), 0),
+        'qty_13c': np.where(widebody, 0, containers)
+    })
+
+
+def pack_flights(dim_flight, dim_aircraft, dim_equipment, seed=42):
+    """pack_day() over every day of dim_flight; one row per flight in dim_flight order
+
+    Flights without cargo data use the aircraft's typical_cargo_kg. Each day draws from
+    its own seeded stream, so a day packs the same regardless of the date range.
+    """
+    container_kg, pallet_kg = uld_limits_kg(dim_equipment)
+    aircraft = dim_aircraft.set_index('aircraft_id')
+    flights = dim_flight[['flight_id', 'date_key', 'aircraft_category', 'estimated_bags']].assign(
+        uld_positions=aircraft['uld_positions'].reindex(dim_flight['aircraft_id']).to_numpy(),
+        cargo_kg=np.where(
+            dim_flight['has_cargo_data'].astype(str).str.upper() == 'TRUE',
+            dim_flight['cargo_kg'],
+            aircraft['typical_cargo_kg'].reindex(dim_flight['aircraft_id']).to_numpy()
+        )
+    )
+    packed = [
+        pack_day(day, container_kg, pallet_kg, np.random.default_rng([seed, int(date_key)]))
+        for date_key, day in flights.groupby('date_key', sort=True)
+    ]
+    return pd.concat(packed, ignore_index=True).set_index('flight_id').loc[dim_flight['flight_id']].reset_index()
+
+
+if __name__ == '__main__':
+    import time
+
+    # Load prerequisite files
+    dim_flight = pd.read_csv('dim_flight.csv')
+    dim_aircraft = pd.read_csv('dim_aircraft.csv')
+    dim_equipment = pd.read_csv('dim_equipment.csv')
+
+    start_time = time.perf_counter()
+    packed = pack_flights(dim_flight, dim_aircraft, dim_equipment)
+    elapsed = time.perf_counter() - start_time
+
+    # Today's formula for comparison
+    uld_positions = dim_aircraft.set_index('aircraft_id')['uld_positions'].reindex(dim_flight['aircraft_id']).to_numpy()
+    has_cargo = dim_flight['has_cargo_data'].astype(str).str.upper() == 'TRUE'
+    cargo_factor = np.where(has_cargo, np.ceil(dim_flight['cargo_kg'] / 3000), 2)
+    formula_14p = np.clip(np.ceil(uld_positions * 0.6) + cargo_factor, 4, 12)
+    formula_13c = np.clip(np.ceil(uld_positions * 0.8), 3, 8)
+    widebody = (dim_flight['aircraft_category'] == 'Widebody').to_numpy()
+
+    # Validation
+    print("=" * 80)
+    print("VALIDATION REPORT")
+    print("=" * 80)
+
+    container_kg, pallet_kg = uld_limits_kg(dim_equipment)
+    print(f"\nFlights packed: {len(packed):,} over {dim_flight['date_key'].nunique()} days in {elapsed * 1000:.0f} ms")
+    print(f"ULD limits: LD3 {container_kg:.0f} kg, PMC {pallet_kg:.0f} kg")
+    print(f"Rows align with dim_flight: {(packed['flight_id'].to_numpy() == dim_flight['flight_id'].to_numpy()).all()} ✓")
+
+    print("\nDollies per flight (packing vs formula):")
+    print(f"  14P widebody:   mean {packed['qty_14p'][widebody].mean():.1f} vs {formula_14p[widebody].mean():.1f}, "
+          f"range {packed['qty_14p'][widebody].min()}-{packed['qty_14p'][widebody].max()}")
+    print(f"  13C narrowbody: mean {packed['qty_13c'][~widebody].mean():.1f} vs {formula_13c[~widebody].mean():.1f}, "
+          f"range {packed['qty_13c'][~widebody].min()}-{packed['qty_13c'][~widebody].max()}")
+    print(f"\nPallets per widebody: {packed['pallets'][widebody].mean():.1f}, containers: {packed['containers'].mean():.1f}")
+    print(f"Flights with bulk bags: {(packed['bulk_bags'] > 0).sum():,}")
+
+    print("\nBy aircraft:")
+    by_aircraft = packed.assign(aircraft_series=dim_flight['aircraft_series']).groupby('aircraft_series')[
+        ['pallets', 'containers', 'bulk_bags', 'qty_14p', 'qty_13c']].mean().round(1)
+    print(by_aircraft.to_string())
+
+    print("\n" + "=" * 80)